@@ -1,12 +1,21 @@
 # articles/admin.py
 from django.contrib import admin
 from .models import Article
+from .search import get_search_backend
 
 @admin.register(Article)
 class ArticleAdmin(admin.ModelAdmin):
     list_display = ('title', 'category', 'is_published', 'published_at', 'source_name') # Добавили source_name в список
     list_filter = ('category', 'is_published', 'published_at', 'source_name') # Добавили фильтр по источнику
     search_fields = ('title', 'original_content', 'source_name') # Добавили поиск по источнику
-    readonly_fields = ('published_at',)
+    readonly_fields = ('published_at', 'processed_at', 'processing_attempts', 'thumbnails_at', 'duplicate_of')
     # Убираем author, добавляем source_name
-    fields = ('title', 'original_content', 'processed_content', 'summary', 'source_url', 'source_name', 'image_url', 'tags', 'category', 'is_published', 'slug')
+    fields = ('title', 'original_content', 'processed_content', 'summary', 'source_url', 'source_name', 'image_url', 'tags', 'category', 'is_published', 'slug', 'processed_at', 'processing_attempts', 'duplicate_of')
+
+    def get_search_results(self, request, queryset, search_term):
+        # Текст ищем по FTS-индексу вместо LIKE по original_content, источник — как раньше
+        backend = get_search_backend()
+        if not search_term.strip() or not getattr(backend, 'available', False):
+            return super().get_search_results(request, queryset, search_term)
+        matches = backend.filter(queryset, search_term) | queryset.filter(source_name__icontains=search_term)
+        return matches, False
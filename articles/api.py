@@ -0,0 +1,136 @@
+# articles/api.py
+from django.conf import settings
+from django.db.models import Count
+from django.http import Http404, HttpResponse
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.views import APIView
+
+from .cache import cached_page_response, make_etag
+from .models import Article, CATEGORIES
+from .pagination import decode_cursor, keyset_page
+from .serializers import (
+    ARTICLE_DETAIL_FIELDS, ARTICLE_LIST_DEFAULT_FIELDS, ARTICLE_LIST_FIELDS,
+    ArticleSerializer, columns_for, parse_fields,
+)
+
+API_VERSION = 'v1'
+
+
+def json_response(data) -> HttpResponse:
+    # Рендерим сразу в байты: такой ответ можно положить в кэш страниц как есть
+    return HttpResponse(JSONRenderer().render(data), content_type='application/json')
+
+
+def api_page_key(request, *parts) -> str:
+    # Хост входит в ключ: в ответах абсолютные ссылки
+    return ':'.join(['api', API_VERSION, request.get_host(), *(str(part) for part in parts)])
+
+
+class ArticleListView(APIView):
+    """
+    GET /api/v1/articles/?category=&cursor=&limit=&fields=
+    Опубликованные статьи от новых к старым, постранично по курсору (published_at, id).
+    Стоимость запроса не зависит ни от номера страницы, ни от размера базы:
+    выборка идёт по частичному индексу, а ETag считается по самой странице, без COUNT/MAX по таблице.
+    """
+
+    def get(self, request):
+        params = request.query_params
+        fields = parse_fields(params.get('fields', ''), ARTICLE_LIST_FIELDS, ARTICLE_LIST_DEFAULT_FIELDS)
+        category = params.get('category') or None
+        if category is not None and category not in dict(CATEGORIES):
+            raise ValidationError({'category': f"Неизвестная категория. Доступны: {', '.join(dict(CATEGORIES))}"})
+        cursor = params.get('cursor') or ''
+        if cursor and decode_cursor(cursor) is None:
+            raise ValidationError({'cursor': "Некорректный курсор"})
+        default_limit = getattr(settings, 'ARTICLES_API_PAGE_SIZE', 20)
+        try:
+            limit = min(max(1, int(params.get('limit', default_limit))), getattr(settings, 'ARTICLES_API_MAX_PAGE_SIZE', 100))
+        except ValueError:
+            raise ValidationError({'limit': "Ожидается целое число"})
+
+        articles = Article.objects.filter(is_published=True)
+        if category is not None:
+            articles = articles.filter(category=category)
+        page = {}
+
+        def load_page():
+            # Страница читается один раз и нужна и валидаторам, и отрисовке
+            if not page:
+                # updated_at нужен для ETag, даже если клиент его не просил
+                queryset = articles.only(*columns_for(fields + ('updated_at',)))
+                page['items'], page['next_cursor'] = keyset_page(queryset, cursor, limit)
+            return page
+
+        def get_validators():
+            items = load_page()['items']
+            last_modified = max((article.updated_at for article in items), default=None)
+            versions = [(article.pk, article.updated_at) for article in items]
+            return make_etag(API_VERSION, 'articles', category, cursor, limit, fields, versions, page['next_cursor']), last_modified
+
+        def render_page():
+            load_page()
+            next_url = None
+            if page['next_cursor']:
+                query = params.copy()
+                query['cursor'] = page['next_cursor']
+                next_url = request.build_absolute_uri(f'{request.path}?{query.urlencode()}')
+            return json_response({
+                'results': ArticleSerializer(page['items'], many=True, fields=fields, context={'request': request}).data,
+                'next_cursor': page['next_cursor'],
+                'next': next_url,
+            })
+
+        page_key = api_page_key(request, 'articles', category, cursor, limit, ','.join(fields))
+        return cached_page_response(request, page_key, get_validators, render_page)
+
+
+class ArticleDetailView(APIView):
+    """GET /api/v1/articles/<slug>/?fields= — статья целиком (тексты тоже доступны)."""
+
+    def get(self, request, slug):
+        fields = parse_fields(request.query_params.get('fields', ''), ARTICLE_DETAIL_FIELDS, ARTICLE_DETAIL_FIELDS)
+        articles = Article.objects.filter(is_published=True, slug=slug)
+
+        def get_validators():
+            updated_at = articles.values_list('updated_at', flat=True).first()
+            if updated_at is None:
+                raise Http404("No Article matches the given query.")
+            return make_etag(API_VERSION, 'article', slug, fields, updated_at), updated_at
+
+        def render_page():
+            article = articles.only(*columns_for(fields)).first()
+            if article is None:
+                raise Http404("No Article matches the given query.")
+            return json_response(ArticleSerializer(article, fields=fields, context={'request': request}).data)
+
+        return cached_page_response(request, api_page_key(request, 'article', slug, ','.join(fields)), get_validators, render_page)
+
+
+class CategoryListView(APIView):
+    """GET /api/v1/categories/ — категории с числом опубликованных статей."""
+
+    def get(self, request):
+        counts = {}
+
+        def load_counts():
+            # GROUP BY по частичному индексу article_category_feed_idx; результат живёт в кэше до изменения статей
+            if not counts:
+                counts.update(
+                    Article.objects.filter(is_published=True).order_by().values_list('category').annotate(total=Count('pk'))
+                )
+            return counts
+
+        def get_validators():
+            return make_etag(API_VERSION, 'categories', sorted(load_counts().items())), None
+
+        def render_page():
+            return json_response({
+                'results': [
+                    {'slug': slug, 'name': name, 'article_count': load_counts().get(slug, 0)}
+                    for slug, name in CATEGORIES
+                ],
+            })
+
+        return cached_page_response(request, api_page_key(request, 'categories'), get_validators, render_page)
@@ -0,0 +1,10 @@
+from django.urls import path
+from . import api
+
+app_name = 'api' # Версия — в префиксе пути (api/v1/, см. healthpulse/urls.py)
+
+urlpatterns = [
+    path('articles/', api.ArticleListView.as_view(), name='article_list'),
+    path('articles/<slug:slug>/', api.ArticleDetailView.as_view(), name='article_detail'),
+    path('categories/', api.CategoryListView.as_view(), name='category_list'),
+]
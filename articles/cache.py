@@ -0,0 +1,116 @@
+# articles/cache.py
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+from django.utils.http import http_date
+from django.utils.safestring import mark_safe
+
+TOP_ARTICLES_CACHE_KEY = 'articles:top_articles'
+TOP_ARTICLES_COUNT = 5
+# Номер поколения кэша страниц: меняется при любом изменении статей,
+# и все старые записи страниц просто перестают находиться по ключу
+GENERATION_CACHE_KEY = 'articles:generation'
+
+
+def get_top_articles() -> dict:
+    """
+    Блок «Top Stories» для боковой панели: данные и готовый HTML-фрагмент.
+    Считается один раз и живёт в кэше, пока статьи не изменятся (см. articles/signals.py).
+    """
+    block = cache.get(TOP_ARTICLES_CACHE_KEY)
+    if block is None:
+        from .models import Article
+
+        top_articles = list(
+            Article.objects.filter(is_published=True)
+            .order_by('-published_at')
+            .values('title', 'slug', 'published_at', 'updated_at')[:TOP_ARTICLES_COUNT]
+        )
+        block = {
+            'articles': top_articles,
+            # Версия блока входит в ETag всех страниц с боковой панелью
+            'version': max((article['updated_at'] for article in top_articles), default=None),
+            'html': render_to_string('articles/_top_articles.html', {'top_articles': top_articles}),
+        }
+        cache.set(TOP_ARTICLES_CACHE_KEY, block, getattr(settings, 'ARTICLES_SIDEBAR_CACHE_TIMEOUT', 3600))
+    block['html'] = mark_safe(block['html'])
+    return block
+
+
+def invalidate_article_caches():
+    """
+    Сбрасывает всё, что закэшировано по статьям (боковую панель и страницы). Вызывается сигналами Article,
+    а также вручную после массовых операций (bulk_create/bulk_update/update сигналов не шлют).
+    """
+    cache.delete(TOP_ARTICLES_CACHE_KEY)
+    try:
+        cache.incr(GENERATION_CACHE_KEY)
+    except ValueError:
+        # Ключа нет (кэш очищен или вытеснен) — начинаем новое поколение
+        cache.set(GENERATION_CACHE_KEY, _new_generation(), None)
+
+
+def _new_generation() -> int:
+    # Начальное значение от времени, чтобы после потери ключа не вернуться к старому номеру
+    return int(time.time() * 1000)
+
+
+def get_cache_generation() -> int:
+    generation = cache.get(GENERATION_CACHE_KEY)
+    if generation is None:
+        cache.add(GENERATION_CACHE_KEY, _new_generation(), None)
+        generation = cache.get(GENERATION_CACHE_KEY, 0)
+    return generation
+
+
+def make_etag(*parts) -> str:
+    return quote_etag(hashlib.sha1('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()[:20])
+
+
+def _apply_validators(response, etag, last_modified):
+    response.headers['ETag'] = etag
+    if last_modified is not None:
+        response.headers['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, public=True, max_age=getattr(settings, 'ARTICLES_HTTP_MAX_AGE', 60))
+    return response
+
+
+def cached_page_response(request, page_key: str, get_validators, render_page):
+    """
+    Отдаёт страницу с ETag/Last-Modified и кэширует её отрисовку на сервере.
+
+    get_validators() -> (etag, last_modified: datetime | None) считается только при промахе
+    кэша; render_page() -> HttpResponse вызывается, только если клиенту нужен новый ответ.
+    Если валидаторы совпали с заголовками запроса, возвращается 304 без отрисовки.
+    Записи ключуются номером поколения, поэтому invalidate_article_caches() сбрасывает их все сразу.
+    """
+    key_hash = hashlib.sha1(page_key.encode('utf-8')).hexdigest()
+    key = f'articles:page:{get_cache_generation()}:{key_hash}'
+    entry = cache.get(key)
+
+    if entry is None:
+        etag, last_modified = get_validators()
+        timestamp = int(last_modified.timestamp()) if last_modified is not None else None
+        not_modified = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if not_modified is not None:
+            return _apply_validators(not_modified, etag, timestamp)
+        response = render_page()
+        if response.status_code == 200:
+            cache.set(key, {
+                'content': response.content,
+                'content_type': response['Content-Type'],
+                'etag': etag,
+                'last_modified': timestamp,
+            }, getattr(settings, 'ARTICLES_PAGE_CACHE_TIMEOUT', 600))
+        return _apply_validators(response, etag, timestamp)
+
+    not_modified = get_conditional_response(request, etag=entry['etag'], last_modified=entry['last_modified'])
+    if not_modified is not None:
+        return _apply_validators(not_modified, entry['etag'], entry['last_modified'])
+    response = HttpResponse(entry['content'], content_type=entry['content_type'])
+    return _apply_validators(response, entry['etag'], entry['last_modified'])
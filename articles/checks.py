@@ -0,0 +1,25 @@
+# articles/checks.py
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+# Бэкенды, у которых кэш свой в каждом процессе
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Кэши страниц и боковой панели сбрасываются из воркеров Celery; с кэшем внутри
+    процесса веб-процессы этого не видят и отдают устаревшие страницы до истечения TTL.
+    """
+    backend = settings.CACHES.get('default', {}).get('BACKEND', '')
+    if backend in PROCESS_LOCAL_CACHES:
+        return [Warning(
+            f"Кэш по умолчанию ({backend}) не общий для процессов: сброс кэшей статей из воркеров Celery не дойдёт до веб-процессов.",
+            hint="Задайте CACHE_REDIS_URL (или REDIS_URL) в окружении либо настройте CACHES на Memcached.",
+            id='articles.W001',
+        )]
+    return []
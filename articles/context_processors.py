@@ -0,0 +1,16 @@
+# articles/context_processors.py
+from django.utils.functional import SimpleLazyObject
+
+from .cache import get_top_articles
+
+
+def sidebar(request):
+    """
+    Данные боковой панели для всех шаблонов. Ленивые: кэш читается,
+    только если шаблон действительно выводит блок (например, не в админке).
+    """
+    top_articles = SimpleLazyObject(get_top_articles)
+    return {
+        'top_articles': SimpleLazyObject(lambda: top_articles['articles']),
+        'top_articles_html': SimpleLazyObject(lambda: top_articles['html']),
+    }
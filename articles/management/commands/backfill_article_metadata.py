@@ -0,0 +1,40 @@
+# articles/management/commands/backfill_article_metadata.py
+from django.core.management.base import BaseCommand
+
+from articles.cache import invalidate_article_caches
+from articles.models import Article
+
+METADATA_FIELDS = ['excerpt', 'word_count', 'reading_time']
+
+
+class Command(BaseCommand):
+    help = "Заполняет excerpt, word_count и reading_time у существующих статей."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Сколько статей обрабатывать за один запрос")
+        parser.add_argument('--all', action='store_true', help="Пересчитать у всех статей, а не только у незаполненных")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = Article.objects.all()
+        if not options['all']:
+            queryset = queryset.filter(word_count=0)
+        queryset = queryset.only('id', 'summary', 'processed_content', 'original_content').order_by('pk')
+
+        updated = 0
+        last_pk = 0
+        while True:
+            # Идём по первичному ключу, а не OFFSET'ом: обновлённые строки выпадают из фильтра
+            batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            for article in batch:
+                article.update_reading_metadata()
+            Article.objects.bulk_update(batch, METADATA_FIELDS)
+            updated += len(batch)
+            last_pk = batch[-1].pk
+            self.stdout.write(f"Обновлено статей: {updated}")
+
+        if updated:
+            invalidate_article_caches()
+        self.stdout.write(self.style.SUCCESS(f"Готово, обновлено {updated} статей"))
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:19
+
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from django.db import migrations, models
+
+# Копия articles.utils.canonicalize_url на момент миграции: живая версия может
+# измениться, а миграция должна давать тот же результат на любой базе
+TRACKING_PARAMS = {'fbclid', 'gclid', 'mc_cid', 'mc_eid', 'cmpid', 'ref'}
+
+
+def canonicalize_url(url):
+    if not url:
+        return ''
+    parts = urlsplit(url.strip())
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ''))
+
+
+def fill_canonical_urls(apps, schema_editor):
+    # Заполняем canonical_url у существующих статей. Если у нескольких статей
+    # один и тот же канонический URL, ключ получает только самая ранняя.
+    Article = apps.get_model('articles', 'Article')
+    seen = set()
+    to_update = []
+    for article in Article.objects.exclude(source_url='').order_by('id').only('id', 'source_url'):
+        canonical = canonicalize_url(article.source_url)
+        if canonical in seen:
+            continue
+        seen.add(canonical)
+        article.canonical_url = canonical
+        to_update.append(article)
+    Article.objects.bulk_update(to_update, ['canonical_url'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0003_article_source_name_article_tags'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='canonical_url',
+            field=models.CharField(blank=True, default='', editable=False, max_length=2000),
+        ),
+        migrations.RunPython(fill_canonical_urls, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='article',
+            constraint=models.UniqueConstraint(condition=models.Q(('canonical_url', ''), _negated=True), fields=('canonical_url',), name='article_unique_canonical_url'),
+        ),
+    ]
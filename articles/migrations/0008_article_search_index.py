@@ -0,0 +1,24 @@
+# Поисковый индекс FTS5 по статьям (только для SQLite, см. articles/search.py)
+
+from django.db import migrations
+
+
+def create_index(apps, schema_editor):
+    from articles.search import create_search_index
+    create_search_index(schema_editor.connection)
+
+
+def drop_index(apps, schema_editor):
+    from articles.search import drop_search_index
+    drop_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0007_article_reading_metadata'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:37
+
+from django.db import migrations, models
+from django.db.models import F, Q
+
+
+def mark_processed(apps, schema_editor):
+    # Опубликованные статьи и статьи с готовым summary в очередь LLM не ставим
+    Article = apps.get_model('articles', 'Article')
+    Article.objects.filter(Q(is_published=True) | ~Q(summary='')).update(processed_at=F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0009_article_duplicate_of'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='processed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(mark_processed, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('processed_at__isnull', True)), fields=['duplicate_of', 'id'], name='article_pending_processing_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0010_article_processed_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='thumbnails',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='thumbnails_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('image_url__gt', ''), ('thumbnails_at__isnull', True)), fields=['id'], name='article_pending_thumbnails_idx'),
+        ),
+    ]
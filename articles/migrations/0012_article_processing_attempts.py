@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 15:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0011_article_thumbnails'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='processing_attempts',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-18 15:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0012_article_processing_attempts'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='article',
+            name='article_pending_thumbnails_idx',
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('duplicate_of__isnull', True), ('image_url__gt', ''), ('is_published', True), ('thumbnails_at__isnull', True)), fields=['id'], name='article_pending_thumbnails_idx'),
+        ),
+    ]
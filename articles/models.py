@@ -1,5 +1,8 @@
 # articles/models.py
 from django.db import models
+from django.db.models import Q
+
+from .utils import allocate_slugs, build_reading_metadata, canonicalize_url
 
 CATEGORIES = [
     ('medicine', 'Medicine'),
@@ -8,13 +11,33 @@ CATEGORIES = [
     ('lifestyle', 'Lifestyle'),
 ]
 
+class ArticleQuerySet(models.QuerySet):
+    def with_canonical_url(self):
+        # То же условие, что у частичного уникального индекса, иначе база его не использует
+        return self.exclude(canonical_url='')
+
+    def pending_processing(self):
+        # Очередь LLM-обработки; идёт по частичному индексу article_pending_processing_idx
+        return self.filter(processed_at__isnull=True, duplicate_of__isnull=True)
+
+    def pending_thumbnails(self):
+        # Очередь подготовки картинок; идёт по частичному индексу article_pending_thumbnails_idx.
+        # Только опубликованные оригиналы: неопубликованные и почти-дубликаты на сайте не показываются
+        return self.filter(
+            is_published=True, duplicate_of__isnull=True,
+            thumbnails_at__isnull=True, image_url__gt='', # image_url > '' отсекает и NULL, и пустую строку
+        )
+
+
 class Article(models.Model):
     title = models.CharField(max_length=500)
     original_content = models.TextField()  # Оригинальный текст из RSS
     processed_content = models.TextField(blank=True)  # Обработанный ИИ
     summary = models.TextField(blank=True)  # Краткое содержание
     source_url = models.URLField(blank=True)  # Ссылка на ОРИГИНАЛЬНУЮ статью (уже было)
+    canonical_url = models.CharField(max_length=2000, blank=True, default='', editable=False)  # Канонический source_url, ключ дедупликации
     published_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True) # Для ETag/Last-Modified и сброса кэшей
     category = models.CharField(max_length=50, choices=CATEGORIES)
     is_published = models.BooleanField(default=True) # Для публикации/снятия с публикации
     slug = models.SlugField(unique=True, blank=True) # Для URL
@@ -23,12 +46,73 @@ class Article(models.Model):
     # author = models.CharField(max_length=200, blank=True, null=True) # <-- УДАЛЯЕМ ЭТО ПОЛЕ
     source_name = models.CharField(max_length=200, blank=True, null=True) # Название источника (например, "Medical News Today")
     tags = models.CharField(max_length=500, blank=True, null=True) # Теги (можно сделать отдельную модель, но для простоты строка)
+    # --- Считаются при записи текста (см. update_reading_metadata), чтобы список не грузил тела статей ---
+    excerpt = models.CharField(max_length=1000, blank=True, default='') # Превью на 30 слов для карточки
+    word_count = models.PositiveIntegerField(default=0)
+    reading_time = models.PositiveSmallIntegerField(default=0) # Минуты
+    processed_at = models.DateTimeField(null=True, blank=True) # Когда статью обработала LLM (llm_processing); пусто — ждёт обработки
+    processing_attempts = models.PositiveSmallIntegerField(default=0, editable=False) # Сколько раз LLM не вернула результат; после LLM_MAX_ATTEMPTS статья снимается с очереди
+    thumbnails = models.JSONField(default=dict, blank=True, editable=False) # Уменьшенные копии image_url в дисковом кэше (см. articles/thumbnails.py)
+    thumbnails_at = models.DateTimeField(null=True, blank=True, editable=False) # Когда копии подготовлены (или не удалось); пусто — ждёт обработки
+    duplicate_of = models.ForeignKey('self', null=True, blank=True, on_delete=models.SET_NULL, related_name='duplicates') # Почти-дубликат этой статьи из другого источника (MinHash/LSH при загрузке)
+
+    objects = ArticleQuerySet.as_manager()
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запоминаем загруженный source_url, чтобы save() пересчитывал canonical_url только при его изменении
+        instance._loaded_source_url = instance.__dict__.get('source_url')
+        return instance
+
     def save(self, *args, **kwargs):
         if not self.slug:
-            import re
-            self.slug = re.sub(r'[^a-zA-Z0-9]', '-', self.title.lower())
+            self.slug = allocate_slugs([self.title], Article.objects.exclude(pk=self.pk))[0]
+        if 'source_url' not in self.get_deferred_fields() and (not self.canonical_url or self.source_url != getattr(self, '_loaded_source_url', None)):
+            self.update_canonical_url()
+        self.update_reading_metadata()
         super().save(*args, **kwargs)
+        self._loaded_source_url = self.source_url
+
+    def update_canonical_url(self):
+        """
+        Пересчитывает canonical_url по source_url. Если этот ключ уже занят другой статьёй
+        (старые дубли, которым миграция 0004 оставила его пустым), оставляем пустым —
+        иначе сохранение упадёт на article_unique_canonical_url.
+        """
+        canonical = canonicalize_url(self.source_url)
+        if canonical and Article.objects.with_canonical_url().filter(canonical_url=canonical).exclude(pk=self.pk).exists():
+            canonical = ''
+        self.canonical_url = canonical
+
+    def update_reading_metadata(self):
+        """
+        Пересчитывает excerpt, word_count и reading_time. save() делает это сам;
+        при bulk_create/bulk_update вызывай вручную.
+        """
+        for field, value in build_reading_metadata(self.summary, self.processed_content, self.original_content).items():
+            setattr(self, field, value)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['canonical_url'], condition=~Q(canonical_url=''), name='article_unique_canonical_url'),
+        ]
+        indexes = [
+            # Частичные индексы только по опубликованным статьям (условие совпадает с WHERE в запросах).
+            # Лента и боковая панель: is_published=True ORDER BY published_at DESC, id DESC
+            models.Index(fields=['-published_at', '-id'], condition=Q(is_published=True), name='article_published_feed_idx'),
+            # Лента по категории: is_published=True AND category=... ORDER BY published_at DESC, id DESC
+            models.Index(fields=['category', '-published_at', '-id'], condition=Q(is_published=True), name='article_category_feed_idx'),
+            models.Index(fields=['source_url'], name='article_source_url_idx'),
+            # Очередь LLM-обработки: необработанные статьи; duplicate_of IS NULL — равенство по первой колонке, дальше порядок по id
+            models.Index(fields=['duplicate_of', 'id'], condition=Q(processed_at__isnull=True), name='article_pending_processing_idx'),
+            # Очередь подготовки картинок: опубликованные статьи с картинкой, до которых ещё не дошёл generate_pending_thumbnails
+            models.Index(
+                fields=['id'],
+                condition=Q(is_published=True, duplicate_of__isnull=True, thumbnails_at__isnull=True, image_url__gt=''),
+                name='article_pending_thumbnails_idx',
+            ),
+        ]
@@ -0,0 +1,53 @@
+# articles/pagination.py
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+
+
+def encode_cursor(article) -> str:
+    """
+    Курсор на позицию после статьи: (published_at, id), упакованный в URL-безопасную строку.
+    """
+    raw = f"{article.published_at.isoformat()}|{article.pk}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str):
+    """
+    Возвращает (published_at, id) или None, если курсор пустой или битый.
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+        published_at, pk = raw.rsplit('|', 1)
+        return datetime.fromisoformat(published_at), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def keyset_queryset(queryset, cursor: str, limit: int):
+    """
+    Срез queryset после позиции курсора по ключу (published_at, id), от новых к старым.
+    """
+    position = decode_cursor(cursor)
+    if position is not None:
+        published_at, pk = position
+        # published_at <= X отдельным условием, чтобы база искала по индексу диапазоном, а не сканировала OR
+        queryset = queryset.filter(published_at__lte=published_at).filter(Q(published_at__lt=published_at) | Q(pk__lt=pk))
+    return queryset.order_by('-published_at', '-pk')[:limit]
+
+
+def keyset_page(queryset, cursor: str, page_size: int):
+    """
+    Одна страница по ключу (published_at, id) от новых к старым.
+    В отличие от OFFSET, стоимость запроса не растёт с номером страницы.
+    Возвращает (статьи, курсор следующей страницы или None).
+    """
+    # Берём на одну запись больше, чтобы понять, есть ли следующая страница
+    items = list(keyset_queryset(queryset, cursor, page_size + 1))
+    if len(items) > page_size:
+        items = items[:page_size]
+        return items, encode_cursor(items[-1])
+    return items, None
@@ -0,0 +1,200 @@
+# articles/search.py
+import logging
+import re
+from functools import reduce
+from operator import and_
+
+from django.conf import settings
+from django.db import OperationalError, connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+FTS_TABLE = 'articles_article_fts'
+# Веса колонок для bm25 в порядке объявления в FTS-таблице: title, summary, original_content
+FTS_WEIGHTS = (10.0, 4.0, 1.0)
+# Больше слов из запроса не берём: длинные запросы только замедляют MATCH
+MAX_QUERY_TERMS = 10
+
+TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+logger = logging.getLogger(__name__)
+
+# --- FTS5-индекс и триггеры синхронизации (только SQLite) ---
+FTS_COLUMNS = ('title', 'summary', 'original_content')
+FTS_TRIGGERS = {
+    f'{FTS_TABLE}_ai': (
+        'AFTER INSERT ON articles_article BEGIN '
+        f'INSERT INTO {FTS_TABLE} (rowid, title, summary, original_content) '
+        'VALUES (new.id, new.title, new.summary, new.original_content); END'
+    ),
+    f'{FTS_TABLE}_ad': (
+        'AFTER DELETE ON articles_article BEGIN '
+        f'INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, title, summary, original_content) '
+        "VALUES ('delete', old.id, old.title, old.summary, old.original_content); END"
+    ),
+    f'{FTS_TABLE}_au': (
+        'AFTER UPDATE OF title, summary, original_content ON articles_article BEGIN '
+        f'INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, title, summary, original_content) '
+        "VALUES ('delete', old.id, old.title, old.summary, old.original_content); "
+        f'INSERT INTO {FTS_TABLE} (rowid, title, summary, original_content) '
+        'VALUES (new.id, new.title, new.summary, new.original_content); END'
+    ),
+}
+
+
+def create_search_index(conn):
+    """
+    Создаёт FTS5-таблицу поверх articles_article и заполняет её.
+    На других базах и на сборках SQLite без FTS5 ничего не делает — поиск уйдёт в icontains.
+    """
+    if conn.vendor != 'sqlite':
+        return
+    with conn.cursor() as cursor:
+        try:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                f"{', '.join(FTS_COLUMNS)}, content='articles_article', content_rowid='id', "
+                "tokenize='unicode61 remove_diacritics 2')"
+            )
+        except OperationalError as e:
+            logger.warning(f"FTS5 недоступен, поиск будет работать через LIKE: {e}")
+            return
+    ensure_search_triggers(conn, rebuild=True)
+
+
+def drop_search_index(conn):
+    if conn.vendor != 'sqlite':
+        return
+    with conn.cursor() as cursor:
+        for name in FTS_TRIGGERS:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+        cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def ensure_search_triggers(conn, rebuild=False):
+    """
+    Восстанавливает триггеры синхронизации. SQLite пересоздаёт таблицу при многих
+    миграциях (AlterField, AddField с default) и теряет триггеры вместе со старой таблицей —
+    тогда индекс перестраивается целиком, чтобы догнать пропущенные изменения.
+    """
+    if conn.vendor != 'sqlite' or FTS_TABLE not in conn.introspection.table_names():
+        return
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'articles_article'"
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = [name for name in FTS_TRIGGERS if name not in existing]
+        for name in missing:
+            cursor.execute(f'CREATE TRIGGER {name} {FTS_TRIGGERS[name]}')
+        if missing or rebuild:
+            cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')")
+            logger.info(f"Поисковый индекс {FTS_TABLE} перестроен")
+
+
+def split_query(query: str) -> list:
+    """Разбивает пользовательский запрос на слова (без операторов и кавычек)."""
+    return TERM_RE.findall(query or '')[:MAX_QUERY_TERMS]
+
+
+class BasicSearchBackend:
+    """
+    Поиск через icontains. Работает на любой базе, но сканирует тексты целиком —
+    это запасной вариант для баз без FTS5.
+    """
+
+    def filter(self, queryset, query: str):
+        """Сужает queryset до статей, в которых есть все слова запроса."""
+        terms = split_query(query)
+        if not terms:
+            return queryset.none()
+        return queryset.filter(reduce(and_, (
+            Q(title__icontains=term) | Q(summary__icontains=term) | Q(original_content__icontains=term)
+            for term in terms
+        )))
+
+    def search(self, queryset, query: str, offset: int, limit: int, max_count=None):
+        """
+        Возвращает (id статей на странице по релевантности, общее число найденных).
+        С max_count число считается не дальше max_count совпадений: точный COUNT
+        по частому слову проходит все совпавшие строки.
+        """
+        matches = self.filter(queryset, query)
+        ids = list(matches.order_by('-published_at', '-pk').values_list('pk', flat=True)[offset:offset + limit])
+        return ids, (matches[:max_count] if max_count is not None else matches).count()
+
+
+class SQLiteFTSBackend(BasicSearchBackend):
+    """
+    Поиск по FTS5-индексу articles_article_fts (см. миграцию 0008_article_search_index).
+    Индекс — external content над articles_article, его синхронизируют триггеры,
+    так что save(), bulk_create при загрузке и update() из админки попадают в него сразу.
+    Если база не SQLite или таблицы нет, работает как BasicSearchBackend.
+    """
+
+    def __init__(self):
+        self._available = None
+
+    @property
+    def available(self) -> bool:
+        if self._available is None:
+            self._available = connection.vendor == 'sqlite' and FTS_TABLE in connection.introspection.table_names()
+        return self._available
+
+    @staticmethod
+    def match_expression(query: str) -> str:
+        # Каждое слово — отдельная фраза в кавычках (операторы FTS5 из ввода не проходят),
+        # последнее — префиксом, чтобы искать по мере набора
+        terms = split_query(query)
+        if not terms:
+            return ''
+        phrases = [f'"{term}"' for term in terms]
+        phrases[-1] += '*'
+        return ' '.join(phrases)
+
+    def filter(self, queryset, query: str):
+        if not self.available:
+            return super().filter(queryset, query)
+        match = self.match_expression(query)
+        if not match:
+            return queryset.none()
+        return queryset.filter(pk__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match]))
+
+    def search(self, queryset, query: str, offset: int, limit: int, max_count=None):
+        if not self.available:
+            return super().search(queryset, query, offset, limit, max_count)
+        match = self.match_expression(query)
+        if not match:
+            return [], 0
+        # Ранжирует сам FTS5; ограничения queryset (is_published, категория) проверяем
+        # коррелированным EXISTS по первичному ключу — только для найденных строк
+        allowed = queryset.order_by().filter(pk=RawSQL(f'{FTS_TABLE}.rowid', [])).values('pk')
+        allowed_sql, allowed_params = allowed.query.sql_with_params()
+        weights = ', '.join(str(weight) for weight in FTS_WEIGHTS)
+        where = f'{FTS_TABLE} MATCH %s AND EXISTS ({allowed_sql})'
+        params = [match, *allowed_params]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {where} ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT %s OFFSET %s',
+                [*params, limit, offset],
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+            if max_count is None:
+                cursor.execute(f'SELECT COUNT(*) FROM {FTS_TABLE} WHERE {where}', params)
+            else:
+                cursor.execute(f'SELECT COUNT(*) FROM (SELECT 1 FROM {FTS_TABLE} WHERE {where} LIMIT %s)', [*params, max_count])
+            total = cursor.fetchone()[0]
+        return ids, total
+
+
+_backend = None
+
+
+def get_search_backend():
+    """Бэкенд поиска из ARTICLES_SEARCH_BACKEND (путь к классу), один на процесс."""
+    global _backend
+    if _backend is None:
+        backend_path = getattr(settings, 'ARTICLES_SEARCH_BACKEND', 'articles.search.SQLiteFTSBackend')
+        _backend = import_string(backend_path)()
+    return _backend
@@ -0,0 +1,95 @@
+# articles/serializers.py
+from django.urls import reverse
+from rest_framework import serializers
+
+from .models import Article
+from .thumbnails import FORMATS
+
+# Поля статьи в API. В списке тяжёлые текстовые поля недоступны вовсе, чтобы
+# ответы ленты оставались маленькими при любом fields=
+ARTICLE_LIST_FIELDS = ('id', 'title', 'slug', 'url', 'category', 'category_name', 'source_name', 'source_url', 'published_at', 'updated_at', 'excerpt', 'reading_time', 'word_count', 'tags', 'image')
+ARTICLE_DETAIL_FIELDS = ARTICLE_LIST_FIELDS + ('summary', 'content')
+ARTICLE_LIST_DEFAULT_FIELDS = ('id', 'title', 'slug', 'url', 'category', 'published_at', 'excerpt', 'reading_time', 'image')
+
+# Какие колонки нужны полю API (если не совпадают с именем поля); по ним строится .only()
+FIELD_COLUMNS = {
+    'url': ('slug',),
+    'category_name': ('category',),
+    'image': ('image_url', 'thumbnails'),
+    'content': ('processed_content',),
+}
+
+
+def parse_fields(value: str, allowed, default) -> tuple:
+    """
+    Разбирает параметр fields=a,b,c. Неизвестные поля — ошибка 400, а не молчаливый пропуск,
+    чтобы опечатка в клиенте была видна сразу.
+    """
+    if not value:
+        return tuple(default)
+    requested = tuple(dict.fromkeys(name.strip() for name in value.split(',') if name.strip()))
+    unknown = [name for name in requested if name not in allowed]
+    if unknown:
+        raise serializers.ValidationError({'fields': f"Неизвестные поля: {', '.join(unknown)}. Доступны: {', '.join(allowed)}"})
+    return requested or tuple(default)
+
+
+def columns_for(fields) -> list:
+    """Колонки Article для .only(): id и published_at нужны всегда (ключ курсора)."""
+    columns = {'id', 'published_at'}
+    for name in fields:
+        columns.update(FIELD_COLUMNS.get(name, (name,)))
+    return sorted(columns)
+
+
+class ArticleSerializer(serializers.ModelSerializer):
+    """
+    Статья для API v1. fields=(...) в конструкторе оставляет только эти поля
+    (sparse fieldsets): остальные не сериализуются и не читаются из БД.
+    """
+    url = serializers.SerializerMethodField()
+    category_name = serializers.CharField(source='get_category_display', read_only=True)
+    tags = serializers.SerializerMethodField()
+    image = serializers.SerializerMethodField()
+    content = serializers.CharField(source='processed_content', read_only=True)
+
+    class Meta:
+        model = Article
+        fields = ARTICLE_DETAIL_FIELDS
+        read_only_fields = ARTICLE_DETAIL_FIELDS
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    def _absolute(self, path: str) -> str:
+        request = self.context.get('request')
+        return request.build_absolute_uri(path) if request is not None else path
+
+    def get_url(self, article) -> str:
+        return self._absolute(reverse('articles:article_detail', args=[article.slug]))
+
+    def get_tags(self, article) -> list:
+        return [tag.strip() for tag in article.tags.split(',') if tag.strip()] if article.tags else []
+
+    def get_image(self, article):
+        """
+        {'src': исходная ссылка, 'variants': {'card': [{'width': 400, 'webp': url, 'jpeg': url}, ...], ...}};
+        variants пустой, пока уменьшенные копии не готовы (см. articles/thumbnails.py).
+        """
+        if not article.image_url:
+            return None
+        thumbnails = article.thumbnails or {}
+        variants = {}
+        if 'key' in thumbnails:
+            for variant, widths in thumbnails['variants'].items():
+                variants[variant] = [
+                    {'width': width, **{
+                        name: self._absolute(reverse('articles:article_image', args=[thumbnails['key'], f'{width}.{FORMATS[name][0]}']))
+                        for name in thumbnails['formats']
+                    }}
+                    for width in widths
+                ]
+        return {'src': article.image_url, 'variants': variants}
@@ -0,0 +1,21 @@
+# articles/signals.py
+from django.db import connections
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_article_caches
+from .models import Article
+from .search import ensure_search_triggers
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+def article_changed(sender, **kwargs):
+    invalidate_article_caches()
+
+
+@receiver(post_migrate)
+def restore_search_triggers(sender, using, **kwargs):
+    # Пересоздание таблицы в миграциях SQLite удаляет триггеры FTS-индекса
+    if sender.name == 'articles':
+        ensure_search_triggers(connections[using])
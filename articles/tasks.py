@@ -0,0 +1,43 @@
+# articles/tasks.py
+import logging
+
+from celery import shared_task
+from django.conf import settings
+
+from rss_feeds.coordination import acquire_lock, release_lock
+from .models import Article
+from .thumbnails import generate_thumbnails, thumbnails_available
+
+logger = logging.getLogger(__name__)
+
+LOCK_NAME = 'articles_thumbnails'
+
+
+@shared_task
+def generate_pending_thumbnails(limit=None):
+    """
+    Celery задача: готовит уменьшенные копии картинок для только что опубликованных статей
+    (Article.thumbnails_at пусто); запускается после LLM-публикации. Если очередь не опустела,
+    ставит себя заново. Блокировка LOCK_NAME (rss_feeds.coordination) не даёт двум воркерам
+    одновременно качать и пережимать одни и те же картинки.
+    """
+    if not thumbnails_available():
+        logger.info("Pillow не установлен, уменьшенные копии картинок не готовим.")
+        return
+    limit = limit or getattr(settings, 'ARTICLES_THUMBNAIL_BATCH', 50)
+    lock_token = acquire_lock(LOCK_NAME, getattr(settings, 'ARTICLES_THUMBNAIL_LOCK_TIMEOUT', 15 * 60))
+    if lock_token is None:
+        logger.info("Подготовка картинок уже идёт, пропускаем запуск.")
+        return
+    try:
+        # Новые статьи — первыми: их карточки наверху ленты
+        articles = list(Article.objects.pending_thumbnails().only('id', 'image_url').order_by('-pk')[:limit])
+        if not articles:
+            return
+        ready = generate_thumbnails(articles)
+        logger.info(f"Картинки: готово {ready} из {len(articles)}")
+    finally:
+        release_lock(LOCK_NAME, lock_token)
+
+    if Article.objects.pending_thumbnails().exists():
+        generate_pending_thumbnails.delay(limit)
@@ -0,0 +1,48 @@
+# articles/templatetags/article_images.py
+from django import template
+from django.urls import reverse
+
+from articles.thumbnails import FORMATS
+
+register = template.Library()
+
+# Как широко картинка показывается на странице — браузер выбирает ширину из srcset по этому
+SIZES = {
+    'card': '(min-width: 768px) 50vw, 100vw', # Сетка из двух колонок на md и шире
+    'hero': '100vw',
+}
+
+
+def _srcset(key: str, widths, extension: str) -> str:
+    return ', '.join(
+        f"{reverse('articles:article_image', args=[key, f'{width}.{extension}'])} {width}w" for width in widths
+    )
+
+
+@register.inclusion_tag('articles/_article_image.html')
+def article_image(article, variant, css_class='', loading='lazy'):
+    """
+    <picture> с уменьшенными копиями картинки статьи (WebP и запасной JPEG, srcset по ширинам).
+    Пока копии не готовы или Pillow нет — исходный image_url. По умолчанию loading="lazy";
+    картинке в первом экране (hero) лучше передать loading='eager'.
+    """
+    thumbnails = article.thumbnails or {}
+    widths = thumbnails.get('variants', {}).get(variant)
+    context = {'article': article, 'css_class': css_class, 'loading': loading, 'sources': [], 'src': article.image_url, 'srcset': ''}
+    if not widths or 'key' not in thumbnails:
+        return context
+    key = thumbnails['key']
+    formats = thumbnails['formats']
+    fallback = FORMATS[formats[-1]] # Последний формат — самый совместимый (JPEG)
+    context.update({
+        'sources': [
+            {'type': FORMATS[name][1], 'srcset': _srcset(key, widths, FORMATS[name][0])}
+            for name in formats[:-1]
+        ],
+        'src': reverse('articles:article_image', args=[key, f'{widths[0]}.{fallback[0]}']),
+        'srcset': _srcset(key, widths, fallback[0]),
+        'sizes': SIZES.get(variant, '100vw'),
+        'width': widths[-1],
+        'height': round(thumbnails['height'] * widths[-1] / thumbnails['width']),
+    })
+    return context
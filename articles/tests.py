@@ -1,3 +1,420 @@
-from django.test import TestCase
+import hashlib
+import io
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection
+from django.template import Context, Template
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from rss_feeds.coordination import acquire_lock, release_lock
+from .checks import check_shared_cache
+from .models import Article
+from .pagination import decode_cursor, encode_cursor, keyset_page, keyset_queryset
+from .search import BasicSearchBackend, SQLiteFTSBackend
+from .tasks import LOCK_NAME as THUMBNAILS_LOCK_NAME, generate_pending_thumbnails
+from .thumbnails import MANIFEST_NAME, Image, render_variants, store_thumbnails, thumbnail_path, thumbnails_available
+from .utils import allocate_slugs, build_reading_metadata
+
+
+# Кэш страниц в тестах — в памяти процесса, даже если в окружении задан CACHE_REDIS_URL/REDIS_URL
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class CanonicalURLTests(TestCase):
+    def create_article(self, title, source_url):
+        return Article.objects.create(title=title, original_content="text", source_url=source_url, category='medicine')
+
+    def test_legacy_duplicate_can_be_saved(self):
+        first = self.create_article("First", 'https://example.com/story?utm_source=rss')
+        self.assertEqual(first.canonical_url, 'https://example.com/story')
+        # Дубль из времён до миграции 0004: ключ ему не достался
+        legacy = self.create_article("Legacy", 'https://example.com/other')
+        Article.objects.filter(pk=legacy.pk).update(source_url='https://example.com/story', canonical_url='')
+        legacy = Article.objects.get(pk=legacy.pk)
+        legacy.title = "Legacy edited"
+        legacy.save() # Без проверки — IntegrityError на article_unique_canonical_url
+        legacy.refresh_from_db()
+        self.assertEqual((legacy.title, legacy.canonical_url), ("Legacy edited", ''))
+
+    def test_recomputed_only_when_source_changes(self):
+        article = self.create_article("Story", 'https://example.com/a')
+        article = Article.objects.get(pk=article.pk)
+        with self.assertNumQueries(1): # только UPDATE, без проверки занятости ключа
+            article.save()
+        article.source_url = 'https://EXAMPLE.com/b#comments'
+        article.save()
+        self.assertEqual(article.canonical_url, 'https://example.com/b')
+
+
+class SlugAllocationTests(TestCase):
+    def test_collisions_with_db_and_batch(self):
+        Article.objects.create(title="Vitamin D", original_content="text", category='medicine')
+        self.assertEqual(allocate_slugs(["Vitamin D", "Vitamin D", "!!!"], Article.objects.all()), ['vitamin-d-2', 'vitamin-d-3', 'article'])
+
+    def test_suffix_fits_field(self):
+        slugs = allocate_slugs(["x" * 80, "x" * 80], Article.objects.all())
+        self.assertEqual([len(slug) for slug in slugs], [50, 50])
+        self.assertEqual(slugs[1], "x" * 48 + '-2')
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        same_time = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        for i in range(7):
+            article = Article.objects.create(title=f"Article {i}", original_content="text", summary="x" * 2000, category='medicine')
+            # Несколько статей с одинаковым временем: порядок внутри них задаёт id
+            Article.objects.filter(pk=article.pk).update(published_at=same_time if i < 4 else datetime(2026, 1, i, tzinfo=timezone.utc))
+
+    def setUp(self):
+        cache.clear() # Страницы списка кэшируются между запросами
+
+    def test_cursor_roundtrip(self):
+        article = Article.objects.first()
+        self.assertEqual(decode_cursor(encode_cursor(article)), (article.published_at, article.pk))
+        for broken in ('', 'not-base64!', encode_cursor(article)[:-3]):
+            self.assertIsNone(decode_cursor(broken))
+
+    def test_pages_cover_everything_once(self):
+        seen, cursor = [], None
+        while True:
+            page, cursor = keyset_page(Article.objects.all(), cursor, 3)
+            seen.extend(page)
+            if cursor is None:
+                break
+        self.assertEqual(seen, list(Article.objects.order_by('-published_at', '-pk')))
+
+    @override_settings(ARTICLES_PAGE_SIZE=5)
+    def test_list_view(self):
+        response = self.client.get('/')
+        self.assertEqual(len(response.context['articles']), 5)
+        cursor = response.context['next_cursor']
+        self.assertContains(response, f'cursor={cursor}')
+        # Карточке хватает превью: полный текст из БД не грузится
+        self.assertEqual(response.context['articles'][0].excerpt, "x" * 2000)
+        self.assertIn('original_content', response.context['articles'][0].get_deferred_fields())
+        response = self.client.get('/', {'cursor': cursor})
+        self.assertEqual(len(response.context['articles']), 2)
+        self.assertIsNone(response.context['next_cursor'])
+
+
+@skipUnless(connection.vendor == 'sqlite', "Планы запросов проверяются на SQLite")
+class ArticleQueryPlanTests(TestCase):
+    """
+    Горячие запросы к Article должны идти по индексам: без полного скана таблицы
+    и без сортировки во временном B-дереве.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        categories = ['medicine', 'fitness', 'nutrition', 'lifestyle']
+        for i in range(40):
+            Article.objects.create(
+                title=f"Article {i}",
+                original_content="text",
+                source_url=f"https://example.com/{i}",
+                category=categories[i % 4],
+                is_published=i % 3 != 0,
+            )
+        cls.cursor = encode_cursor(Article.objects.order_by('-published_at', '-pk')[10])
+
+    def assertUsesIndex(self, queryset):
+        plan = queryset.explain()
+        self.assertNotIn('USE TEMP B-TREE', plan, plan)
+        for line in plan.splitlines():
+            if 'SCAN articles_article' in line:
+                self.assertIn('INDEX', line, plan)
+
+    def test_article_list(self):
+        published = Article.objects.filter(is_published=True)
+        self.assertUsesIndex(keyset_queryset(published, None, 21))
+        self.assertUsesIndex(keyset_queryset(published, self.cursor, 21))
+
+    def test_article_list_by_category(self):
+        published = Article.objects.filter(is_published=True, category='medicine')
+        self.assertUsesIndex(keyset_queryset(published, None, 21))
+        self.assertUsesIndex(keyset_queryset(published, self.cursor, 21))
+
+    def test_top_articles(self):
+        self.assertUsesIndex(Article.objects.filter(is_published=True).order_by('-published_at')[:5])
+
+    def test_article_detail(self):
+        self.assertUsesIndex(Article.objects.filter(slug='article-1'))
+
+    def test_ingest_dedup(self):
+        urls = ['https://example.com/1', 'https://example.com/new']
+        self.assertUsesIndex(Article.objects.with_canonical_url().filter(canonical_url__in=urls).values_list('canonical_url', flat=True))
+        self.assertUsesIndex(Article.objects.filter(source_url__in=urls))
+
+    def test_pending_processing(self):
+        self.assertUsesIndex(Article.objects.pending_processing().order_by('pk')[:100])
+
+    def test_pending_thumbnails(self):
+        self.assertUsesIndex(Article.objects.pending_thumbnails().only('id', 'image_url').order_by('-pk')[:50])
+
+    def test_cursor_pages_do_not_overlap(self):
+        published = Article.objects.filter(is_published=True)
+        first = list(keyset_queryset(published, None, 10))
+        second = list(keyset_queryset(published, encode_cursor(first[-1]), 10))
+        self.assertEqual(first + second, list(published.order_by('-published_at', '-pk')[:20]))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ArticleListViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(3):
+            Article.objects.create(
+                title=f"Article {i}",
+                original_content="text",
+                source_url=f"https://example.com/{i}",
+                category='medicine',
+                is_published=True,
+            )
+
+    def test_etag_from_page_rows(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/')
+        self.assertEqual(response.status_code, 200)
+        # Валидаторы не должны агрегировать всю выборку
+        self.assertFalse([query for query in queries if 'COUNT(' in query['sql'] or 'MAX(' in query['sql']])
+        self.assertEqual(self.client.get('/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        Article.objects.get(title="Article 1").save()
+        self.assertEqual(self.client.get('/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_detail_conditional_get(self):
+        article = Article.objects.get(title="Article 0")
+        response = self.client.get(f'/{article.slug}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(f'/{article.slug}/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.assertEqual(self.client.get('/missing-slug/').status_code, 404)
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_warns_on_process_local_cache(self):
+        self.assertEqual([warning.id for warning in check_shared_cache(None)], ['articles.W001'])
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://localhost:6379/1'}})
+    def test_shared_cache_passes(self):
+        self.assertEqual(check_shared_cache(None), [])
+
+
+class ReadingMetadataTests(SimpleTestCase):
+    def test_excerpt_prefers_summary(self):
+        metadata = build_reading_metadata("<p>Short   summary.</p>", "<p>Processed body</p>", "Original")
+        self.assertEqual(metadata['excerpt'], "Short summary.")
+        metadata = build_reading_metadata("", "<p>" + "word " * 40 + "</p>", "Original")
+        self.assertEqual(metadata['excerpt'], ' '.join(["word"] * 30) + '…')
+
+    def test_word_count_and_reading_time(self):
+        # Считаем по обработанному тексту, без него — по исходному; минуты округляются вверх
+        self.assertEqual(build_reading_metadata("", "<p>" + "word " * 201 + "</p>", "x"), {'excerpt': mock.ANY, 'word_count': 201, 'reading_time': 2})
+        self.assertEqual(build_reading_metadata("", "", "one two three")['word_count'], 3)
+        self.assertEqual(build_reading_metadata("", "", "")['reading_time'], 0)
+
+    def test_update_reading_metadata(self):
+        article = Article(title="Story", summary="Short summary.", original_content="one two three", category='medicine')
+        article.update_reading_metadata()
+        self.assertEqual((article.excerpt, article.word_count, article.reading_time), ("Short summary.", 3, 1))
+
+
+@skipUnless(connection.vendor == 'sqlite', "FTS5-индекс есть только на SQLite")
+class ArticleSearchTests(TestCase):
+    """
+    FTS5-индекс должен сам следовать за таблицей статей: save(), bulk_create, update() и delete().
+    """
+
+    def setUp(self):
+        self.backend = SQLiteFTSBackend()
+        self.assertTrue(self.backend.available)
+        self.published = Article.objects.filter(is_published=True)
+
+    def search(self, query):
+        ids, total = self.backend.search(self.published, query, 0, 10)
+        self.assertEqual(len(ids), total)
+        return ids
+
+    def test_ranking_prefers_title(self):
+        body = Article.objects.create(title="Daily walks", original_content="Vitamin D levels drop in winter.")
+        title = Article.objects.create(title="Vitamin D and sleep", original_content="A new study.")
+        self.assertEqual(self.search("vitamin"), [title.pk, body.pk])
+
+    def test_index_follows_changes(self):
+        article = Article.objects.create(title="Running tips", original_content="Warm up first.")
+        Article.objects.bulk_create([Article(title="Cycling", original_content="Warm up too.", slug='cycling')])
+        self.assertEqual(len(self.search("warm")), 2)
+
+        article.title = "Swimming tips"
+        article.save()
+        self.assertEqual(self.search("running"), [])
+        self.assertEqual(self.search("swim"), [article.pk])
+
+        Article.objects.filter(pk=article.pk).update(is_published=False)
+        self.assertEqual(self.search("swimming"), [])
+        Article.objects.filter(slug='cycling').delete()
+        self.assertEqual(self.search("warm"), [])
+
+    def test_query_syntax_is_not_interpreted(self):
+        Article.objects.create(title="Heart health", original_content="Cardio.")
+        self.assertEqual(len(self.search('heart"*(:')), 1)
+        self.assertEqual(self.search('"*'), [])
+
+    def test_admin_filter(self):
+        article = Article.objects.create(title="Sleep hygiene", original_content="Dark rooms.", is_published=False)
+        self.assertEqual(list(self.backend.filter(Article.objects.all(), "rooms")), [article])
+
+    def test_count_is_capped(self):
+        for i in range(5):
+            Article.objects.create(title=f"Protein {i}", original_content="Text.", slug=f'protein-{i}')
+        for backend in (self.backend, BasicSearchBackend()):
+            self.assertEqual(backend.search(self.published, "protein", 0, 2, max_count=3), (mock.ANY, 3))
+            self.assertEqual(backend.search(self.published, "protein", 0, 2)[1], 5)
+
+    @override_settings(ARTICLES_PAGE_SIZE=2, ARTICLES_SEARCH_MAX_RESULTS=3)
+    def test_view_clamps_page(self):
+        for i in range(5):
+            Article.objects.create(title=f"Protein {i}", original_content="Text.", slug=f'protein-{i}')
+        response = self.client.get('/search/', {'q': "protein", 'page': 10 ** 9})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['articles']), 2) # Последняя разрешённая страница, а не пустая
+        self.assertEqual((response.context['previous_page'], response.context['next_page']), (1, None))
+        self.assertContains(response, "3+ articles found")
+
+
+class ArticleAPITests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(5):
+            Article.objects.create(
+                title=f"Article {i}",
+                original_content="text",
+                processed_content="<p>text</p>",
+                source_url=f"https://example.com/{i}",
+                category='medicine',
+                is_published=i != 0,
+            )
+
+    def test_cursor_pages(self):
+        first = self.client.get('/api/v1/articles/', {'limit': 2}).json()
+        second = self.client.get(first['next']).json()
+        titles = [article['title'] for article in first['results'] + second['results']]
+        self.assertEqual(titles, ["Article 4", "Article 3", "Article 2", "Article 1"])
+        self.assertIsNone(second['next_cursor'])
+
+    def test_sparse_fields(self):
+        response = self.client.get('/api/v1/articles/', {'fields': 'id,title'})
+        self.assertEqual(set(response.json()['results'][0]), {'id', 'title'})
+        # Полный текст в списке недоступен даже по запросу
+        self.assertEqual(self.client.get('/api/v1/articles/', {'fields': 'content'}).status_code, 400)
+        detail = self.client.get('/api/v1/articles/article-1/', {'fields': 'content'}).json()
+        self.assertEqual(detail, {'content': "<p>text</p>"})
+
+    def test_etag(self):
+        response = self.client.get('/api/v1/articles/')
+        self.assertEqual(self.client.get('/api/v1/articles/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        Article.objects.filter(title="Article 4").first().save()
+        self.assertEqual(self.client.get('/api/v1/articles/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_unpublished_hidden(self):
+        self.assertEqual(self.client.get('/api/v1/articles/article-0/').status_code, 404)
+
+
+def make_image(size=(1000, 500), mode='RGBA') -> bytes:
+    buffer = io.BytesIO()
+    Image.new(mode, size, (200, 50, 50, 128) if mode == 'RGBA' else (200, 50, 50)).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class ThumbnailDirMixin:
+    def setUp(self):
+        self.thumbnail_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.thumbnail_dir, ignore_errors=True)
+        settings_override = override_settings(ARTICLES_THUMBNAIL_DIR=self.thumbnail_dir, ARTICLES_THUMBNAIL_SIZES={'card': (400, 800), 'hero': (800, 1600)})
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+@skipUnless(thumbnails_available(), "Нужен Pillow")
+class ThumbnailTests(ThumbnailDirMixin, SimpleTestCase):
+    def test_render_variants_does_not_upscale(self):
+        target_dir = Path(self.thumbnail_dir)
+        manifest = render_variants(make_image(), target_dir)
+        self.assertEqual(manifest['variants'], {'card': [400, 800], 'hero': [800, 1000]})
+        self.assertEqual((manifest['width'], manifest['height']), (1000, 500))
+        with Image.open(target_dir / '400.jpg') as image:
+            self.assertEqual((image.size, image.mode), ((400, 200), 'RGB')) # Прозрачность — на белом фоне
+        self.assertEqual(manifest['formats'][-1], 'jpeg')
+
+    def test_store_thumbnails_is_content_addressed(self):
+        image_bytes = make_image((300, 300), 'RGB')
+        manifest = store_thumbnails(image_bytes)
+        self.assertEqual(manifest['key'], hashlib.sha1(image_bytes).hexdigest())
+        self.assertTrue(thumbnail_path(manifest['key'], MANIFEST_NAME).exists())
+        # Повторно не перерисовываем: берём готовый манифест
+        with mock.patch('articles.thumbnails.render_variants') as render:
+            self.assertEqual(store_thumbnails(image_bytes), manifest)
+        render.assert_not_called()
+        self.assertEqual([path.name for path in thumbnail_path(manifest['key']).parent.iterdir()], [manifest['key']])
+
+
+class ArticleImageTests(ThumbnailDirMixin, TestCase):
+    key = 'ab' * 20
+
+    def test_serves_cached_file(self):
+        path = thumbnail_path(self.key, '400.webp')
+        path.parent.mkdir(parents=True)
+        path.write_bytes(b'RIFF')
+        response = self.client.get(f'/img/{self.key}/400.webp')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(b''.join(response.streaming_content), b'RIFF')
+
+    def test_missing_file(self):
+        self.assertEqual(self.client.get(f'/img/{self.key}/400.jpg').status_code, 404)
+        self.assertEqual(self.client.get(f'/img/{self.key}/400.png').status_code, 404)
+
+    def test_template_tag(self):
+        template = Template("{% load article_images %}{% article_image article 'card' %}")
+        article = Article(title="Story", image_url='https://example.com/photo.jpg')
+        # Копий ещё нет — исходная ссылка
+        html = template.render(Context({'article': article}))
+        self.assertIn('src="https://example.com/photo.jpg"', html)
+        self.assertNotIn('<picture', html)
+        article.thumbnails = {'key': self.key, 'width': 1000, 'height': 500, 'formats': ['webp', 'jpeg'], 'variants': {'card': [400, 800]}}
+        html = template.render(Context({'article': article}))
+        self.assertIn(f'<source type="image/webp" srcset="/img/{self.key}/400.webp 400w, /img/{self.key}/800.webp 800w"', html)
+        self.assertIn(f'src="/img/{self.key}/400.jpg"', html)
+        self.assertIn('width="800" height="400"', html)
+
+    @override_settings(RSS_COORDINATION_REDIS_URL=None)
+    def test_task_lock_is_shared(self):
+        with mock.patch('articles.tasks.thumbnails_available', return_value=True), mock.patch('articles.tasks.generate_thumbnails') as generate, \
+                mock.patch.object(generate_pending_thumbnails, 'delay'):
+            Article.objects.create(title="Story", original_content="text", source_url='https://example.com/s', category='medicine', image_url='https://example.com/photo.jpg', is_published=True)
+            token = acquire_lock(THUMBNAILS_LOCK_NAME, 60)
+            try:
+                generate_pending_thumbnails()
+            finally:
+                release_lock(THUMBNAILS_LOCK_NAME, token)
+            generate.assert_not_called()
+            generate_pending_thumbnails()
+            generate.assert_called_once()
+
+    def test_queue_skips_unpublished_and_duplicates(self):
+        def create(slug, **kwargs):
+            return Article.objects.create(title=slug, slug=slug, original_content="text", source_url=f'https://example.com/{slug}', category='medicine', image_url=f'https://example.com/{slug}.jpg', **kwargs)
+
+        original = create('original', is_published=True)
+        create('unpublished', is_published=False)
+        create('duplicate', is_published=True, duplicate_of=original)
+        Article.objects.filter(pk=create('no-image', is_published=True).pk).update(image_url='')
+        self.assertEqual(list(Article.objects.pending_thumbnails()), [original])
@@ -0,0 +1,144 @@
+# articles/thumbnails.py
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.utils import timezone
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError: # Pillow не установлен — картинки отдаются ссылками на источник, как раньше
+    Image = None
+
+from .cache import invalidate_article_caches
+from .models import Article
+
+logger = logging.getLogger(__name__)
+
+# Формат -> (расширение, Content-Type, параметры сохранения Pillow); WebP — первым, JPEG — запасной для старых браузеров
+FORMATS = {
+    'webp': ('webp', 'image/webp', {'method': 4}),
+    'jpeg': ('jpg', 'image/jpeg', {'optimize': True, 'progressive': True}),
+}
+CONTENT_TYPES = {extension: content_type for extension, content_type, _ in FORMATS.values()}
+MANIFEST_NAME = 'manifest.json'
+THUMBNAIL_FIELDS = ['thumbnails', 'thumbnails_at', 'updated_at']
+
+
+def thumbnails_available() -> bool:
+    return Image is not None
+
+
+def get_thumbnail_dir() -> Path:
+    return Path(getattr(settings, 'ARTICLES_THUMBNAIL_DIR', Path(settings.BASE_DIR) / 'cache' / 'thumbnails'))
+
+
+def thumbnail_path(key: str, name: str = '') -> Path:
+    # Две первые буквы хэша — подкаталог, чтобы в одном каталоге не копились десятки тысяч записей
+    return get_thumbnail_dir() / key[:2] / key / name
+
+
+def available_formats() -> list:
+    return [name for name in FORMATS if name != 'webp' or features.check('webp')]
+
+
+def render_variants(image_bytes: bytes, target_dir: Path) -> dict:
+    """
+    Сохраняет уменьшенные копии картинки в target_dir: для каждого варианта из
+    ARTICLES_THUMBNAIL_SIZES (card, hero) — по ширинам, но не больше оригинала,
+    в каждом доступном формате. Возвращает описание для Article.thumbnails.
+    """
+    quality = getattr(settings, 'ARTICLES_THUMBNAIL_QUALITY', 80)
+    sizes = getattr(settings, 'ARTICLES_THUMBNAIL_SIZES', {'card': (400, 800), 'hero': (800, 1600)})
+    with Image.open(io.BytesIO(image_bytes)) as source:
+        image = ImageOps.exif_transpose(source) # Фото с телефонов хранят поворот в EXIF
+        if image.mode not in ('RGB', 'L'):
+            # JPEG без прозрачности: подкладываем белый фон
+            background = Image.new('RGB', image.size, 'white')
+            image = image.convert('RGBA')
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+        width, height = image.size
+        formats = available_formats()
+        variants = {}
+        for variant, widths in sizes.items():
+            # Не увеличиваем: если оригинал уже, остаётся одна копия его ширины
+            variant_widths = sorted({min(target, width) for target in widths})
+            for target in variant_widths:
+                resized = image if target == width else image.resize((target, max(1, round(height * target / width))), Image.LANCZOS)
+                for name in formats:
+                    extension, _, options = FORMATS[name]
+                    resized.save(target_dir / f'{target}.{extension}', format=name.upper(), quality=quality, **options)
+            variants[variant] = variant_widths
+    return {'width': width, 'height': height, 'formats': formats, 'variants': variants}
+
+
+def store_thumbnails(image_bytes: bytes) -> dict:
+    """
+    Кладёт варианты картинки в дисковый кэш по хэшу содержимого. Одна и та же
+    картинка у разных статей (логотип источника, перепечатки) обрабатывается один раз.
+    Каталог собирается во временном месте и переименовывается целиком, так что
+    параллельные воркеры не видят его наполовину записанным.
+    """
+    key = hashlib.sha1(image_bytes).hexdigest()
+    final_dir = thumbnail_path(key)
+    manifest_path = final_dir / MANIFEST_NAME
+    if manifest_path.exists():
+        return json.loads(manifest_path.read_text(encoding='utf-8'))
+
+    final_dir.parent.mkdir(parents=True, exist_ok=True)
+    work_dir = Path(tempfile.mkdtemp(prefix=f'.{key}-', dir=final_dir.parent))
+    try:
+        manifest = {'key': key, **render_variants(image_bytes, work_dir)}
+        (work_dir / MANIFEST_NAME).write_text(json.dumps(manifest), encoding='utf-8')
+        try:
+            os.rename(work_dir, final_dir)
+        except OSError:
+            # Другой воркер успел первым — его копия ничем не хуже
+            if not manifest_path.exists():
+                raise
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return manifest
+
+
+def fetch_thumbnails(image_url: str) -> dict:
+    from rss_feeds.fetcher import get_shared_throttle
+    from rss_feeds.http_client import http_get
+
+    # Картинки качаем с тех же сайтов, что и страницы, — с той же паузой на хост
+    get_shared_throttle().wait(urlparse(image_url).netloc.lower())
+    response = http_get(image_url, max_bytes=getattr(settings, 'ARTICLES_THUMBNAIL_MAX_SOURCE_BYTES', 10 * 1024 * 1024))
+    response.raise_for_status()
+    return store_thumbnails(response.content)
+
+
+def generate_thumbnails(articles) -> int:
+    """
+    Качает картинки статей и сохраняет их уменьшенные копии. Статьи с ошибкой
+    тоже отмечаются (thumbnails = {'error': ...}), чтобы не качать битую ссылку
+    на каждом прогоне; шаблоны для них показывают исходный image_url.
+    Возвращает число статей с готовыми копиями.
+    """
+    now = timezone.now()
+    ready = 0
+    for article in articles:
+        try:
+            article.thumbnails = fetch_thumbnails(article.image_url)
+            ready += 1
+        except Exception as e:
+            logger.warning(f"Не удалось подготовить картинку статьи {article.pk} ({article.image_url}): {e}")
+            article.thumbnails = {'error': str(e)[:200]}
+        article.thumbnails_at = now
+        article.updated_at = now # Меняет ETag страниц со статьёй
+    if articles:
+        Article.objects.bulk_update(articles, THUMBNAIL_FIELDS, batch_size=200)
+        invalidate_article_caches() # bulk_update не шлёт post_save
+    return ready
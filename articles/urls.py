@@ -1,9 +1,11 @@
-from django.urls import path
+from django.urls import path, re_path
 from . import views
 
 app_name = 'articles' # Указываем app_name для namespace
 
 urlpatterns = [
     path('', views.article_list, name='article_list'),
+    path('search/', views.article_search, name='article_search'), # До slug, иначе «search» примется за статью
+    re_path(r'^img/(?P<key>[0-9a-f]{40})/(?P<name>[0-9]+\.(?:webp|jpg))$', views.article_image, name='article_image'),
     path('<slug:slug>/', views.article_detail, name='article_detail'),
 ]
\ No newline at end of file
@@ -0,0 +1,82 @@
+# articles/utils.py
+import re
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from django.db.models import Q
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+# Параметры запроса, которые не влияют на содержимое страницы
+TRACKING_PARAMS = {'fbclid', 'gclid', 'mc_cid', 'mc_eid', 'cmpid', 'ref'}
+
+SLUG_MAX_LENGTH = 50 # Совпадает с max_length у Article.slug
+
+EXCERPT_WORDS = 30 # Столько слов показывает карточка в списке
+WORDS_PER_MINUTE = 200 # Скорость чтения для оценки reading_time
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Приводит URL статьи к каноническому виду: схема и хост в нижнем регистре,
+    без фрагмента, без utm_* и прочих трекинговых параметров, параметры отсортированы.
+    """
+    if not url:
+        return ''
+    parts = urlsplit(url.strip())
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ''))
+
+
+def build_slug_base(title: str) -> str:
+    """
+    Базовый slug из заголовка (та же схема, что и раньше в Article.save), обрезанный до длины поля.
+    """
+    slug = re.sub(r'[^a-zA-Z0-9]', '-', (title or '').lower())[:SLUG_MAX_LENGTH]
+    return slug if slug.strip('-') else 'article'
+
+
+def allocate_slugs(titles, queryset) -> list:
+    """
+    Подбирает уникальные slug'и сразу для пачки заголовков.
+    Одним запросом получает занятые slug'и с теми же префиксами, а коллизии
+    (и с базой, и внутри пачки) разрешает в памяти суффиксами -2, -3, ...
+    """
+    bases = [build_slug_base(title) for title in titles]
+    if not bases:
+        return []
+
+    prefix_filter = Q()
+    for base in set(bases):
+        prefix_filter |= Q(slug__startswith=base[:SLUG_MAX_LENGTH - 6])
+    taken = set(queryset.filter(prefix_filter).values_list('slug', flat=True))
+
+    slugs = []
+    for base in bases:
+        slug = base
+        counter = 2
+        while slug in taken:
+            suffix = f'-{counter}'
+            slug = base[:SLUG_MAX_LENGTH - len(suffix)] + suffix
+            counter += 1
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def build_reading_metadata(summary: str, processed_content: str, original_content: str) -> dict:
+    """
+    Превью для карточки (30 слов из summary, иначе из processed_content),
+    число слов основного текста и время чтения в минутах.
+    """
+    excerpt_source = strip_tags(summary or '').strip() or strip_tags(processed_content or '').strip()
+    body = strip_tags(processed_content or '').strip() or (original_content or '')
+    word_count = len(body.split())
+    return {
+        'excerpt': Truncator(' '.join(excerpt_source.split())).words(EXCERPT_WORDS),
+        'word_count': word_count,
+        'reading_time': -(-word_count // WORDS_PER_MINUTE) if word_count else 0,
+    }
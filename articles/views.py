@@ -1,6 +1,18 @@
 # articles/views.py
+import math
+
+from django.conf import settings
+from django.http import FileResponse, Http404
 from django.shortcuts import render, get_object_or_404
+from django.views.decorators.http import require_GET
+from .cache import cached_page_response, get_top_articles, make_etag
 from .models import Article, CATEGORIES # Импортируем CATEGORIES
+from .pagination import keyset_page
+from .search import get_search_backend
+from .thumbnails import CONTENT_TYPES, thumbnail_path
+
+# Поля, которые нужны карточке в списке; тяжёлые текстовые колонки не грузим
+ARTICLE_CARD_FIELDS = ('id', 'title', 'slug', 'image_url', 'thumbnails', 'category', 'published_at', 'excerpt', 'reading_time')
 
 def article_list(request):
     category = request.GET.get('category')
@@ -13,15 +25,96 @@ def article_list(request):
             articles = Article.objects.none()
     else:
         articles = Article.objects.filter(is_published=True).order_by('-published_at')
+    cursor = request.GET.get('cursor') or ''
+
+    page = {}
+
+    def load_page():
+        # Страница читается один раз и нужна и валидаторам, и отрисовке
+        if not page:
+            # Для карточки берём только нужные колонки: превью посчитано заранее (Article.excerpt);
+            # updated_at — для ETag
+            page_articles = articles.only(*ARTICLE_CARD_FIELDS, 'updated_at')
+            page_size = getattr(settings, 'ARTICLES_PAGE_SIZE', 20)
+            page['articles'], page['next_cursor'] = keyset_page(page_articles, cursor, page_size)
+        return page
+
+    def get_validators():
+        # ETag по строкам самой страницы, без MAX/COUNT по всей выборке: страница меняется,
+        # если изменилась/добавилась/пропала статья на ней, сменился следующий курсор или боковая панель
+        page_articles = load_page()['articles']
+        versions = [(article.pk, article.updated_at) for article in page_articles]
+        sidebar_version = get_top_articles()['version']
+        latest = max((article.updated_at for article in page_articles), default=None)
+        last_modified = max(filter(None, [latest, sidebar_version]), default=None)
+        return make_etag('list', category, cursor, versions, page['next_cursor'], sidebar_version), last_modified
 
-    # Получаем топ-5 статей (например, по дате публикации)
-    top_articles = Article.objects.filter(is_published=True).order_by('-published_at')[:5]
+    def render_page():
+        load_page()
+        return render(request, 'articles/list.html', {
+            'articles': page['articles'],
+            'category': category,
+            'next_cursor': page['next_cursor'],
+        })
 
-    return render(request, 'articles/list.html', {'articles': articles, 'top_articles': top_articles})
+    return cached_page_response(request, f'list:{category}:{cursor}', get_validators, render_page)
+
+def article_search(request):
+    query = request.GET.get('q', '').strip()
+    page_size = getattr(settings, 'ARTICLES_PAGE_SIZE', 20)
+    # Глубже ARTICLES_SEARCH_MAX_RESULTS не листаем и дальше не считаем: OFFSET и COUNT
+    # по частому слову проходят все совпадения, а такие страницы всё равно никто не открывает
+    max_results = getattr(settings, 'ARTICLES_SEARCH_MAX_RESULTS', 1000)
+    max_page = max(1, math.ceil(max_results / page_size))
+    try:
+        page = min(max(1, int(request.GET.get('page', 1))), max_page)
+    except ValueError:
+        page = 1
+    articles, total = [], 0
+    if query:
+        ids, total = get_search_backend().search(
+            Article.objects.filter(is_published=True), query, (page - 1) * page_size, page_size, max_count=max_results + 1
+        )
+        # Бэкенд отдаёт id по релевантности, сами карточки добираем одним запросом
+        by_id = Article.objects.only(*ARTICLE_CARD_FIELDS).in_bulk(ids)
+        articles = [by_id[pk] for pk in ids if pk in by_id]
+    return render(request, 'articles/search.html', {
+        'query': query,
+        'articles': articles,
+        'total': min(total, max_results),
+        'total_capped': total > max_results, # Показываем «1000+»
+        'previous_page': page - 1 if page > 1 else None,
+        'next_page': page + 1 if page * page_size < total and page < max_page else None,
+    })
 
 def article_detail(request, slug):
-    # Используем get_object_or_404 для лучшей обработки ошибок
-    article = get_object_or_404(Article, slug=slug)
-    # Разбиваем теги в представлении
-    tags_list = [tag.strip() for tag in article.tags.split(',')] if article.tags else []
-    return render(request, 'articles/detail.html', {'article': article, 'tags_list': tags_list})
+    def get_validators():
+        updated_at = Article.objects.filter(slug=slug).values_list('updated_at', flat=True).first()
+        if updated_at is None:
+            raise Http404("No Article matches the given query.")
+        sidebar_version = get_top_articles()['version']
+        return make_etag('detail', slug, updated_at, sidebar_version), max(filter(None, [updated_at, sidebar_version]))
+
+    def render_page():
+        # Используем get_object_or_404 для лучшей обработки ошибок
+        article = get_object_or_404(Article, slug=slug)
+        # Разбиваем теги в представлении
+        tags_list = [tag.strip() for tag in article.tags.split(',')] if article.tags else []
+        return render(request, 'articles/detail.html', {'article': article, 'tags_list': tags_list})
+
+    return cached_page_response(request, f'detail:{slug}', get_validators, render_page)
+
+@require_GET
+def article_image(request, key, name):
+    """
+    Уменьшенная копия картинки статьи из дискового кэша (см. articles/thumbnails.py).
+    Адрес зависит от содержимого, поэтому ответ кэшируется навсегда (immutable).
+    В продакшене каталог ARTICLES_THUMBNAIL_DIR лучше отдавать веб-сервером с теми же заголовками.
+    """
+    path = thumbnail_path(key, name)
+    try:
+        response = FileResponse(open(path, 'rb'), content_type=CONTENT_TYPES[name.rsplit('.', 1)[1]])
+    except FileNotFoundError:
+        raise Http404("No such image.")
+    response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
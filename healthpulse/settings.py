@@ -43,6 +43,7 @@ INSTALLED_APPS = [
     'rss_feeds',     
     'llm_processing',
     'django_htmx', 
+    'rest_framework',
 ]
 
 MIDDLEWARE = [
@@ -67,6 +68,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'articles.context_processors.sidebar',
             ],
         },
     },
@@ -77,6 +79,25 @@ WSGI_APPLICATION = 'healthpulse.wsgi.application'
 # healthpulse/settings.py
 # ... остальные настройки ...
 
+# --- Кэш ---
+# Кэш должен быть общим для веб-процессов и воркеров Celery: воркеры (LLM-публикация, загрузка, картинки)
+# вызывают invalidate_article_caches(), и сброс должны увидеть все процессы. Поэтому в рабочем окружении задайте
+# CACHE_REDIS_URL (или REDIS_URL), например redis://localhost:6379/1 — отдельная база Redis, не брокер Celery.
+# Без них — LocMemCache: свой в каждом процессе, годится для разработки и тестов
+# (manage.py check --deploy предупредит, см. articles/checks.py).
+CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL') or os.environ.get('REDIS_URL')
+if CACHE_REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_REDIS_URL,
+            'KEY_PREFIX': 'healthpulse',
+        }
+    }
+else:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+# --- /Кэш ---
+
 # --- Настройки Celery ---
 CELERY_BROKER_URL = 'redis://localhost:6379/0' # Убедись, что Redis запущен
 CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
@@ -84,8 +105,118 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'UTC' # Или ваш часовой пояс
+# Сетевые и вычислительные стадии — в разных очередях, чтобы масштабировать и настраивать их отдельно:
+#   celery -A healthpulse worker -Q feeds,celery -c 4                                     # ленты и тики beat'а
+#   celery -A healthpulse worker -Q pages -P threads -c 32 --prefetch-multiplier 4        # страницы статей (ждут сеть)
+#   celery -A healthpulse worker -Q ingest,llm -c 2 --prefetch-multiplier 1               # сохранение, MinHash, LLM
+CELERY_TASK_ROUTES = {
+    'rss_feeds.tasks.fetch_all_active_feeds': {'queue': 'feeds'},
+    'rss_feeds.tasks.fetch_and_store_articles_from_feed': {'queue': 'feeds'},
+    'rss_feeds.tasks.extract_article': {'queue': 'pages'},
+    'articles.tasks.generate_pending_thumbnails': {'queue': 'pages'}, # Тоже ждёт сеть (картинки с сайтов-источников)
+    'rss_feeds.tasks.store_feed_articles': {'queue': 'ingest'},
+    'llm_processing.tasks.process_pending_articles': {'queue': 'llm'},
+}
+CELERY_BEAT_SCHEDULE = {
+    # Тик дешёвый (один запрос по индексу next_fetch_at), поэтому проверяем очередь лент каждую минуту
+    'fetch-due-feeds': {
+        'task': 'rss_feeds.tasks.fetch_all_active_feeds',
+        'schedule': 60.0,
+    },
+}
 # --- /Настройки Celery ---
 
+# --- Настройки ленты статей ---
+ARTICLES_PAGE_SIZE = 20 # Статей на странице списка
+ARTICLES_SIDEBAR_CACHE_TIMEOUT = 3600 # Страховочный TTL блока «Top Stories»; обычно сбрасывается сигналами
+ARTICLES_PAGE_CACHE_TIMEOUT = 600 # Сколько хранить отрисованные страницы списка/статьи (сбрасываются при изменении статей)
+ARTICLES_HTTP_MAX_AGE = 60 # Cache-Control: max-age для браузеров и CDN, в секундах
+ARTICLES_SEARCH_BACKEND = 'articles.search.SQLiteFTSBackend' # На SQLite без FTS5 и других базах сам откатывается на icontains
+ARTICLES_SEARCH_MAX_RESULTS = 1000 # Больше результатов поиска не считаем и не листаем (?page= ограничивается)
+ARTICLES_API_PAGE_SIZE = 20 # Статей на странице API по умолчанию (?limit=)
+ARTICLES_API_MAX_PAGE_SIZE = 100
+ARTICLES_THUMBNAIL_DIR = BASE_DIR / 'cache' / 'thumbnails' # Дисковый кэш уменьшенных копий картинок (по хэшу содержимого); нужен Pillow
+ARTICLES_THUMBNAIL_SIZES = {'card': (400, 800), 'hero': (800, 1600)} # Ширины копий для srcset: карточка в списке и баннер статьи
+ARTICLES_THUMBNAIL_QUALITY = 80 # Качество WebP/JPEG
+ARTICLES_THUMBNAIL_MAX_SOURCE_BYTES = 10 * 1024 * 1024 # Исходные картинки больше этого не качаем
+ARTICLES_THUMBNAIL_BATCH = 50 # Статей за один прогон задачи generate_pending_thumbnails
+# --- /Настройки ленты статей ---
+
+# --- Настройки API (Django REST framework) ---
+REST_FRAMEWORK = {
+    # API только на чтение и публичное: без сессий и пользователей, ответы — только JSON
+    'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer'],
+    'DEFAULT_PARSER_CLASSES': ['rest_framework.parsers.JSONParser'],
+    'DEFAULT_AUTHENTICATION_CLASSES': [],
+    'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.AllowAny'],
+    'UNAUTHENTICATED_USER': None,
+}
+# --- /Настройки API ---
+
+# --- Настройки загрузки страниц статей ---
+RSS_FETCH_MAX_WORKERS = 8 # Сколько страниц ленты качаем одновременно (всего)
+RSS_FETCH_PER_HOST_CONCURRENCY = 1 # Сколько одновременных запросов к одному хосту
+RSS_FETCH_PER_HOST_INTERVAL = 1.0 # Минимальная пауза между запросами к одному хосту, в секундах
+RSS_PAGE_CACHE_PATH = BASE_DIR / 'cache' / 'pages.sqlite3' # Дисковый кэш страниц и результатов извлечения (None — выключить)
+RSS_PAGE_CACHE_MAX_BYTES = 512 * 1024 * 1024 # Лимит размера кэша (сжатые данные), дальше — вытеснение LRU
+RSS_PAGE_CACHE_TTL = 7 * 24 * 3600 # Время жизни записи в кэше, в секундах
+RSS_BOILERPLATE_PHRASES = [ # Фразы-мусор, которые вырезаются из текста статей; "..." — разрыв до RSS_BOILERPLATE_MAX_GAP символов в пределах предложения
+    'sign up for ... newsletter',
+    'subscribe ... here',
+    'click ... more',
+    'read more',
+    'advertisement',
+    'sponsored content',
+]
+RSS_BOILERPLATE_MAX_GAP = 60
+RSS_SELECTOR_REGISTRY_TTL = 300 # Как часто (в секундах) перечитывать селекторы источников из БД
+RSS_POLL_MIN_INTERVAL = 15 # Границы адаптивного интервала опроса ленты, в минутах
+RSS_POLL_MAX_INTERVAL = 24 * 60
+RSS_POLL_TARGET_NEW_ARTICLES = 1 # Интервал подбирается так, чтобы на опрос приходилось столько новых статей
+RSS_POLL_MAX_GROWTH = 2 # Во сколько раз интервал может вырасти за один опрос (сокращается сразу)
+RSS_POLL_MAX_BACKOFF = 24 * 60 # Потолок экспоненциальной задержки после ошибок, в минутах
+RSS_POLL_JITTER = 0.1 # Случайный разброс интервала (±10%), чтобы ленты не опрашивались одним тиком
+RSS_POLL_MAX_DISPATCH = 100 # Сколько лент ставить в очередь за один тик fetch_all_active_feeds
+RSS_POLL_DISPATCH_LEASE = 30 # На сколько минут откладывать next_fetch_at у поставленных в очередь лент
+RSS_NEAR_DUPLICATE_ACTION = 'flag' # Почти-дубликаты при загрузке: 'flag' — сохранить с duplicate_of (без LLM и публикации), 'skip' — не сохранять, None — не искать
+RSS_NEAR_DUPLICATE_THRESHOLD = 0.8 # Минимальная оценка похожести по Жаккару (MinHash), чтобы считать статью дубликатом
+RSS_COORDINATION_REDIS_URL = CELERY_BROKER_URL # Блокировки лент, ключи идемпотентности и общий троттлинг хостов; None — через кэш Django
+RSS_FEED_LOCK_TIMEOUT = 15 * 60 # Сколько держится блокировка ленты, если конвейер не дошёл до конца, в секундах; плюс худшее время на каждую статью (см. feed_lock_timeout)
+RSS_INGEST_IDEMPOTENCY_TTL = 24 * 3600 # Сколько помнить уже сохранённые версии лент, в секундах
+# Если задан, /metrics отдаётся только с Authorization: Bearer <токен>. Без токена /metrics отвечает только
+# на внутренние адреса (loopback и частные сети); за обратным прокси REMOTE_ADDR — адрес прокси, так что там токен обязателен
+RSS_METRICS_TOKEN = os.environ.get('RSS_METRICS_TOKEN', '')
+RSS_PROFILE_SAMPLE_RATE = 0 # Доля страниц, извлечение которых профилируется cProfile (0 — выключено)
+RSS_PROFILE_SLOW_SECONDS = 2.0 # Профиль сохраняется, только если страница обрабатывалась дольше, в секундах
+RSS_PROFILE_DIR = BASE_DIR / 'cache' / 'profiles' # Куда писать .prof медленных страниц
+RSS_SEEN_URLS_REDIS_URL = None # Например 'redis://localhost:6379/1': Redis-множество известных URL перед запросом к БД
+RSS_SEEN_URLS_TTL = 30 * 24 * 60 * 60 # Сколько секунд URL хранится в этом множестве; дальше проверка идёт по БД
+RSS_HTTP_POOL_CONNECTIONS = 32 # Сколько хостов держим в пуле keep-alive соединений
+RSS_HTTP_POOL_MAXSIZE = RSS_FETCH_MAX_WORKERS # Соединений на один хост в пуле
+RSS_HTTP_CONNECT_TIMEOUT = 5 # Таймаут установки соединения, в секундах
+RSS_HTTP_READ_TIMEOUT = 15 # Таймаут чтения ответа, в секундах
+RSS_HTTP_MAX_RESPONSE_BYTES = 5 * 1024 * 1024 # Ответы больше этого (после распаковки) обрываем
+# --- /Настройки загрузки страниц статей ---
+
+# --- Настройки LLM-обработки статей ---
+LLM_BACKEND = 'llm_processing.backends.StubLLMBackend' # Для реального API: 'llm_processing.backends.OpenAIChatBackend'
+LLM_API_URL = 'https://api.openai.com/v1/chat/completions' # Любой OpenAI-совместимый endpoint
+LLM_API_KEY = os.environ.get('LLM_API_KEY', '')
+LLM_MODEL = 'gpt-4o-mini'
+LLM_REQUEST_TIMEOUT = 120 # Таймаут одного запроса к API, в секундах
+LLM_MAX_CONCURRENCY = 4 # Сколько пачек отправлять параллельно в одном воркере
+LLM_REQUESTS_PER_MINUTE = 60 # Лимиты провайдера на один воркер (token bucket)
+LLM_TOKENS_PER_MINUTE = 90000
+LLM_MAX_BATCH_ARTICLES = 5 # Статей в одном запросе
+LLM_MAX_BATCH_TOKENS = 6000 # Входных токенов в одном запросе
+LLM_MAX_ARTICLE_TOKENS = 1500 # Длиннее текст статьи обрезается
+LLM_PROCESSING_LIMIT = 100 # Статей за один прогон задачи process_pending_articles
+LLM_PROCESSING_LOCK_TIMEOUT = 30 * 60 # Сколько держится блокировка прогона, если воркер упал, в секундах
+LLM_MAX_ATTEMPTS = 3 # Сколько раз статья может не вернуться в ответе LLM, прежде чем её снимут с очереди
+LLM_RESULT_CACHE_MAX_BYTES = 256 * 1024 * 1024 # Лимит кэша результатов LLM в БД, дальше — вытеснение LRU; 0 — кэш выключен
+LLM_STUB_LATENCY = 0.0 # Искусственная задержка заглушки на пачку, в секундах (для нагрузочных прогонов)
+# --- /Настройки LLM-обработки статей ---
+
 # ... остальные настройки ...
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -17,7 +17,11 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from rss_feeds.views import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'), # Без слэша — путь по умолчанию для Prometheus
+    path('api/v1/', include('articles.api_urls', namespace='api-v1')),
     path('', include('articles.urls', namespace='articles')),
 ]
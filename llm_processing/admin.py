@@ -1,3 +1,25 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import CachedResult, ProcessingRun
+
+
+@admin.register(ProcessingRun)
+class ProcessingRunAdmin(admin.ModelAdmin):
+    list_display = ('started_at', 'backend', 'model', 'articles_processed', 'articles_failed', 'articles_dropped', 'batches', 'duration', 'throughput', 'hit_rate')
+    list_filter = ('backend', 'model')
+    readonly_fields = [field.name for field in ProcessingRun._meta.fields]
+
+    @admin.display(description="Статей/мин")
+    def throughput(self, obj):
+        return f"{obj.articles_per_minute:.1f}"
+
+    @admin.display(description="Кэш, %")
+    def hit_rate(self, obj):
+        return f"{obj.cache_hit_rate:.0%}"
+
+
+@admin.register(CachedResult)
+class CachedResultAdmin(admin.ModelAdmin):
+    list_display = ('key', 'model', 'prompt_version', 'hits', 'size', 'last_used_at')
+    list_filter = ('model', 'prompt_version')
+    readonly_fields = [field.name for field in CachedResult._meta.fields]
@@ -0,0 +1,145 @@
+# llm_processing/backends.py
+import html
+import json
+import logging
+import re
+import time
+from collections import Counter
+
+import requests
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Версия промпта: меняется при любой правке инструкций, чтобы результаты разных версий не смешивались
+PROMPT_VERSION = 1
+
+SYSTEM_PROMPT = (
+    "You are an editor of a health news site. For every article in the input JSON array "
+    "write a neutral summary of 2-3 sentences, rewrite the text as clean readable HTML "
+    "(only <p>, <h2>, <h3>, <ul>, <ol>, <li>, <strong>, <em>, <blockquote>) without ads, "
+    "navigation or author bios, and pick 3-5 short lowercase topic tags. "
+    'Answer with a JSON object {"articles": [{"id": <id>, "summary": "...", '
+    '"content_html": "...", "tags": ["..."]}]} with one entry per input article.'
+)
+
+# Примерная длина ответа на одну статью — для лимита токенов в минуту
+EXPECTED_OUTPUT_TOKENS = 700
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 символа на токен для английского текста; точный токенизатор здесь не нужен
+    return len(text) // 4 + 1
+
+
+class BaseLLMBackend:
+    """
+    Интерфейс бэкенда: process_batch получает пачку статей
+    [{'id', 'title', 'text'}] и возвращает
+    {'results': {id: {'summary', 'processed_content', 'tags'}}, 'prompt_tokens', 'completion_tokens'}.
+    Статьи, которых нет в results, считаются необработанными.
+    """
+    name = 'base'
+
+    @property
+    def model_id(self) -> str:
+        return self.name
+
+    def process_batch(self, items: list) -> dict:
+        raise NotImplementedError
+
+
+class StubLLMBackend(BaseLLMBackend):
+    """
+    Локальная заглушка без сети: summary — первые предложения, текст — абзацы в <p>,
+    теги — частые длинные слова. Задержка LLM_STUB_LATENCY имитирует ответ API для нагрузочных прогонов.
+    """
+    name = 'stub'
+
+    SENTENCE_RE = re.compile(r'(?<=[.!?])\s+')
+    TAG_WORD_RE = re.compile(r'[a-z]{6,}')
+
+    def process_batch(self, items: list) -> dict:
+        latency = getattr(settings, 'LLM_STUB_LATENCY', 0.0)
+        if latency:
+            time.sleep(latency)
+        results = {}
+        completion_tokens = 0
+        for item in items:
+            text = item['text'].strip()
+            summary = ' '.join(self.SENTENCE_RE.split(text)[:2])[:600]
+            paragraphs = [line.strip() for line in text.splitlines() if line.strip()]
+            content = ''.join(f'<p>{html.escape(paragraph)}</p>' for paragraph in paragraphs)
+            words = Counter(self.TAG_WORD_RE.findall(text.lower()))
+            tags = [word for word, _ in words.most_common(3)]
+            results[item['id']] = {'summary': summary, 'processed_content': content, 'tags': tags}
+            completion_tokens += estimate_tokens(summary) + estimate_tokens(content)
+        return {
+            'results': results,
+            'prompt_tokens': sum(estimate_tokens(item['text']) for item in items),
+            'completion_tokens': completion_tokens,
+        }
+
+
+class OpenAIChatBackend(BaseLLMBackend):
+    """
+    Любой API, совместимый с OpenAI Chat Completions (LLM_API_URL, LLM_API_KEY, LLM_MODEL).
+    Пачка статей уходит одним запросом, ответ — JSON-объект со статьями.
+    """
+    name = 'openai'
+
+    def __init__(self):
+        self.api_url = getattr(settings, 'LLM_API_URL', 'https://api.openai.com/v1/chat/completions')
+        self.model = getattr(settings, 'LLM_MODEL', 'gpt-4o-mini')
+        self.timeout = getattr(settings, 'LLM_REQUEST_TIMEOUT', 120)
+        self.session = requests.Session()
+        self.session.headers.update({'Authorization': f"Bearer {getattr(settings, 'LLM_API_KEY', '')}"})
+
+    @property
+    def model_id(self) -> str:
+        return self.model
+
+    def process_batch(self, items: list) -> dict:
+        payload = {
+            'model': self.model,
+            'response_format': {'type': 'json_object'},
+            'temperature': 0.2,
+            'messages': [
+                {'role': 'system', 'content': SYSTEM_PROMPT},
+                {'role': 'user', 'content': json.dumps(items, ensure_ascii=False)},
+            ],
+        }
+        response = self.session.post(self.api_url, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        data = response.json()
+        usage = data.get('usage', {})
+        answer = json.loads(data['choices'][0]['message']['content'])
+
+        expected = {item['id'] for item in items}
+        results = {}
+        for entry in answer.get('articles', []):
+            # Модели иногда возвращают id строкой ("12"): приводим к int, пропускаем только то, что не приводится
+            try:
+                article_id = int(entry.get('id'))
+            except (TypeError, ValueError):
+                continue
+            if article_id not in expected or not entry.get('summary'):
+                continue
+            results[article_id] = {
+                'summary': str(entry['summary']),
+                'processed_content': str(entry.get('content_html') or ''),
+                'tags': [str(tag) for tag in entry.get('tags') or []],
+            }
+        if len(results) < len(items):
+            logger.warning(f"LLM вернула результаты для {len(results)} из {len(items)} статей")
+        return {
+            'results': results,
+            'prompt_tokens': usage.get('prompt_tokens', 0),
+            'completion_tokens': usage.get('completion_tokens', 0),
+        }
+
+
+def get_llm_backend(path=None) -> BaseLLMBackend:
+    """Бэкенд из LLM_BACKEND (путь к классу) или из явно переданного пути."""
+    return import_string(path or getattr(settings, 'LLM_BACKEND', 'llm_processing.backends.StubLLMBackend'))()
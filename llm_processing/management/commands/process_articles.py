@@ -0,0 +1,26 @@
+# llm_processing/management/commands/process_articles.py
+from django.core.management.base import BaseCommand
+
+from articles.models import Article
+from llm_processing.backends import get_llm_backend
+from llm_processing.pipeline import ARTICLE_PROCESSING_FIELDS, process_articles
+
+
+class Command(BaseCommand):
+    help = (
+        "Прогоняет необработанные статьи через LLM синхронно и печатает пропускную способность. "
+        "С --backend llm_processing.backends.StubLLMBackend работает без сети — для нагрузочных прогонов."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=100, help="Сколько статей обработать")
+        parser.add_argument('--backend', help="Путь к классу бэкенда вместо LLM_BACKEND")
+
+    def handle(self, *args, **options):
+        articles = Article.objects.pending_processing().only(*ARTICLE_PROCESSING_FIELDS).order_by('pk')[:options['limit']]
+        run = process_articles(articles, backend=get_llm_backend(options['backend']))
+        self.stdout.write(self.style.SUCCESS(
+            f"{run.backend}/{run.model}: обработано {run.articles_processed}, ошибок {run.articles_failed}, "
+            f"из кэша {run.cache_hits} ({run.cache_hit_rate:.0%}), пачек {run.batches}, токенов {run.prompt_tokens}+{run.completion_tokens}, "
+            f"{run.duration:.1f} с — {run.articles_per_minute:.1f} статей/мин"
+        ))
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProcessingRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('backend', models.CharField(max_length=50)),
+                ('model', models.CharField(max_length=100)),
+                ('batches', models.PositiveIntegerField(default=0)),
+                ('articles_processed', models.PositiveIntegerField(default=0)),
+                ('articles_failed', models.PositiveIntegerField(default=0)),
+                ('prompt_tokens', models.PositiveIntegerField(default=0)),
+                ('completion_tokens', models.PositiveIntegerField(default=0)),
+                ('duration', models.FloatField(default=0, help_text='Длительность прогона, в секундах')),
+            ],
+            options={
+                'verbose_name': 'Processing Run',
+                'verbose_name_plural': 'Processing Runs',
+                'ordering': ['-started_at'],
+            },
+        ),
+    ]
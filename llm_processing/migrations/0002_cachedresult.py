@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('llm_processing', '0001_processingrun'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CachedResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('model', models.CharField(max_length=100)),
+                ('prompt_version', models.PositiveIntegerField()),
+                ('summary', models.TextField()),
+                ('processed_content', models.TextField(blank=True)),
+                ('tags', models.JSONField(default=list)),
+                ('size', models.PositiveIntegerField(help_text='Примерный размер записи в байтах — для вытеснения по объёму')),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Cached LLM Result',
+                'verbose_name_plural': 'Cached LLM Results',
+            },
+        ),
+        migrations.AddField(
+            model_name='processingrun',
+            name='cache_hits',
+            field=models.PositiveIntegerField(default=0, help_text='Статей, взятых из кэша результатов без вызова LLM'),
+        ),
+    ]
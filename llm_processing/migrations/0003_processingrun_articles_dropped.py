@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 15:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('llm_processing', '0002_cachedresult'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processingrun',
+            name='articles_dropped',
+            field=models.PositiveIntegerField(default=0, help_text='Статей, снятых с очереди: LLM LLM_MAX_ATTEMPTS раз не вернула по ним результат'),
+        ),
+    ]
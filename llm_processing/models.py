@@ -1,3 +1,59 @@
 from django.db import models
 
-# Create your models here.
+
+class ProcessingRun(models.Model):
+    """Один прогон LLM-обработки: сколько статей, токенов и времени ушло (для метрики пропускной способности)."""
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    backend = models.CharField(max_length=50)
+    model = models.CharField(max_length=100)
+    batches = models.PositiveIntegerField(default=0)
+    articles_processed = models.PositiveIntegerField(default=0)
+    articles_failed = models.PositiveIntegerField(default=0)
+    articles_dropped = models.PositiveIntegerField(default=0, help_text="Статей, снятых с очереди: LLM LLM_MAX_ATTEMPTS раз не вернула по ним результат")
+    prompt_tokens = models.PositiveIntegerField(default=0)
+    completion_tokens = models.PositiveIntegerField(default=0)
+    cache_hits = models.PositiveIntegerField(default=0, help_text="Статей, взятых из кэша результатов без вызова LLM")
+    duration = models.FloatField(default=0, help_text="Длительность прогона, в секундах")
+
+    def __str__(self):
+        return f"{self.backend}/{self.model} @ {self.started_at:%Y-%m-%d %H:%M}"
+
+    @property
+    def articles_per_minute(self) -> float:
+        return self.articles_processed * 60 / self.duration if self.duration else 0.0
+
+    @property
+    def cache_hit_rate(self) -> float:
+        total = self.articles_processed + self.articles_failed
+        return self.cache_hits / total if total else 0.0
+
+    class Meta:
+        ordering = ['-started_at']
+        verbose_name = "Processing Run"
+        verbose_name_plural = "Processing Runs"
+
+
+class CachedResult(models.Model):
+    """
+    Результат LLM для конкретного текста: ключ — хэш нормализованного original_content,
+    модели и версии промпта (см. llm_processing/result_cache.py). Повторная загрузка той же
+    статьи, синдицированные копии и перепрогоны берут результат отсюда без вызова API.
+    """
+    key = models.CharField(max_length=64, unique=True)
+    model = models.CharField(max_length=100)
+    prompt_version = models.PositiveIntegerField()
+    summary = models.TextField()
+    processed_content = models.TextField(blank=True)
+    tags = models.JSONField(default=list)
+    size = models.PositiveIntegerField(help_text="Примерный размер записи в байтах — для вытеснения по объёму")
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.model} v{self.prompt_version} {self.key[:12]}"
+
+    class Meta:
+        verbose_name = "Cached LLM Result"
+        verbose_name_plural = "Cached LLM Results"
@@ -0,0 +1,151 @@
+# llm_processing/pipeline.py
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.utils import timezone
+from lxml_html_clean import Cleaner
+
+from articles.cache import invalidate_article_caches
+from articles.models import Article
+from .backends import EXPECTED_OUTPUT_TOKENS, estimate_tokens, get_llm_backend
+from .models import ProcessingRun
+from .rate_limit import get_rate_limiter
+from .result_cache import get_cached_results, result_cache_key, store_results
+
+logger = logging.getLogger(__name__)
+
+# processed_content выводится в шаблоне через |safe, поэтому HTML от модели чистим
+html_cleaner = Cleaner(
+    allow_tags=['p', 'h2', 'h3', 'ul', 'ol', 'li', 'strong', 'em', 'blockquote', 'br'],
+    remove_unknown_tags=False,
+    safe_attrs_only=True,
+    safe_attrs=frozenset(),
+    page_structure=False,
+)
+
+ARTICLE_PROCESSING_FIELDS = ['id', 'title', 'summary', 'processed_content', 'original_content', 'tags', 'is_published', 'processed_at', 'processing_attempts']
+# updated_at — явно: bulk_update не применяет auto_now, а от него зависят Last-Modified и ETag страниц
+UPDATED_FIELDS = ['summary', 'processed_content', 'tags', 'is_published', 'processed_at', 'updated_at', 'excerpt', 'word_count', 'reading_time']
+
+
+def build_batches(articles, max_batch_tokens: int, max_batch_articles: int, max_article_tokens: int) -> list:
+    """
+    Собирает статьи в пачки для одного запроса к LLM: не больше max_batch_articles
+    статей и max_batch_tokens входных токенов на пачку. Слишком длинные тексты обрезаются.
+    """
+    batches = []
+    current, current_tokens = [], 0
+    for article in articles:
+        text = article.original_content[:max_article_tokens * 4]
+        item = {'id': article.pk, 'title': article.title, 'text': text}
+        tokens = estimate_tokens(article.title) + estimate_tokens(text)
+        if current and (len(current) >= max_batch_articles or current_tokens + tokens > max_batch_tokens):
+            batches.append((current, current_tokens))
+            current, current_tokens = [], 0
+        current.append(item)
+        current_tokens += tokens
+    if current:
+        batches.append((current, current_tokens))
+    return batches
+
+
+def process_articles(articles, backend=None) -> ProcessingRun:
+    """
+    Прогоняет статьи через LLM: пачки отправляются параллельно (LLM_MAX_CONCURRENCY потоков),
+    каждая — только после разрешения от token bucket'а. Тексты, уже обработанные этой моделью
+    с этой версией промпта, берутся из кэша результатов без вызова API.
+    Результаты пишутся одним bulk_update, обработанные статьи публикуются.
+    Возвращает ProcessingRun с метриками прогона.
+    """
+    backend = backend or get_llm_backend()
+    articles = list(articles)
+    run = ProcessingRun.objects.create(backend=backend.name, model=backend.model_id)
+    started = time.monotonic()
+
+    cache_keys = {article.pk: result_cache_key(article.original_content, backend.model_id) for article in articles}
+    results = get_cached_results(cache_keys.values()) # {ключ кэша: результат}
+    run.cache_hits = sum(1 for key in cache_keys.values() if key in results)
+    # В LLM уходит по одной статье на каждый ещё не известный текст: копии получат тот же результат
+    to_send = {}
+    for article in articles:
+        key = cache_keys[article.pk]
+        if key not in results and key not in to_send:
+            to_send[key] = article
+
+    batches = build_batches(
+        list(to_send.values()),
+        max_batch_tokens=getattr(settings, 'LLM_MAX_BATCH_TOKENS', 6000),
+        max_batch_articles=getattr(settings, 'LLM_MAX_BATCH_ARTICLES', 5),
+        max_article_tokens=getattr(settings, 'LLM_MAX_ARTICLE_TOKENS', 1500),
+    )
+    limiter = get_rate_limiter()
+
+    def call_backend(items, tokens):
+        limiter.acquire(tokens + EXPECTED_OUTPUT_TOKENS * len(items))
+        return backend.process_batch(items)
+
+    fresh = {}
+    answered = set() # Ключи текстов из пачек, на которые API ответил (без исключения)
+    max_workers = max(1, min(getattr(settings, 'LLM_MAX_CONCURRENCY', 4), len(batches)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(call_backend, items, tokens): items for items, tokens in batches}
+        for future in as_completed(futures):
+            try:
+                response = future.result()
+            except Exception as e:
+                logger.error(f"Ошибка LLM-обработки пачки из {len(futures[future])} статей: {e}")
+                continue
+            fresh.update(response['results'])
+            answered.update(cache_keys[item['id']] for item in futures[future])
+            run.prompt_tokens += response.get('prompt_tokens', 0)
+            run.completion_tokens += response.get('completion_tokens', 0)
+
+    fresh = {cache_keys[pk]: result for pk, result in fresh.items() if pk in cache_keys}
+    results.update(fresh)
+    store_results(fresh, backend.model_id)
+
+    now = timezone.now()
+    max_attempts = getattr(settings, 'LLM_MAX_ATTEMPTS', 3)
+    updated, missing = [], []
+    for article in articles:
+        result = results.get(cache_keys[article.pk])
+        if result is None:
+            # Пачка прошла, но статьи в ответе нет — такие иначе навсегда застрянут в голове очереди.
+            # Сбой всего запроса (сеть, лимиты) попыткой не считаем: это не вина статьи
+            if cache_keys[article.pk] in answered:
+                article.processing_attempts += 1
+                if article.processing_attempts >= max_attempts:
+                    article.processed_at = now # Снимаем с очереди; статья остаётся неопубликованной
+                    run.articles_dropped += 1
+                    logger.warning(f"Статья {article.pk} снята с очереди LLM: результата нет после {article.processing_attempts} попыток")
+                missing.append(article)
+            continue
+        article.summary = result['summary'].strip()
+        article.processed_content = html_cleaner.clean_html(result['processed_content']) if result['processed_content'].strip() else ''
+        article.tags = ', '.join(tag.strip() for tag in result['tags'] if tag.strip())[:500]
+        article.is_published = True
+        article.processed_at = now
+        article.updated_at = now
+        article.update_reading_metadata()
+        updated.append(article)
+    if updated:
+        Article.objects.bulk_update(updated, UPDATED_FIELDS, batch_size=200)
+        # bulk_update не шлёт post_save — кэши страниц сбрасываем сами
+        invalidate_article_caches()
+    if missing:
+        Article.objects.bulk_update(missing, ['processing_attempts', 'processed_at'], batch_size=200)
+
+    run.batches = len(batches)
+    run.articles_processed = len(updated)
+    run.articles_failed = len(articles) - len(updated)
+    run.duration = time.monotonic() - started
+    run.finished_at = timezone.now()
+    run.save()
+    logger.info(
+        f"LLM-обработка ({run.backend}/{run.model}): {run.articles_processed} статей, "
+        f"ошибок {run.articles_failed} (снято с очереди {run.articles_dropped}), из кэша {run.cache_hits}, {run.batches} пачек за {run.duration:.1f} с "
+        f"({run.articles_per_minute:.1f} статей/мин)"
+    )
+    return run
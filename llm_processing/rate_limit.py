@@ -0,0 +1,68 @@
+# llm_processing/rate_limit.py
+import threading
+import time
+
+from django.conf import settings
+
+
+class TokenBucket:
+    """
+    Классический token bucket: ёмкость capacity, пополнение rate единиц в секунду.
+    acquire() блокирует поток, пока в ведре не наберётся нужное количество.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount: float = 1):
+        # Запрос больше ёмкости иначе не прошёл бы никогда — берём всё ведро целиком
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                delay = (amount - self._tokens) / self.rate
+            time.sleep(delay)
+
+
+class RateLimiter:
+    """Лимиты API провайдера: запросы в минуту и токены в минуту (входные + ожидаемые выходные)."""
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self.requests = TokenBucket(requests_per_minute / 60, requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute / 60, tokens_per_minute)
+
+    def acquire(self, tokens: int):
+        self.requests.acquire(1)
+        self.tokens.acquire(tokens)
+
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Один лимитер на процесс: все пачки воркера делят общие ведра.
+    Между воркерами лимиты не координируются — LLM_REQUESTS_PER_MINUTE и
+    LLM_TOKENS_PER_MINUTE задаются из расчёта на один воркер.
+    """
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter(
+                getattr(settings, 'LLM_REQUESTS_PER_MINUTE', 60),
+                getattr(settings, 'LLM_TOKENS_PER_MINUTE', 90000),
+            )
+        return _rate_limiter
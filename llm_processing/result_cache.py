@@ -0,0 +1,104 @@
+# llm_processing/result_cache.py
+import hashlib
+import logging
+import unicodedata
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .backends import PROMPT_VERSION
+from .models import CachedResult
+
+logger = logging.getLogger(__name__)
+
+# Текущий объём кэша в байтах ведём в общем кэше Django, чтобы не считать SUM(size) на каждую запись.
+# Ключ живёт TOTAL_RESYNC_SECONDS и потом пересчитывается по БД — так расхождения не копятся
+TOTAL_BYTES_KEY = 'llm:result_cache:bytes'
+TOTAL_RESYNC_SECONDS = 3600
+
+
+def normalize_text(text: str) -> str:
+    # Разница в пробелах и юникод-формах не должна давать новый ключ
+    return ' '.join(unicodedata.normalize('NFKC', text or '').split())
+
+
+def result_cache_key(text: str, model_id: str) -> str:
+    data = f"{model_id}\x00{PROMPT_VERSION}\x00{normalize_text(text)}"
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def cache_enabled() -> bool:
+    return bool(getattr(settings, 'LLM_RESULT_CACHE_MAX_BYTES', 0))
+
+
+def get_cached_results(keys) -> dict:
+    """Возвращает {ключ: результат} для найденных записей и отмечает их использование."""
+    if not cache_enabled() or not keys:
+        return {}
+    found = {
+        entry['key']: {'summary': entry['summary'], 'processed_content': entry['processed_content'], 'tags': entry['tags']}
+        for entry in CachedResult.objects.filter(key__in=set(keys)).values('key', 'summary', 'processed_content', 'tags')
+    }
+    if found:
+        CachedResult.objects.filter(key__in=list(found)).update(last_used_at=timezone.now(), hits=F('hits') + 1)
+    return found
+
+
+def store_results(results: dict, model_id: str):
+    """Сохраняет {ключ: результат} и вытесняет давно не использованные записи сверх лимита."""
+    if not cache_enabled() or not results:
+        return
+    now = timezone.now()
+    entries = [
+        CachedResult(
+            key=key,
+            model=model_id,
+            prompt_version=PROMPT_VERSION,
+            summary=result['summary'],
+            processed_content=result['processed_content'],
+            tags=result['tags'],
+            size=len(result['summary'].encode('utf-8')) + len(result['processed_content'].encode('utf-8')) + 200,
+            last_used_at=now,
+        )
+        for key, result in results.items()
+    ]
+    CachedResult.objects.bulk_create(entries, batch_size=200, ignore_conflicts=True)
+    # ignore_conflicts не говорит, какие строки вставлены: оценка может быть завышена,
+    # тогда evict_results посчитает точно и ничего лишнего не удалит
+    if add_to_total_bytes(sum(entry.size for entry in entries)) > getattr(settings, 'LLM_RESULT_CACHE_MAX_BYTES', 0):
+        evict_results()
+
+
+def stored_bytes() -> int:
+    total = CachedResult.objects.aggregate(total=Sum('size'))['total'] or 0
+    cache.set(TOTAL_BYTES_KEY, total, TOTAL_RESYNC_SECONDS)
+    return total
+
+
+def add_to_total_bytes(delta: int) -> int:
+    """Учитывает только что записанные байты; без сохранённого итога считает его по БД (записи уже в ней)."""
+    try:
+        return cache.incr(TOTAL_BYTES_KEY, delta)
+    except ValueError:
+        return stored_bytes()
+
+
+def evict_results():
+    """Удаляет самые давно использованные записи, пока кэш не уложится в LLM_RESULT_CACHE_MAX_BYTES."""
+    max_bytes = getattr(settings, 'LLM_RESULT_CACHE_MAX_BYTES', 0)
+    total = stored_bytes()
+    if total <= max_bytes:
+        return
+    to_free = total - max_bytes
+    ids = []
+    for entry_id, size in CachedResult.objects.order_by('last_used_at').values_list('id', 'size').iterator():
+        ids.append(entry_id)
+        to_free -= size
+        if to_free <= 0:
+            break
+    for start in range(0, len(ids), 500):
+        CachedResult.objects.filter(id__in=ids[start:start + 500]).delete()
+    cache.set(TOTAL_BYTES_KEY, max(0, max_bytes + to_free), TOTAL_RESYNC_SECONDS) # Осталось total минус удалённое
+    logger.info(f"Кэш результатов LLM: вытеснено {len(ids)} записей (лимит {max_bytes} байт)")
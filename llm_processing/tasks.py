@@ -0,0 +1,42 @@
+# llm_processing/tasks.py
+import logging
+
+from celery import shared_task
+from django.conf import settings
+
+from articles.models import Article
+from articles.tasks import generate_pending_thumbnails
+from rss_feeds.coordination import acquire_lock, release_lock
+from .pipeline import ARTICLE_PROCESSING_FIELDS, process_articles
+
+logger = logging.getLogger(__name__)
+
+LOCK_NAME = 'llm_processing'
+
+
+@shared_task
+def process_pending_articles(limit=None):
+    """
+    Celery задача: берёт из очереди необработанные статьи (Article.processed_at пусто)
+    и прогоняет через LLM. Если очередь не опустела, ставит себя заново.
+    Прогоны не пересекаются между воркерами (блокировка LOCK_NAME в rss_feeds.coordination):
+    иначе два воркера взяли бы одну и ту же голову очереди и оплатили бы API дважды за одни статьи.
+    """
+    limit = limit or getattr(settings, 'LLM_PROCESSING_LIMIT', 100)
+    lock_token = acquire_lock(LOCK_NAME, getattr(settings, 'LLM_PROCESSING_LOCK_TIMEOUT', 30 * 60))
+    if lock_token is None:
+        logger.info("LLM-обработка уже идёт, пропускаем запуск.")
+        return
+    try:
+        articles = list(Article.objects.pending_processing().only(*ARTICLE_PROCESSING_FIELDS).order_by('pk')[:limit])
+        if not articles:
+            return
+        run = process_articles(articles)
+    finally:
+        release_lock(LOCK_NAME, lock_token)
+
+    if run.articles_processed:
+        generate_pending_thumbnails.delay() # Картинки готовим только опубликованным статьям
+    # Ставим следующий прогон, только если этот что-то сделал: при сбое API не крутимся вхолостую
+    if (run.articles_processed or run.articles_dropped) and Article.objects.pending_processing().exists():
+        process_pending_articles.delay(limit)
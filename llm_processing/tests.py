@@ -1,3 +1,149 @@
-from django.test import TestCase
+import json
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+
+from articles.models import Article
+from rss_feeds.coordination import acquire_lock, release_lock
+from .backends import OpenAIChatBackend, StubLLMBackend
+from .models import CachedResult
+from .pipeline import ARTICLE_PROCESSING_FIELDS, process_articles
+from .result_cache import TOTAL_BYTES_KEY, result_cache_key, store_results
+from .tasks import LOCK_NAME, process_pending_articles
+
+
+class ResultCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def results(self, *names):
+        # Каждая запись весит 200 + 10 байт (см. store_results)
+        return {result_cache_key(name, 'stub'): {'summary': f"{name:<5}", 'processed_content': f"{name:<5}", 'tags': []} for name in names}
+
+    @override_settings(LLM_RESULT_CACHE_MAX_BYTES=3 * 210)
+    def test_running_total_and_eviction(self):
+        store_results(self.results('a'), 'stub')
+        with CaptureQueriesContext(connection) as queries:
+            store_results(self.results('b', 'c'), 'stub')
+        # Пока лимит не превышен, SUM(size) по таблице не считается
+        self.assertFalse([query for query in queries if 'SUM(' in query['sql']])
+        self.assertEqual(cache.get(TOTAL_BYTES_KEY), 3 * 210)
+
+        CachedResult.objects.filter(key=result_cache_key('a', 'stub')).update(last_used_at=timezone.now() - timedelta(days=1))
+        store_results(self.results('d'), 'stub')
+        self.assertEqual(CachedResult.objects.count(), 3)
+        self.assertFalse(CachedResult.objects.filter(key=result_cache_key('a', 'stub')).exists())
+        self.assertEqual(cache.get(TOTAL_BYTES_KEY), 3 * 210)
+
+    @override_settings(LLM_RESULT_CACHE_MAX_BYTES=10 * 210)
+    def test_total_resyncs_from_database(self):
+        store_results(self.results('a', 'b'), 'stub')
+        cache.delete(TOTAL_BYTES_KEY) # Истёк или кэш сброшен
+        store_results(self.results('c'), 'stub')
+        self.assertEqual(cache.get(TOTAL_BYTES_KEY), 3 * 210)
+
+
+class ProcessArticlesTests(TestCase):
+    def create_article(self, title, **kwargs):
+        article = Article.objects.create(title=title, original_content="First sentence. Second sentence.", source_url=f"https://example.com/{title}", category='medicine', **kwargs)
+        # Статьи «из прошлого», чтобы отличить время публикации от времени создания
+        Article.objects.filter(pk=article.pk).update(updated_at=timezone.now() - timedelta(hours=2))
+        return Article.objects.get(pk=article.pk)
+
+    def test_publish_moves_last_modified(self):
+        self.create_article("old", is_published=True)
+        last_modified = self.client.get('/')['Last-Modified']
+        pending = self.create_article("new", is_published=False)
+
+        process_articles([pending], backend=StubLLMBackend())
+
+        pending.refresh_from_db()
+        self.assertTrue(pending.is_published)
+        self.assertGreater(pending.updated_at, timezone.now() - timedelta(minutes=1))
+        # Клиент с одним If-Modified-Since должен увидеть новую статью, а не 304
+        self.assertEqual(self.client.get('/', HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 200)
+        self.assertEqual(self.client.get('/api/v1/articles/', HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 200)
+        self.assertEqual(self.client.get(f'/{pending.slug}/', HTTP_IF_MODIFIED_SINCE=http_date((timezone.now() - timedelta(hours=1)).timestamp())).status_code, 200)
+
+
+class PartialBackend(StubLLMBackend):
+    """Отвечает, но молча пропускает статьи с «skip» в заголовке."""
+
+    def process_batch(self, items):
+        return super().process_batch([item for item in items if 'skip' not in item['title']])
+
+
+class FailingBackend(StubLLMBackend):
+    def process_batch(self, items):
+        raise RuntimeError("API недоступен")
+
+
+@override_settings(LLM_MAX_ATTEMPTS=2)
+class PendingQueueTests(TestCase):
+    def setUp(self):
+        self.missing = Article.objects.create(title="skip me", original_content="Lost text.", source_url="https://example.com/skip", category='medicine', is_published=False)
+        self.normal = Article.objects.create(title="normal", original_content="Normal text.", source_url="https://example.com/normal", category='medicine', is_published=False)
+
+    def pending(self):
+        return list(Article.objects.pending_processing().only(*ARTICLE_PROCESSING_FIELDS).order_by('pk'))
+
+    def test_missing_results_leave_queue(self):
+        process_articles(self.pending(), backend=PartialBackend())
+        self.missing.refresh_from_db()
+        self.assertEqual(self.missing.processing_attempts, 1)
+        self.assertEqual([article.pk for article in self.pending()], [self.missing.pk])
+
+        run = process_articles(self.pending(), backend=PartialBackend())
+        self.assertEqual(run.articles_dropped, 1)
+        self.assertEqual(self.pending(), [])
+        self.missing.refresh_from_db()
+        self.assertFalse(self.missing.is_published)
+
+    def test_api_failure_is_not_an_attempt(self):
+        process_articles(self.pending(), backend=FailingBackend())
+        self.assertEqual(sorted(Article.objects.values_list('processing_attempts', flat=True)), [0, 0])
+        self.assertEqual(len(self.pending()), 2)
+
+
+@override_settings(RSS_COORDINATION_REDIS_URL=None)
+class ProcessPendingTaskTests(TestCase):
+    def test_skips_when_locked(self):
+        Article.objects.create(title="a", original_content="Text.", source_url="https://example.com/a", category='medicine', is_published=False)
+        token = acquire_lock(LOCK_NAME, 60)
+        with mock.patch('llm_processing.tasks.generate_pending_thumbnails.delay') as thumbnails:
+            try:
+                process_pending_articles()
+                self.assertEqual(Article.objects.pending_processing().count(), 1)
+            finally:
+                release_lock(LOCK_NAME, token)
+            thumbnails.assert_not_called()
+            process_pending_articles()
+        self.assertEqual(Article.objects.pending_processing().count(), 0)
+        # Картинки ставятся в очередь после публикации, а не при загрузке
+        thumbnails.assert_called_once_with()
+
+
+class OpenAIChatBackendTests(SimpleTestCase):
+    def test_string_ids_are_accepted(self):
+        answer = {'articles': [
+            {'id': "12", 'summary': "Twelve", 'content_html': "<p>12</p>", 'tags': ["a"]},
+            {'id': 13, 'summary': "Thirteen"},
+            {'id': "abc", 'summary': "Broken id"},
+            {'summary': "No id"},
+            {'id': "99", 'summary': "Not in the batch"},
+        ]}
+        response = mock.Mock()
+        response.json.return_value = {'choices': [{'message': {'content': json.dumps(answer)}}], 'usage': {'prompt_tokens': 5, 'completion_tokens': 7}}
+        backend = OpenAIChatBackend()
+        items = [{'id': 12, 'title': "a", 'text': "x"}, {'id': 13, 'title': "b", 'text': "y"}]
+        with mock.patch.object(backend.session, 'post', return_value=response):
+            result = backend.process_batch(items)
+        self.assertEqual(sorted(result['results']), [12, 13])
+        self.assertEqual(result['results'][12], {'summary': "Twelve", 'processed_content': "<p>12</p>", 'tags': ["a"]})
+        self.assertEqual((result['prompt_tokens'], result['completion_tokens']), (5, 7))
@@ -1,10 +1,26 @@
 # rss_feeds/admin.py
 from django.contrib import admin
-from .models import RSSFeed
+from .models import RSSFeed, ContentSource
 
 @admin.register(RSSFeed)
 class RSSFeedAdmin(admin.ModelAdmin):
-    list_display = ('url', 'category', 'is_active', 'last_fetched', 'fetch_frequency')
+    list_display = ('url', 'category', 'is_active', 'last_fetched', 'next_fetch_at', 'poll_interval', 'consecutive_failures')
     list_filter = ('category', 'is_active')
     search_fields = ('url',)
-    readonly_fields = ('last_fetched',) # last_fetched обновляется автоматически
+    # Обновляются автоматически при опросе; next_fetch_at можно поправить вручную, чтобы опросить ленту раньше
+    readonly_fields = ('last_fetched', 'etag', 'last_modified', 'content_hash', 'poll_interval', 'publish_rate', 'consecutive_failures', 'last_error')
+
+
+@admin.register(ContentSource)
+class ContentSourceAdmin(admin.ModelAdmin):
+    list_display = ('domain', 'is_active', 'best_selector', 'fallback_count')
+    list_filter = ('is_active',)
+    search_fields = ('domain',)
+    readonly_fields = ('selector_hits', 'fallback_count') # Статистика пишется при парсинге
+
+    @admin.display(description="Лучший селектор")
+    def best_selector(self, obj):
+        if not obj.selector_hits:
+            return '-'
+        selector, hits = max(obj.selector_hits.items(), key=lambda item: item[1])
+        return f"{selector} ({hits})"
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class RssFeedsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'rss_feeds'
+
+    def ready(self):
+        from . import signals # Удалённые статьи убираем из множества известных URL
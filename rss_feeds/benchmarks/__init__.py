@@ -0,0 +1,2 @@
+# rss_feeds/benchmarks/__init__.py
+# Эталонные (старые) реализации и вспомогательные функции для бенчмарков парсинга.
@@ -0,0 +1,81 @@
+# rss_feeds/benchmarks/corpus.py
+import hashlib
+import json
+import logging
+from pathlib import Path
+
+import feedparser
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = 'manifest.json'
+
+
+class Corpus:
+    """
+    Записанный корпус для офлайн-бенчмарков: тела лент и страниц статей по исходным URL.
+    На диске — каталог с manifest.json и файлами ответов в files/<sha1 URL>.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.feeds = [] # [{'url', 'category'}]
+        self.responses = {} # url -> {'file', 'content_type', 'kind': 'feed' | 'page'}
+
+    @classmethod
+    def load(cls, root):
+        corpus = cls(root)
+        manifest = json.loads((corpus.root / MANIFEST_NAME).read_text(encoding='utf-8'))
+        corpus.feeds = manifest['feeds']
+        corpus.responses = manifest['responses']
+        return corpus
+
+    def save(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        manifest = {'feeds': self.feeds, 'responses': self.responses}
+        (self.root / MANIFEST_NAME).write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding='utf-8')
+
+    def add(self, url: str, body: bytes, content_type: str, kind: str):
+        name = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        path = self.root / 'files' / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(body)
+        self.responses[url] = {'file': f'files/{name}', 'content_type': content_type, 'kind': kind}
+
+    def body(self, url: str):
+        entry = self.responses.get(url)
+        return (self.root / entry['file']).read_bytes() if entry else None
+
+    def urls(self, kind: str) -> list:
+        return [url for url, entry in self.responses.items() if entry['kind'] == kind]
+
+
+def record_corpus(root, feeds, per_feed: int, session, timeout=15, log=logger.info) -> Corpus:
+    """
+    Скачивает ленты и по per_feed страниц статей из каждой в каталог root.
+    Страницы записываются под URL из ленты (после редиректов сохраняется итоговое тело).
+    """
+    corpus = Corpus(root)
+    for feed in feeds:
+        try:
+            response = session.get(feed['url'], timeout=timeout)
+            response.raise_for_status()
+        except Exception as e:
+            log(f"Лента {feed['url']} не скачалась: {e}")
+            continue
+        corpus.feeds.append({'url': feed['url'], 'category': feed['category']})
+        corpus.add(feed['url'], response.content, response.headers.get('Content-Type', 'application/xml'), 'feed')
+
+        parsed = feedparser.parse(response.content)
+        links = [entry.get('link') for entry in parsed.entries if entry.get('link')][:per_feed]
+        for link in links:
+            try:
+                page = session.get(link, timeout=timeout)
+                page.raise_for_status()
+            except Exception as e:
+                log(f"  страница {link} не скачалась: {e}")
+                continue
+            corpus.add(link, page.content, page.headers.get('Content-Type', 'text/html'), 'page')
+        log(f"{feed['url']}: страниц {len(links)}")
+    corpus.save()
+    return corpus
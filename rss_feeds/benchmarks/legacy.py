@@ -0,0 +1,41 @@
+# rss_feeds/benchmarks/legacy.py
+# Старые реализации функций из rss_feeds/utils.py. Не используются при парсинге,
+# нужны только как эталон: бенчмарки сверяют с ними результат новых версий.
+import re
+
+from bs4 import Comment
+
+
+def clean_html_element(element):
+    """
+    Рекурсивно удаляет нежелательные элементы и строки из BeautifulSoup-элемента.
+    (Многопроходная версия: ~16 + 2×21 вызовов find_all и get_text() на каждом теге.)
+    """
+    if not element:
+        return
+
+    # Список тегов для удаления (можно расширить)
+    unwanted_tags = ['script', 'style', 'aside', 'nav', 'footer', 'header', 'form', 'input', 'button', 'iframe', 'embed', 'object', 'noscript', 'svg', 'picture', 'figure', 'figcaption']
+    # Список классов/ID для удаления (примеры, можно настроить)
+    unwanted_classes_ids = ['ad', 'advertisement', 'ads', 'promo', 'social-share', 'comments', 'comment', 'related', 'sidebar', 'widget', 'newsletter', 'subscribe', 'popup', 'modal', 'cookie', 'consent', 'banner', 'sticky', 'mobile', 'hidden']
+
+    # Удаляем нежелательные теги
+    for unwanted_tag in unwanted_tags:
+        for tag in element.find_all(unwanted_tag):
+            tag.decompose()
+
+    # Удаляем элементы с нежелательными классами/ID
+    for class_id in unwanted_classes_ids:
+        for tag in element.find_all(attrs={"class": re.compile(f".*{class_id}.*", re.I)}):
+            tag.decompose()
+        for tag in element.find_all(attrs={"id": re.compile(f".*{class_id}.*", re.I)}):
+            tag.decompose()
+
+    # Удаляем комментарии
+    for comment in element.find_all(string=lambda text: isinstance(text, Comment)):
+        comment.extract()
+
+    # Удаляем пустые элементы
+    for tag in element.find_all():
+        if not tag.get_text(strip=True):
+            tag.decompose()
@@ -0,0 +1,92 @@
+# rss_feeds/benchmarks/stub_server.py
+import random
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, unquote
+
+from requests.adapters import HTTPAdapter
+
+from rss_feeds.http_client import get_session
+
+
+class CorpusRequestHandler(BaseHTTPRequestHandler):
+    """Отдаёт тело из корпуса по исходному URL, закодированному в пути: /<quote(url)>."""
+
+    def do_GET(self):
+        server = self.server
+        url = unquote(self.path[1:])
+        body = server.corpus.body(url)
+        delay = server.latency + random.uniform(0, server.jitter)
+        if delay:
+            time.sleep(delay)
+        if body is None:
+            self.send_error(404)
+            return
+        etag = f'"{len(body)}-{hash(body) & 0xffffffff:x}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', server.corpus.responses[url]['content_type'])
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass # Бенчмарку лог каждого запроса не нужен
+
+
+class CorpusServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, corpus, latency=0.0, jitter=0.0):
+        super().__init__(('127.0.0.1', 0), CorpusRequestHandler)
+        self.corpus = corpus
+        self.latency = latency
+        self.jitter = jitter
+
+    @property
+    def base_url(self) -> str:
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+
+class StubRedirectAdapter(HTTPAdapter):
+    """Транспорт requests, который отправляет любой запрос на локальный CorpusServer вместо сайта-источника."""
+
+    def __init__(self, base_url, **kwargs):
+        self.base_url = base_url
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        request.url = f"{self.base_url}/{quote(request.url, safe='')}"
+        return super().send(request, **kwargs)
+
+
+@contextmanager
+def serve_corpus(corpus, latency=0.0, jitter=0.0):
+    """
+    Поднимает CorpusServer и на время блока подменяет транспорт общей HTTP-сессии
+    (rss_feeds.http_client.get_session): весь код загрузки работает как обычно —
+    пул соединений, потоковое чтение, лимит размера, — но ходит в локальный корпус.
+    """
+    server = CorpusServer(corpus, latency=latency, jitter=jitter)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    session = get_session()
+    original_adapters = dict(session.adapters)
+    adapter = StubRedirectAdapter(server.base_url, pool_connections=4, pool_maxsize=64)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    try:
+        yield server
+    finally:
+        session.adapters.clear()
+        session.adapters.update(original_adapters)
+        adapter.close()
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,177 @@
+# rss_feeds/benchmarks/suite.py
+import logging
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from unittest import mock
+from urllib.parse import urlparse
+
+from django.core.cache import cache
+from django.test import override_settings
+from readability.htmls import build_doc
+
+from articles.models import Article
+from healthpulse.celery import app
+from rss_feeds import tasks
+from rss_feeds.boilerplate import get_boilerplate_filter
+from rss_feeds.models import RSSFeed, StoryBand, StoryFingerprint
+from rss_feeds.selectors import get_selector_registry
+from rss_feeds.utils import clean_html_element, clean_text, element_text, extract_content_from_page, parse_rss_feed
+
+from .stub_server import serve_corpus
+
+logger = logging.getLogger(__name__)
+
+# Загрузка ходит только в локальный сервер корпуса: без дискового кэша страниц,
+# без Redis (и для координации, и для кэша Django) и без пауз между запросами к одному хосту (вежливость тут меряет только sleep)
+BENCH_SETTINGS = {
+    'RSS_PAGE_CACHE_PATH': None,
+    'RSS_COORDINATION_REDIS_URL': None,
+    'RSS_SEEN_URLS_REDIS_URL': None,
+    'RSS_FETCH_PER_HOST_INTERVAL': 0,
+    'RSS_PROFILE_SAMPLE_RATE': 0,
+    'CACHES': {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}, # Бенчмарк идёт в одном процессе
+}
+
+
+def measure(func, repeat: int) -> dict:
+    """Прогоняет func() repeat раз и возвращает длительности прогонов со сводкой."""
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - started)
+    return {
+        'runs': runs,
+        'min': min(runs),
+        'median': statistics.median(runs),
+        'mean': statistics.fmean(runs),
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def _page_texts(corpus) -> list:
+    texts = []
+    for url in corpus.urls('page'):
+        doc_tree, _ = build_doc(corpus.body(url).decode('utf-8', errors='replace'))
+        texts.append(element_text(doc_tree))
+    return texts
+
+
+def bench_clean_text(corpus):
+    texts = _page_texts(corpus)
+    return lambda: [clean_text(text) for text in texts]
+
+
+def bench_clean_text_batch(corpus):
+    texts = _page_texts(corpus)
+    text_filter = get_boilerplate_filter()
+    return lambda: text_filter.clean_many(texts)
+
+
+def bench_clean_html_element(corpus):
+    pages = [corpus.body(url).decode('utf-8', errors='replace') for url in corpus.urls('page')]
+
+    def run():
+        # Очистка меняет дерево на месте, поэтому разбор входит в замер
+        for html in pages:
+            doc_tree, _ = build_doc(html)
+            clean_html_element(doc_tree)
+    return run
+
+
+def bench_extract_content_from_page(corpus):
+    registry = get_selector_registry()
+    jobs = [(url, registry.selectors_for(urlparse(url).netloc)) for url in corpus.urls('page')]
+    return lambda: [extract_content_from_page(url, selectors) for url, selectors in jobs]
+
+
+def bench_parse_rss_feed(corpus):
+    return lambda: [parse_rss_feed(feed['url']) for feed in corpus.feeds]
+
+
+def bench_fetch_and_store(corpus):
+    feed_ids = [
+        RSSFeed.objects.update_or_create(url=feed['url'], defaults={'category': feed['category'], 'is_active': True})[0].id
+        for feed in corpus.feeds
+    ]
+
+    def run():
+        # Каждый прогон — с пустой базой статей, без валидаторов (иначе ленты ответят 304)
+        # и без ключей идемпотентности, которые без Redis лежат в кэше Django
+        cache.clear()
+        Article.objects.all().delete()
+        StoryBand.objects.all().delete()
+        StoryFingerprint.objects.all().delete()
+        RSSFeed.objects.filter(id__in=feed_ids).update(etag='', last_modified='', content_hash='')
+        with mock.patch.object(tasks.process_pending_articles, 'delay'): # LLM-обработка и подготовка картинок в этот замер не входят
+            for feed_id in feed_ids:
+                tasks.fetch_and_store_articles_from_feed(feed_id)
+    return run
+
+
+# Имя -> фабрика: готовит входные данные вне замера и возвращает замеряемую функцию
+BENCHMARKS = {
+    'clean_text': bench_clean_text,
+    'clean_text_batch': bench_clean_text_batch,
+    'clean_html_element': bench_clean_html_element,
+    'extract_content_from_page': bench_extract_content_from_page,
+    'parse_rss_feed': bench_parse_rss_feed,
+    'fetch_and_store_articles_from_feed': bench_fetch_and_store,
+}
+
+
+def run_suite(corpus, names=None, repeat=5, latency=0.0, jitter=0.0, log=logger.info) -> dict:
+    """
+    Прогоняет бенчмарки на корпусе через локальный сервер. Нужна БД (задача пишет статьи),
+    команда bench_ingest поднимает для этого тестовую базу.
+    """
+    results = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'latency': latency,
+            'jitter': jitter,
+            'repeat': repeat,
+            'feeds': len(corpus.feeds),
+            'pages': len(corpus.urls('page')),
+        },
+        'benchmarks': {},
+    }
+    always_eager = app.conf.task_always_eager
+    app.conf.task_always_eager = True # chord и задачи выполняются в этом процессе; после прогона возвращаем как было
+    try:
+        with override_settings(**BENCH_SETTINGS), serve_corpus(corpus, latency=latency, jitter=jitter):
+            for name in names or BENCHMARKS:
+                func = BENCHMARKS[name](corpus)
+                func() # Прогрев: импорты, ленивые синглтоны, соединения в пуле
+                results['benchmarks'][name] = measure(func, repeat)
+                log(f"{name}: медиана {results['benchmarks'][name]['median'] * 1000:.1f} мс")
+    finally:
+        app.conf.task_always_eager = always_eager
+    return results
+
+
+def compare_results(previous: dict, current: dict, threshold: float) -> list:
+    """
+    Сравнивает медианы с предыдущим прогоном. Возвращает [(имя, было, стало, отношение, регрессия?)]
+    для бенчмарков, которые есть в обоих; регрессия — замедление больше чем в 1 + threshold раз.
+    """
+    rows = []
+    for name, result in current['benchmarks'].items():
+        before = previous.get('benchmarks', {}).get(name)
+        if not before or not before['median']:
+            continue
+        ratio = result['median'] / before['median']
+        rows.append((name, before['median'], result['median'], ratio, ratio > 1 + threshold))
+    return rows
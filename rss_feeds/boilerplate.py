@@ -0,0 +1,138 @@
+# rss_feeds/boilerplate.py
+import hashlib
+import logging
+import re
+from functools import lru_cache
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Фразы-мусор по умолчанию. "..." — разрыв: любые символы, но не длиннее
+# RSS_BOILERPLATE_MAX_GAP и не через конец предложения (. ! ?)
+DEFAULT_BOILERPLATE_PHRASES = [
+    'sign up for ... newsletter',
+    'subscribe ... here',
+    'click ... more',
+    'read more',
+    'advertisement',
+    'sponsored content',
+]
+
+GAP = '...'
+DOCUMENT_SEPARATOR = '\x00' # Разделитель документов в пакетном режиме; разрыв фразы через него не проходит
+_TERMINAL = '' # Метка конца фразы в узле префиксного дерева
+_WHITESPACE_RE = re.compile(r'\s+')
+_DOUBLE_SPACE_RE = re.compile(r' {2,}') # Остаются на месте вырезанных фраз
+
+
+def _phrase_tokens(phrase: str) -> tuple:
+    """'sign up for ... newsletter' -> ('sign', 'up', 'for', '...', 'newsletter')"""
+    return tuple(token.lower() for token in phrase.replace(GAP, f' {GAP} ').split())
+
+
+def _trie_pattern(node: dict, gap_pattern: str) -> str:
+    """
+    Регулярное выражение из префиксного дерева фраз: общие начала фраз проверяются
+    один раз, так что на каждой позиции текста движок идёт по одной ветке дерева,
+    а не перебирает все фразы подряд.
+    """
+    branches = []
+    for token, child in sorted(node.items()):
+        if token == _TERMINAL:
+            continue
+        head = gap_pattern if token == GAP else re.escape(token)
+        tail = _trie_pattern(child, gap_pattern)
+        if not tail:
+            branches.append(head)
+        elif child.get(_TERMINAL) is not None:
+            # Фраза может закончиться на этом слове или продолжиться более длинной
+            branches.append(f'{head}(?:\\s+{tail})?' if token != GAP else f'{head}(?:{tail})?')
+        else:
+            branches.append(f'{head}\\s+{tail}' if token != GAP else f'{head}{tail}')
+    if not branches:
+        return ''
+    return branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+
+
+class BoilerplateFilter:
+    """
+    Убирает из текста фразы-мусор («Sign up for our newsletter», «Read more»...).
+    Все фразы компилируются один раз в одно регулярное выражение по префиксному дереву;
+    фразы целиком — по границам слов, разрывы "..." ограничены max_gap символами
+    и не переходят через конец предложения, так что абзацы между далёкими
+    «click» и «more» не съедаются.
+    """
+
+    def __init__(self, phrases, max_gap: int = 60):
+        self.phrases = tuple(phrases)
+        # Отпечаток набора фраз: входит в ключ кэша результатов извлечения (rss_feeds.utils)
+        self.fingerprint = hashlib.sha1('\n'.join((str(max_gap), *self.phrases)).encode('utf-8')).hexdigest()[:12]
+        trie = {}
+        for phrase in self.phrases:
+            tokens = _phrase_tokens(phrase)
+            if not tokens or tokens[0] == GAP or tokens[-1] == GAP:
+                logger.error(f"Некорректная фраза-мусор '{phrase}': разрыв не может стоять с краю")
+                continue
+            node = trie
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node[_TERMINAL] = True
+        # Разрыв идёт после пробела за предыдущим словом и сам заканчивается пробелом: "click [here to read ]more"
+        gap_pattern = f'(?:[^.!?\\x00]{{0,{max_gap}}}?\\s+)?'
+        body = _trie_pattern(trie, gap_pattern)
+        self.pattern = re.compile(f'\\b{body}\\b', re.IGNORECASE) if body else None
+
+    def clean(self, text: str) -> str:
+        """Схлопывает пробельные символы и убирает фразы-мусор."""
+        if not text:
+            return ""
+        text = _WHITESPACE_RE.sub(' ', text.replace(DOCUMENT_SEPARATOR, ' ')).strip()
+        if self.pattern is None:
+            return text
+        return _DOUBLE_SPACE_RE.sub(' ', self.pattern.sub('', text)).strip()
+
+    def clean_many(self, texts) -> list:
+        """
+        Пакетный режим: документы склеиваются через DOCUMENT_SEPARATOR и чистятся
+        одним проходом каждого выражения, вместо вызова на документ.
+        """
+        texts = [text or '' for text in texts]
+        if not texts:
+            return []
+        joined = _WHITESPACE_RE.sub(' ', DOCUMENT_SEPARATOR.join(text.replace(DOCUMENT_SEPARATOR, ' ') for text in texts))
+        if self.pattern is not None:
+            joined = _DOUBLE_SPACE_RE.sub(' ', self.pattern.sub('', joined))
+        return [text.strip() for text in joined.split(DOCUMENT_SEPARATOR)]
+
+
+@lru_cache(maxsize=64)
+def compile_boilerplate(phrases: tuple, max_gap: int) -> BoilerplateFilter:
+    """Один скомпилированный фильтр на набор фраз на процесс (источники с одинаковыми фразами делят его)."""
+    return BoilerplateFilter(phrases, max_gap)
+
+
+def default_phrases() -> list:
+    return list(getattr(settings, 'RSS_BOILERPLATE_PHRASES', DEFAULT_BOILERPLATE_PHRASES))
+
+
+def resolve_phrases(overrides: str) -> list:
+    """
+    Фразы источника: фразы по умолчанию плюс строки overrides (по одной на строку);
+    строка вида "!read more" убирает фразу по умолчанию для этого источника.
+    """
+    phrases = default_phrases()
+    for line in (overrides or '').splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith('!'):
+            disabled = _phrase_tokens(line[1:])
+            phrases = [phrase for phrase in phrases if _phrase_tokens(phrase) != disabled]
+        elif line not in phrases:
+            phrases.append(line)
+    return phrases
+
+
+def get_boilerplate_filter(overrides: str = '') -> BoilerplateFilter:
+    return compile_boilerplate(tuple(resolve_phrases(overrides)), getattr(settings, 'RSS_BOILERPLATE_MAX_GAP', 60))
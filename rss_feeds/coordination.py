@@ -0,0 +1,88 @@
+# rss_feeds/coordination.py
+import logging
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Снимает блокировку, только если она всё ещё наша (а не перехвачена после истечения TTL)
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Продлевает блокировку, только если она всё ещё наша
+EXTEND_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_redis_client = None
+
+
+def get_redis():
+    """
+    Redis для координации воркеров (блокировки лент, ключи идемпотентности, троттлинг хостов).
+    Без RSS_COORDINATION_REDIS_URL используется кэш Django — он общий для воркеров,
+    только если сам настроен на Redis/Memcached.
+    """
+    global _redis_client
+    redis_url = getattr(settings, 'RSS_COORDINATION_REDIS_URL', None)
+    if not redis_url:
+        return None
+    if _redis_client is None:
+        import redis
+        _redis_client = redis.Redis.from_url(redis_url)
+    return _redis_client
+
+
+def acquire_lock(name: str, timeout: int):
+    """Берёт блокировку на timeout секунд. Возвращает токен для release_lock или None, если занято."""
+    key = f'healthpulse:lock:{name}'
+    token = uuid.uuid4().hex
+    redis_client = get_redis()
+    if redis_client is not None:
+        return token if redis_client.set(key, token, nx=True, ex=timeout) else None
+    return token if cache.add(key, token, timeout) else None
+
+
+def release_lock(name: str, token: str):
+    key = f'healthpulse:lock:{name}'
+    redis_client = get_redis()
+    if redis_client is not None:
+        redis_client.eval(RELEASE_LOCK_SCRIPT, 1, key, token)
+    elif cache.get(key) == token:
+        cache.delete(key)
+
+
+def extend_lock(name: str, token: str, timeout: int) -> bool:
+    """Продлевает свою блокировку до timeout секунд от текущего момента. False — блокировка уже не наша."""
+    key = f'healthpulse:lock:{name}'
+    redis_client = get_redis()
+    if redis_client is not None:
+        return bool(redis_client.eval(EXTEND_LOCK_SCRIPT, 1, key, token, timeout))
+    return cache.get(key) == token and cache.touch(key, timeout)
+
+
+def is_done(key: str) -> bool:
+    """Выполнена ли уже операция с этим ключом идемпотентности."""
+    redis_client = get_redis()
+    full_key = f'healthpulse:done:{key}'
+    if redis_client is not None:
+        return bool(redis_client.exists(full_key))
+    return cache.get(full_key) is not None
+
+
+def mark_done(key: str, timeout: int) -> bool:
+    """Отмечает операцию выполненной. False — её уже отметил кто-то раньше (повторная доставка задачи)."""
+    redis_client = get_redis()
+    full_key = f'healthpulse:done:{key}'
+    if redis_client is not None:
+        return bool(redis_client.set(full_key, 1, nx=True, ex=timeout))
+    return cache.add(full_key, 1, timeout)
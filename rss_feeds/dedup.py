@@ -0,0 +1,91 @@
+# rss_feeds/dedup.py
+import logging
+import time
+
+from django.conf import settings
+
+from articles.models import Article
+from articles.utils import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+# Сортированное множество: канонический URL -> время, когда статья была сохранена.
+# Записи старше RSS_SEEN_URLS_TTL вычищаются, так что множество не растёт бесконечно.
+SEEN_URLS_KEY = 'healthpulse:seen_urls'
+
+_redis_client = None
+
+
+def _get_redis():
+    global _redis_client
+    redis_url = getattr(settings, 'RSS_SEEN_URLS_REDIS_URL', None)
+    if not redis_url:
+        return None
+    if _redis_client is None:
+        import redis
+        _redis_client = redis.Redis.from_url(redis_url)
+    return _redis_client
+
+
+def _seen_urls_ttl() -> int:
+    return getattr(settings, 'RSS_SEEN_URLS_TTL', 30 * 24 * 60 * 60)
+
+
+def find_known_urls(urls) -> set:
+    """
+    Возвращает подмножество urls, которые уже есть в базе (с учётом канонизации).
+    Сначала спрашиваем Redis-множество (если настроено), остальное — одним запросом к БД.
+    """
+    canonical = {url: canonicalize_url(url) for url in urls if url}
+    known = set()
+
+    redis_client = _get_redis()
+    if redis_client is not None and canonical:
+        try:
+            keys = list(canonical.values())
+            scores = redis_client.zmscore(SEEN_URLS_KEY, keys)
+            cutoff = time.time() - _seen_urls_ttl()
+            seen = {key for key, score in zip(keys, scores) if score is not None and score >= cutoff}
+            known.update(url for url, key in canonical.items() if key in seen)
+        except Exception as e:
+            logger.warning(f"Redis недоступен для проверки известных URL: {e}")
+
+    remaining = {url: key for url, key in canonical.items() if url not in known}
+    if remaining:
+        stored = set(Article.objects.with_canonical_url().filter(canonical_url__in=set(remaining.values())).values_list('canonical_url', flat=True))
+        known.update(url for url, key in remaining.items() if key in stored)
+
+    return known
+
+
+def remember_urls(urls):
+    """
+    Добавляет URL сохранённых статей в Redis-множество известных URL (если оно настроено)
+    и заодно вычищает записи старше RSS_SEEN_URLS_TTL: их всё равно отсечёт проверка по БД.
+    """
+    redis_client = _get_redis()
+    keys = [canonicalize_url(url) for url in urls if url]
+    if redis_client is None or not keys:
+        return
+    now = time.time()
+    try:
+        with redis_client.pipeline() as pipe:
+            pipe.zadd(SEEN_URLS_KEY, dict.fromkeys(keys, now))
+            pipe.zremrangebyscore(SEEN_URLS_KEY, '-inf', now - _seen_urls_ttl())
+            pipe.execute()
+    except Exception as e:
+        logger.warning(f"Не удалось обновить Redis-множество известных URL: {e}")
+
+
+def forget_urls(urls):
+    """
+    Убирает URL из Redis-множества известных URL: удалённую статью можно загрузить снова.
+    """
+    redis_client = _get_redis()
+    keys = [canonicalize_url(url) for url in urls if url]
+    if redis_client is None or not keys:
+        return
+    try:
+        redis_client.zrem(SEEN_URLS_KEY, *keys)
+    except Exception as e:
+        logger.warning(f"Не удалось удалить URL из Redis-множества известных URL: {e}")
@@ -0,0 +1,127 @@
+# rss_feeds/fetcher.py
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class HostThrottle:
+    """
+    Планировщик вежливости: не чаще одного запроса к хосту за interval секунд.
+    Слоты резервируются под блокировкой, а ждёт каждый поток сам, поэтому
+    разные хосты друг друга не тормозят.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next_slot = {}
+
+    def wait(self, host: str):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class RedisHostThrottle:
+    """
+    Тот же HostThrottle, но слоты хранятся в Redis и общие для всех воркеров:
+    нужен, когда страницы одного хоста качают разные задачи Celery.
+    """
+
+    # Резервирует ближайший свободный слот хоста и сдвигает следующий на interval
+    RESERVE_SLOT_SCRIPT = """
+    local now = tonumber(ARGV[1])
+    local interval = tonumber(ARGV[2])
+    local slot = tonumber(redis.call('GET', KEYS[1]) or '0')
+    if slot < now then slot = now end
+    redis.call('SET', KEYS[1], tostring(slot + interval), 'PX', math.ceil((slot + interval - now) * 1000) + 1000)
+    return tostring(slot)
+    """
+
+    def __init__(self, client, interval: float):
+        self.client = client
+        self.interval = interval
+        self._reserve = client.register_script(self.RESERVE_SLOT_SCRIPT)
+
+    def wait(self, host: str):
+        now = time.time()
+        slot = float(self._reserve(keys=[f'healthpulse:throttle:{host}'], args=[now, self.interval]))
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+_shared_throttle = None
+
+
+def get_shared_throttle():
+    """Троттлер хостов для задач Celery: через Redis, если он настроен, иначе общий на процесс."""
+    global _shared_throttle
+    if _shared_throttle is None:
+        from .coordination import get_redis
+
+        interval = getattr(settings, 'RSS_FETCH_PER_HOST_INTERVAL', 1.0)
+        redis_client = get_redis()
+        _shared_throttle = RedisHostThrottle(redis_client, interval) if redis_client is not None else HostThrottle(interval)
+    return _shared_throttle
+
+
+def fetch_concurrently(jobs, worker, max_workers=None, per_host=None, interval=None) -> dict:
+    """
+    Параллельно выполняет worker(url, *args) для каждой задачи (url, *args).
+    Задачи группируются по хосту: для каждого хоста заводится per_host «дорожек»,
+    которые разбирают общую очередь хоста, а троттлер держит паузу между
+    запросами к одному хосту. Без явного interval берётся общий get_shared_throttle(),
+    чтобы этот вызов и задачи extract_article не ходили к одному хосту в обход друг
+    друга; свой HostThrottle(interval) — только для явных вызовов (тесты, бенчмарки).
+    Общее число потоков ограничено max_workers.
+    Возвращает словарь {url: результат}; если worker упал, результат — None.
+    """
+    if max_workers is None:
+        max_workers = getattr(settings, 'RSS_FETCH_MAX_WORKERS', 8)
+    if per_host is None:
+        per_host = getattr(settings, 'RSS_FETCH_PER_HOST_CONCURRENCY', 1)
+
+    if not jobs:
+        return {}
+
+    queues = {}
+    for job in jobs:
+        host = urlparse(job[0]).netloc.lower()
+        queues.setdefault(host, deque()).append(job)
+
+    throttle = get_shared_throttle() if interval is None else HostThrottle(interval)
+    results = {}
+
+    def run_lane(host, queue):
+        while True:
+            try:
+                url, *args = queue.popleft()
+            except IndexError:
+                return
+            throttle.wait(host)
+            try:
+                results[url] = worker(url, *args)
+            except Exception as e:
+                logger.error(f"Ошибка при загрузке {url}: {e}")
+                results[url] = None
+
+    lanes = [(host, queue) for host, queue in queues.items() for _ in range(min(per_host, len(queue)))]
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(lanes)))) as executor:
+        for future in [executor.submit(run_lane, host, queue) for host, queue in lanes]:
+            future.result()
+
+    logger.info(f"Загружено {len(results)} страниц с {len(queues)} хостов за {time.monotonic() - started:.1f} с")
+    return results
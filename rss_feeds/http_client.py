@@ -0,0 +1,81 @@
+# rss_feeds/http_client.py
+import logging
+import os
+import threading
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_AGENT = 'HealthPulseBot/1.0 (+https://healthpulse.example/bot)'
+
+
+class ResponseTooLarge(requests.exceptions.RequestException):
+    """Ответ превысил RSS_HTTP_MAX_RESPONSE_BYTES — дальше не читаем."""
+
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Одна HTTP-сессия на процесс: пул keep-alive соединений на каждый хост и сжатие
+    (gzip/deflate, br — если установлен brotli). После fork (воркеры Celery)
+    сессия создаётся заново, чтобы не делить сокеты с родителем.
+    """
+    global _session, _session_pid
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=getattr(settings, 'RSS_HTTP_POOL_CONNECTIONS', 32),
+                pool_maxsize=getattr(settings, 'RSS_HTTP_POOL_MAXSIZE', 8),
+                max_retries=0,
+            )
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers.update({
+                'User-Agent': getattr(settings, 'RSS_HTTP_USER_AGENT', DEFAULT_USER_AGENT),
+                'Accept-Encoding': ACCEPT_ENCODING,
+            })
+            _session = session
+            _session_pid = os.getpid()
+        return _session
+
+
+def http_get(url: str, headers: dict = None, max_bytes: int = None) -> requests.Response:
+    """
+    GET через общую сессию с раздельными таймаутами на соединение и чтение.
+    Тело читается потоково и обрывается, если распакованный ответ больше max_bytes;
+    после чтения у ответа работают .content и .text, соединение возвращается в пул.
+    """
+    if max_bytes is None:
+        max_bytes = getattr(settings, 'RSS_HTTP_MAX_RESPONSE_BYTES', 5 * 1024 * 1024)
+    timeout = (
+        getattr(settings, 'RSS_HTTP_CONNECT_TIMEOUT', 5),
+        getattr(settings, 'RSS_HTTP_READ_TIMEOUT', 15),
+    )
+
+    response = get_session().get(url, headers=headers, timeout=timeout, stream=True)
+    try:
+        declared = response.headers.get('Content-Length')
+        if declared and declared.isdigit() and int(declared) > max_bytes:
+            raise ResponseTooLarge(f"{url}: Content-Length {declared} больше лимита {max_bytes}")
+
+        chunks = []
+        received = 0
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            received += len(chunk)
+            if received > max_bytes:
+                raise ResponseTooLarge(f"{url}: ответ больше лимита {max_bytes} байт")
+            chunks.append(chunk)
+        response._content = b''.join(chunks)
+    except Exception:
+        response.close()
+        raise
+    return response
@@ -0,0 +1,70 @@
+# rss_feeds/management/commands/bench_html_cleaner.py
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+from django.core.management.base import BaseCommand, CommandError
+from readability.htmls import build_doc
+
+from rss_feeds.benchmarks import legacy
+from rss_feeds.utils import clean_html_element, element_text
+
+
+def run_legacy(html):
+    # Старый путь: BeautifulSoup(html.parser) + многопроходная очистка
+    soup = BeautifulSoup(html, 'html.parser')
+    started = time.perf_counter()
+    legacy.clean_html_element(soup)
+    text = soup.get_text(separator=' ', strip=True)
+    return text, time.perf_counter() - started
+
+
+def run_new(html):
+    # Новый путь: lxml-дерево + однопроходная очистка
+    doc_tree, _ = build_doc(html)
+    started = time.perf_counter()
+    clean_html_element(doc_tree)
+    text = element_text(doc_tree)
+    return text, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = "Сравнивает clean_html_element со старой версией на сохранённых страницах: совпадение извлечённого текста и время очистки."
+
+    def add_arguments(self, parser):
+        parser.add_argument('pages_dir', help="Каталог с сохранёнными HTML-страницами (*.html)")
+        parser.add_argument('--repeat', type=int, default=3, help="Сколько раз прогонять каждую страницу")
+        parser.add_argument('--strict', action='store_true', help="Завершаться с ошибкой при любом расхождении текста")
+
+    def handle(self, *args, **options):
+        pages = sorted(Path(options['pages_dir']).glob('**/*.html'))
+        if not pages:
+            raise CommandError(f"В {options['pages_dir']} нет *.html страниц")
+
+        totals = {'legacy': 0.0, 'new': 0.0}
+        mismatches = []
+        for page in pages:
+            html = page.read_text(encoding='utf-8', errors='replace')
+            outputs = {}
+            for name, runner in (('legacy', run_legacy), ('new', run_new)):
+                for _ in range(options['repeat']):
+                    outputs[name], elapsed = runner(html)
+                    totals[name] += elapsed
+            if outputs['legacy'] != outputs['new']:
+                mismatches.append(page)
+                self.stdout.write(self.style.WARNING(f"Текст отличается: {page}"))
+
+        speedup = totals['legacy'] / totals['new'] if totals['new'] else float('inf')
+        self.stdout.write(
+            f"Страниц: {len(pages)}, повторов: {options['repeat']}\n"
+            f"Старая версия: {totals['legacy']:.3f} с\n"
+            f"Новая версия:  {totals['new']:.3f} с (ускорение ×{speedup:.1f})"
+        )
+        if mismatches:
+            # html.parser и lxml по-разному чинят невалидную разметку (вложенные <form>, <p> в <p> и т.п.)
+            message = f"Текст отличается на {len(mismatches)} из {len(pages)} страниц"
+            if options['strict']:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS("Текст совпадает на всех страницах"))
@@ -0,0 +1,68 @@
+# rss_feeds/management/commands/bench_ingest.py
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.runner import DiscoverRunner
+
+from rss_feeds.benchmarks.corpus import Corpus
+from rss_feeds.benchmarks.suite import BENCHMARKS, compare_results, run_suite
+
+
+class Command(BaseCommand):
+    help = (
+        "Офлайн-бенчмарк загрузки на записанном корпусе (см. record_ingest_corpus): "
+        "ленты и страницы отдаёт локальный сервер с заданной задержкой, задача пишет в тестовую БД."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('corpus_dir', help="Каталог корпуса с manifest.json")
+        parser.add_argument('--latency', type=float, default=0.0, help="Задержка ответа сервера, в секундах")
+        parser.add_argument('--jitter', type=float, default=0.0, help="Случайная добавка к задержке (0..jitter), в секундах")
+        parser.add_argument('--repeat', type=int, default=5, help="Сколько замеров на бенчмарк")
+        parser.add_argument('--only', action='append', choices=list(BENCHMARKS), help="Запустить только эти бенчмарки (можно несколько раз)")
+        parser.add_argument('--output', help="Куда записать результаты (JSON)")
+        parser.add_argument('--compare', help="Результаты прошлого прогона (JSON) для сравнения")
+        parser.add_argument('--threshold', type=float, default=0.1, help="Замедление медианы больше чем на эту долю считается регрессией")
+        parser.add_argument('--fail-on-regression', action='store_true', help="Завершаться с ошибкой при регрессии")
+
+    def handle(self, *args, **options):
+        try:
+            corpus = Corpus.load(options['corpus_dir'])
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f"Не удалось прочитать корпус {options['corpus_dir']}: {e}")
+
+        # Отдельная тестовая база: бенчмарк удаляет и пишет статьи
+        runner = DiscoverRunner(verbosity=0)
+        runner.setup_test_environment()
+        old_config = runner.setup_databases()
+        try:
+            results = run_suite(
+                corpus, names=options['only'], repeat=options['repeat'],
+                latency=options['latency'], jitter=options['jitter'], log=self.stdout.write,
+            )
+        finally:
+            runner.teardown_databases(old_config)
+            runner.teardown_test_environment()
+
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding='utf-8')
+            self.stdout.write(f"Результаты записаны в {options['output']}")
+
+        if options['compare']:
+            previous = json.loads(Path(options['compare']).read_text(encoding='utf-8'))
+            regressions = []
+            for name, before, after, ratio, regressed in compare_results(previous, results, options['threshold']):
+                line = f"{name}: {before * 1000:.1f} → {after * 1000:.1f} мс (×{ratio:.2f})"
+                if regressed:
+                    regressions.append(name)
+                    self.stdout.write(self.style.WARNING(line))
+                else:
+                    self.stdout.write(line)
+            if regressions:
+                message = f"Регрессия больше {options['threshold']:.0%}: {', '.join(regressions)}"
+                if options['fail_on_regression']:
+                    raise CommandError(message)
+                self.stdout.write(self.style.WARNING(message))
+            else:
+                self.stdout.write(self.style.SUCCESS("Регрессий нет"))
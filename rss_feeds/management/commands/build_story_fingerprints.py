@@ -0,0 +1,42 @@
+# rss_feeds/management/commands/build_story_fingerprints.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from articles.models import Article
+from rss_feeds.near_duplicates import find_near_duplicates, index_articles
+
+
+class Command(BaseCommand):
+    help = (
+        "Строит MinHash-подписи и полосы LSH для статей, сохранённых до включения поиска "
+        "почти-дубликатов. Найденные среди них дубликаты помечаются через duplicate_of."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200, help="Сколько статей обрабатывать за раз")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = (
+            Article.objects.filter(fingerprint__isnull=True, duplicate_of__isnull=True)
+            .only('id', 'original_content')
+            .order_by('pk')
+        )
+        indexed = flagged = 0
+        last_pk = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            # Старые статьи идут раньше новых, поэтому оригиналом остаётся первая сохранённая копия
+            signatures, duplicates = find_near_duplicates({article.pk: article.original_content for article in batch})
+            with transaction.atomic():
+                for article_id, (kind, original) in duplicates.items():
+                    Article.objects.filter(pk=article_id).update(duplicate_of_id=original)
+                index_articles({pk: signature for pk, signature in signatures.items() if pk not in duplicates})
+            indexed += len(signatures) - len(duplicates)
+            flagged += len(duplicates)
+            self.stdout.write(f"Обработано до id {last_pk}: проиндексировано {indexed}, дубликатов {flagged}")
+
+        self.stdout.write(self.style.SUCCESS(f"Готово: проиндексировано {indexed} статей, помечено {flagged} дубликатов"))
@@ -0,0 +1,61 @@
+# rss_feeds/management/commands/ingest_metrics.py
+from django.core.management.base import BaseCommand
+
+from rss_feeds.metrics import METRICS, group_series, histogram_quantile, metrics, render_prometheus
+
+
+class Command(BaseCommand):
+    help = "Печатает сводку метрик загрузки: стадии, домены, исходы извлечения и ошибки."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prometheus', action='store_true', help="Вывести метрики как есть, в формате Prometheus")
+        parser.add_argument('--top', type=int, default=10, help="Сколько самых медленных доменов показать")
+        parser.add_argument('--reset', action='store_true', help="Обнулить накопленные метрики")
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            metrics.reset()
+            self.stdout.write(self.style.SUCCESS("Метрики обнулены"))
+            return
+
+        values = metrics.snapshot()
+        if options['prometheus']:
+            self.stdout.write(render_prometheus(values), ending='')
+            return
+        series = group_series(values)
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Стадии"))
+        self.stdout.write(f"{'стадия':<15}{'вызовов':>10}{'всего, с':>12}{'среднее, мс':>14}{'p50, мс':>10}{'p95, мс':>10}")
+        buckets = METRICS['ingest_stage_seconds'][2]
+        for labels, parts in sorted(series.get('ingest_stage_seconds', {}).items()):
+            count = parts.get('count', 0)
+            self.stdout.write(
+                f"{dict(labels).get('stage', ''):<15}{count:>10.0f}{parts.get('sum', 0):>12.2f}"
+                f"{parts.get('sum', 0) / count * 1000 if count else 0:>14.1f}"
+                f"{histogram_quantile(0.5, parts, buckets) * 1000:>10.1f}{histogram_quantile(0.95, parts, buckets) * 1000:>10.1f}"
+            )
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Скачивание страниц по доменам (top {options['top']} по p95)"))
+        self.stdout.write(f"{'домен':<40}{'страниц':>9}{'p95, мс':>10}{'средний размер, КБ':>20}")
+        latency = series.get('ingest_page_fetch_seconds', {})
+        sizes = series.get('ingest_page_bytes', {})
+        latency_buckets = METRICS['ingest_page_fetch_seconds'][2]
+        ranked = sorted(latency.items(), key=lambda item: histogram_quantile(0.95, item[1], latency_buckets), reverse=True)
+        for labels, parts in ranked[:options['top']]:
+            size = sizes.get(labels, {})
+            average_kb = size.get('sum', 0) / size['count'] / 1024 if size.get('count') else 0
+            self.stdout.write(
+                f"{dict(labels).get('domain', ''):<40}{parts.get('count', 0):>9.0f}"
+                f"{histogram_quantile(0.95, parts, latency_buckets) * 1000:>10.0f}{average_kb:>20.1f}"
+            )
+
+        for name, title in (('ingest_extraction_total', "Исходы извлечения"), ('ingest_page_cache_total', "Кэш страниц"),
+                            ('ingest_feed_polls_total', "Опросы лент"), ('ingest_entries_total', "Записи лент"),
+                            ('ingest_articles_stored_total', "Сохранено статей"), ('ingest_errors_total', "Ошибки")):
+            self.stdout.write(self.style.MIGRATE_HEADING(title))
+            rows = sorted(series.get(name, {}).items(), key=lambda item: -item[1].get('value', 0))
+            if not rows:
+                self.stdout.write("  —")
+            for labels, parts in rows:
+                label_text = ', '.join(f"{key}={value}" for key, value in labels) or 'всего'
+                self.stdout.write(f"  {label_text:<60}{parts.get('value', 0):>10.0f}")
@@ -0,0 +1,30 @@
+# rss_feeds/management/commands/record_ingest_corpus.py
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from rss_feeds.benchmarks.corpus import record_corpus
+from rss_feeds.http_client import get_session
+
+
+class Command(BaseCommand):
+    help = "Записывает корпус для офлайн-бенчмарков загрузки: RSS-ленты из фикстуры и страницы их статей."
+
+    def add_arguments(self, parser):
+        parser.add_argument('output_dir', help="Каталог корпуса (будет создан)")
+        parser.add_argument('--feeds', default=str(Path(settings.BASE_DIR) / 'initial_rss_feeds.json'), help="Фикстура с лентами (формат dumpdata rss_feeds.rssfeed)")
+        parser.add_argument('--per-feed', type=int, default=10, help="Сколько страниц статей записать из каждой ленты")
+
+    def handle(self, *args, **options):
+        try:
+            fixture = json.loads(Path(options['feeds']).read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Не удалось прочитать {options['feeds']}: {e}")
+        feeds = [item['fields'] for item in fixture if item.get('model') == 'rss_feeds.rssfeed']
+
+        corpus = record_corpus(options['output_dir'], feeds, options['per_feed'], get_session(), log=self.stdout.write)
+        self.stdout.write(self.style.SUCCESS(
+            f"Записано лент: {len(corpus.feeds)}, страниц: {len(corpus.urls('page'))} → {corpus.root}"
+        ))
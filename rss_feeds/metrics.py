@@ -0,0 +1,223 @@
+# rss_feeds/metrics.py
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+BYTES_BUCKETS = (1024, 10 * 1024, 50 * 1024, 100 * 1024, 250 * 1024, 500 * 1024, 1024 * 1024, 2560 * 1024, 5 * 1024 * 1024)
+
+# Все метрики загрузки: имя -> (тип, описание, корзины гистограммы)
+METRICS = {
+    'ingest_stage_seconds': ('histogram', "Длительность стадии загрузки (stage: feed_download, feed_parse, page_fetch, extract, html_clean, db_write)", SECONDS_BUCKETS),
+    'ingest_page_fetch_seconds': ('histogram', "Время скачивания страницы статьи по доменам", SECONDS_BUCKETS),
+    'ingest_page_bytes': ('histogram', "Размер скачанной страницы статьи по доменам", BYTES_BUCKETS),
+    'ingest_feed_bytes': ('histogram', "Размер скачанного тела ленты по доменам", BYTES_BUCKETS),
+    'ingest_extraction_total': ('counter', "Исходы извлечения контента (method: selector, readability, empty)", None),
+    'ingest_page_cache_total': ('counter', "Обращения к кэшу страниц (result: hit_result, hit_body, miss)", None),
+    'ingest_feed_polls_total': ('counter', "Опросы лент (result: modified, not_modified)", None),
+    'ingest_entries_total': ('counter', "Записи лент (status: new, known)", None),
+    'ingest_articles_stored_total': ('counter', "Сохранённые статьи", None),
+    'ingest_errors_total': ('counter', "Ошибки по стадиям загрузки", None),
+}
+
+REDIS_KEY = 'healthpulse:metrics'
+
+
+class MetricsRegistry:
+    """
+    Счётчики и гистограммы процесса. Значения копятся в памяти и сбрасываются
+    в общий Redis-хэш (flush) — так метрики всех воркеров Celery видны веб-процессу.
+    Без Redis (RSS_COORDINATION_REDIS_URL = None) метрики остаются в памяти процесса.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {} # (имя, метки, суффикс) -> значение
+
+    @staticmethod
+    def _labels(labels: dict) -> tuple:
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def _add(self, key, value):
+        self._values[key] = self._values.get(key, 0) + value
+
+    def inc(self, name: str, value: float = 1, **labels):
+        with self._lock:
+            self._add((name, self._labels(labels), 'value'), value)
+
+    def observe(self, name: str, value: float, **labels):
+        buckets = METRICS[name][2]
+        label_key = self._labels(labels)
+        with self._lock:
+            self._add((name, label_key, 'count'), 1)
+            self._add((name, label_key, 'sum'), value)
+            # Храним попадание в одну корзину, накопленные значения считаются при выводе
+            bucket = next((bound for bound in buckets if value <= bound), '+Inf')
+            self._add((name, label_key, f'bucket:{bucket}'), 1)
+
+    @contextmanager
+    def timer(self, name: str = 'ingest_stage_seconds', **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def _take(self) -> dict:
+        with self._lock:
+            values, self._values = self._values, {}
+        return values
+
+    def flush(self):
+        """Отправляет накопленные значения в Redis (одним pipeline) и обнуляет локальные."""
+        from .coordination import get_redis
+
+        redis_client = get_redis()
+        if redis_client is None:
+            return
+        values = self._take()
+        if not values:
+            return
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for key, value in values.items():
+                pipe.hincrbyfloat(REDIS_KEY, json.dumps(key), value)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Не удалось отправить метрики в Redis: {e}")
+            with self._lock: # Вернём значения, чтобы не потерять их до следующей попытки
+                for key, value in values.items():
+                    self._add(key, value)
+
+    def snapshot(self) -> dict:
+        """Текущие значения: общий Redis-хэш плюс ещё не отправленное из этого процесса."""
+        from .coordination import get_redis
+
+        values = {}
+        redis_client = get_redis()
+        if redis_client is not None:
+            try:
+                stored = redis_client.hgetall(REDIS_KEY)
+            except Exception as e:
+                # /metrics не должен падать из-за Redis: отдаём хотя бы значения этого процесса
+                logger.warning(f"Не удалось прочитать метрики из Redis: {e}")
+                stored = {}
+            for field, value in stored.items():
+                name, labels, suffix = json.loads(field)
+                values[(name, tuple(tuple(label) for label in labels), suffix)] = float(value)
+        with self._lock:
+            for key, value in self._values.items():
+                values[key] = values.get(key, 0) + value
+        return values
+
+    def reset(self):
+        from .coordination import get_redis
+
+        self._take()
+        redis_client = get_redis()
+        if redis_client is not None:
+            redis_client.delete(REDIS_KEY)
+
+
+metrics = MetricsRegistry()
+
+
+def _format_number(value) -> str:
+    # Целые — без экспоненты и ".0", чтобы большие счётчики не теряли точность
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _format_labels(labels, extra=()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    escaped = ('{}="{}"'.format(key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')) for key, value in pairs)
+    return '{' + ','.join(escaped) + '}'
+
+
+def group_series(values: dict) -> dict:
+    """{имя: {метки: {суффикс: значение}}} — удобная форма для вывода."""
+    grouped = {}
+    for (name, labels, suffix), value in values.items():
+        grouped.setdefault(name, {}).setdefault(labels, {})[suffix] = value
+    return grouped
+
+
+def render_prometheus(values: dict) -> str:
+    """Текстовый формат Prometheus (exposition format 0.0.4)."""
+    lines = []
+    for name, series in sorted(group_series(values).items()):
+        if name not in METRICS:
+            continue
+        kind, help_text, buckets = METRICS[name]
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, parts in sorted(series.items()):
+            if kind == 'counter':
+                lines.append(f'{name}{_format_labels(labels)} {_format_number(parts.get("value", 0))}')
+                continue
+            cumulative = 0
+            for bound in buckets:
+                cumulative += parts.get(f'bucket:{bound}', 0)
+                lines.append(f'{name}_bucket{_format_labels(labels, [("le", _format_number(bound))])} {_format_number(cumulative)}')
+            lines.append(f'{name}_bucket{_format_labels(labels, [("le", "+Inf")])} {_format_number(parts.get("count", 0))}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {_format_number(parts.get("sum", 0))}')
+            lines.append(f'{name}_count{_format_labels(labels)} {_format_number(parts.get("count", 0))}')
+    return '\n'.join(lines) + '\n'
+
+
+def histogram_quantile(quantile: float, parts: dict, buckets) -> float:
+    """Оценка квантиля по корзинам (как histogram_quantile в Prometheus: линейно внутри корзины)."""
+    total = parts.get('count', 0)
+    if not total:
+        return 0.0
+    rank = quantile * total
+    cumulative, lower = 0, 0.0
+    for bound in buckets:
+        count = parts.get(f'bucket:{bound}', 0)
+        if cumulative + count >= rank:
+            return lower + (bound - lower) * ((rank - cumulative) / count if count else 0)
+        cumulative += count
+        lower = bound
+    return float(buckets[-1])
+
+
+@contextmanager
+def profile_if_slow(label: str):
+    """
+    Выборочный cProfile: с вероятностью RSS_PROFILE_SAMPLE_RATE профилирует блок и,
+    если он занял дольше RSS_PROFILE_SLOW_SECONDS, сохраняет .prof в RSS_PROFILE_DIR
+    и пишет в лог верх профиля. При нулевой частоте ничего не стоит.
+    """
+    sample_rate = getattr(settings, 'RSS_PROFILE_SAMPLE_RATE', 0)
+    if not sample_rate or random.random() >= sample_rate:
+        yield
+        return
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - started
+        if elapsed >= getattr(settings, 'RSS_PROFILE_SLOW_SECONDS', 2.0):
+            profile_dir = getattr(settings, 'RSS_PROFILE_DIR', None)
+            if profile_dir:
+                os.makedirs(profile_dir, exist_ok=True)
+                safe_label = ''.join(char if char.isalnum() or char in '.-' else '_' for char in label)[:100]
+                profiler.dump_stats(os.path.join(str(profile_dir), f'{int(time.time())}-{safe_label}.prof'))
+            report = io.StringIO()
+            pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats(15)
+            logger.warning(f"Медленная обработка {label}: {elapsed:.2f} с\n{report.getvalue()}")
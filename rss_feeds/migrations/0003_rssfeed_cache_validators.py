@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rss_feeds', '0002_auto_20251107_0705'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rssfeed',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', help_text='SHA-256 тела последнего загруженного ответа ленты', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='rssfeed',
+            name='etag',
+            field=models.CharField(blank=True, default='', help_text='ETag из последнего ответа ленты', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='rssfeed',
+            name='last_modified',
+            field=models.CharField(blank=True, default='', help_text='Last-Modified из последнего ответа ленты', max_length=255),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rss_feeds', '0003_rssfeed_cache_validators'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentSource',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('domain', models.CharField(help_text='Домен источника; подходит и для поддоменов (sciencedaily.com → www.sciencedaily.com)', max_length=255, unique=True)),
+                ('selectors', models.TextField(help_text='CSS-селекторы основного контента, по одному на строку, в порядке приоритета')),
+                ('is_active', models.BooleanField(default=True, help_text='Использовать ли селекторы этого источника')),
+                ('selector_hits', models.JSONField(blank=True, default=dict, help_text='Сколько раз сработал каждый селектор')),
+                ('fallback_count', models.IntegerField(default=0, help_text='Сколько раз ни один селектор не подошёл')),
+            ],
+            options={
+                'verbose_name': 'Content Source',
+                'verbose_name_plural': 'Content Sources',
+            },
+        ),
+    ]
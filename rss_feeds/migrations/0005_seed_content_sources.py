@@ -0,0 +1,37 @@
+# Переносим захардкоженные селекторы из parse_rss_feed в таблицу ContentSource
+
+from django.db import migrations
+
+INITIAL_SELECTORS = {
+    'sciencedaily.com': ['article', '.content', '.story', '.post-content'],
+    'webmd.com': ['.article-content', '.post-content', 'article', '.content'],
+    'reuters.com': ['[data-testid="BodyWrapper"]', '.resizeableText', '.StandardArticleBody_body'],
+    'medicalnewstoday.com': ['.content', '.article-body', 'article'],
+    'healthline.com': ['.content', '.article-body', '.structured-content', 'article'],
+    'mindbodygreen.com': ['.content', '.article-body', '.post-content', 'article'],
+    'hsph.harvard.edu': ['.post-content', '.content', 'article', '.entry-content'],
+}
+
+
+def load_selectors(apps, schema_editor):
+    ContentSource = apps.get_model('rss_feeds', 'ContentSource')
+    ContentSource.objects.bulk_create(
+        [ContentSource(domain=domain, selectors='\n'.join(selectors)) for domain, selectors in INITIAL_SELECTORS.items()],
+        ignore_conflicts=True,
+    )
+
+
+def reverse_func(apps, schema_editor):
+    ContentSource = apps.get_model('rss_feeds', 'ContentSource')
+    ContentSource.objects.filter(domain__in=list(INITIAL_SELECTORS)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rss_feeds', '0004_contentsource'),
+    ]
+
+    operations = [
+        migrations.RunPython(load_selectors, reverse_func),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0009_article_duplicate_of'),
+        ('rss_feeds', '0005_seed_content_sources'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoryFingerprint',
+            fields=[
+                ('article', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='fingerprint', serialize=False, to='articles.article')),
+                ('signature', models.BinaryField(help_text='MinHash-подпись: NUM_PERM беззнаковых 64-битных чисел')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StoryBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.BigIntegerField(db_index=True, help_text='Хэш одной полосы подписи вместе с её номером')),
+                ('fingerprint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bands', to='rss_feeds.storyfingerprint')),
+            ],
+        ),
+    ]
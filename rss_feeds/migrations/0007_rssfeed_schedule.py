@@ -0,0 +1,67 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:40
+
+import random
+from datetime import timedelta
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def spread_schedule(apps, schema_editor):
+    # Интервал начинается с fetch_frequency, а первые опросы разносим по этому интервалу,
+    # чтобы после миграции все ленты не ушли в опрос одним тиком.
+    # publish_rate стартует с частоты, при которой этот интервал и держится (одна новая статья на опрос),
+    # иначе первый же пустой опрос считал бы ленту заброшенной
+    RSSFeed = apps.get_model('rss_feeds', 'RSSFeed')
+    now = django.utils.timezone.now()
+    feeds = list(RSSFeed.objects.all())
+    for feed in feeds:
+        feed.poll_interval = max(feed.fetch_frequency, 1)
+        feed.publish_rate = 60 / feed.poll_interval
+        feed.next_fetch_at = now + timedelta(minutes=random.uniform(0, feed.poll_interval))
+    RSSFeed.objects.bulk_update(feeds, ['poll_interval', 'publish_rate', 'next_fetch_at'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rss_feeds', '0006_story_fingerprints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rssfeed',
+            name='consecutive_failures',
+            field=models.PositiveIntegerField(default=0, help_text='Сколько опросов подряд закончились ошибкой'),
+        ),
+        migrations.AddField(
+            model_name='rssfeed',
+            name='last_error',
+            field=models.CharField(blank=True, default='', help_text='Текст последней ошибки опроса', max_length=500),
+        ),
+        migrations.AddField(
+            model_name='rssfeed',
+            name='next_fetch_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='Когда ленту пора опросить в следующий раз'),
+        ),
+        migrations.AddField(
+            model_name='rssfeed',
+            name='poll_interval',
+            field=models.PositiveIntegerField(default=30, help_text='Текущий интервал опроса в минутах, подстраивается под частоту публикаций'),
+        ),
+        migrations.AddField(
+            model_name='rssfeed',
+            name='publish_rate',
+            field=models.FloatField(default=0, help_text='Сглаженная частота новых статей, в статьях в час'),
+        ),
+        migrations.AlterField(
+            model_name='rssfeed',
+            name='fetch_frequency',
+            field=models.IntegerField(default=30, help_text='Начальная частота опроса ленты в минутах; дальше интервал подстраивается сам'),
+        ),
+        migrations.RunPython(spread_schedule, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='rssfeed',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['next_fetch_at'], name='rssfeed_due_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rss_feeds', '0007_rssfeed_schedule'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contentsource',
+            name='boilerplate_phrases',
+            field=models.TextField(blank=True, default='', help_text='Дополнительные фразы-мусор, по одной на строку ("..." — короткий разрыв); "!фраза" отключает фразу по умолчанию'),
+        ),
+    ]
@@ -1,5 +1,7 @@
 # rss_feeds/models.py
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
 
 # Определяем возможные категории для RSS-ленты
 CATEGORIES = [
@@ -14,11 +16,72 @@ class RSSFeed(models.Model):
     category = models.CharField(max_length=50, choices=CATEGORIES, help_text="Категория, в которую будут помещаться статьи из этой ленты")
     is_active = models.BooleanField(default=True, help_text="Активна ли лента для опроса")
     last_fetched = models.DateTimeField(null=True, blank=True, help_text="Время последнего опроса ленты")
-    fetch_frequency = models.IntegerField(default=30, help_text="Частота опроса ленты в минутах") # 30 минут по умолчанию
+    fetch_frequency = models.IntegerField(default=30, help_text="Начальная частота опроса ленты в минутах; дальше интервал подстраивается сам") # 30 минут по умолчанию
+    # --- Валидаторы кэша для условного GET ---
+    etag = models.CharField(max_length=255, blank=True, default='', help_text="ETag из последнего ответа ленты")
+    last_modified = models.CharField(max_length=255, blank=True, default='', help_text="Last-Modified из последнего ответа ленты")
+    content_hash = models.CharField(max_length=64, blank=True, default='', help_text="SHA-256 тела последнего загруженного ответа ленты")
+    # --- Адаптивное расписание опроса (см. rss_feeds/scheduling.py) ---
+    next_fetch_at = models.DateTimeField(default=timezone.now, help_text="Когда ленту пора опросить в следующий раз")
+    poll_interval = models.PositiveIntegerField(default=30, help_text="Текущий интервал опроса в минутах, подстраивается под частоту публикаций")
+    publish_rate = models.FloatField(default=0, help_text="Сглаженная частота новых статей, в статьях в час")
+    consecutive_failures = models.PositiveIntegerField(default=0, help_text="Сколько опросов подряд закончились ошибкой")
+    last_error = models.CharField(max_length=500, blank=True, default='', help_text="Текст последней ошибки опроса")
 
     def __str__(self):
         return f"{self.url} ({self.get_category_display()})"
 
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            from .scheduling import initial_publish_rate
+
+            # Адаптация стартует с заданной частоты
+            self.poll_interval = max(self.fetch_frequency, 1)
+            if not self.publish_rate:
+                self.publish_rate = initial_publish_rate(self.poll_interval)
+        super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = "RSS Feed"
         verbose_name_plural = "RSS Feeds"
+        indexes = [
+            # Очередь опроса: is_active=True AND next_fetch_at <= now ORDER BY next_fetch_at
+            models.Index(fields=['next_fetch_at'], condition=Q(is_active=True), name='rssfeed_due_idx'),
+        ]
+
+
+class ContentSource(models.Model):
+    domain = models.CharField(max_length=255, unique=True, help_text="Домен источника; подходит и для поддоменов (sciencedaily.com → www.sciencedaily.com)")
+    selectors = models.TextField(help_text="CSS-селекторы основного контента, по одному на строку, в порядке приоритета")
+    is_active = models.BooleanField(default=True, help_text="Использовать ли селекторы этого источника")
+    selector_hits = models.JSONField(default=dict, blank=True, help_text="Сколько раз сработал каждый селектор")
+    fallback_count = models.IntegerField(default=0, help_text="Сколько раз ни один селектор не подошёл")
+    boilerplate_phrases = models.TextField(blank=True, default='', help_text="Дополнительные фразы-мусор, по одной на строку (\"...\" — короткий разрыв); \"!фраза\" отключает фразу по умолчанию")
+
+    def __str__(self):
+        return self.domain
+
+    def get_selectors(self) -> list:
+        return [line.strip() for line in self.selectors.splitlines() if line.strip()]
+
+    class Meta:
+        verbose_name = "Content Source"
+        verbose_name_plural = "Content Sources"
+
+
+class StoryFingerprint(models.Model):
+    """
+    MinHash-подпись текста статьи для поиска почти-дубликатов (см. rss_feeds/near_duplicates.py).
+    Сами полосы LSH лежат в StoryBand, чтобы кандидатов находить по индексу.
+    """
+    article = models.OneToOneField('articles.Article', on_delete=models.CASCADE, primary_key=True, related_name='fingerprint')
+    signature = models.BinaryField(help_text="MinHash-подпись: NUM_PERM беззнаковых 64-битных чисел")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Fingerprint #{self.article_id}"
+
+
+class StoryBand(models.Model):
+    fingerprint = models.ForeignKey(StoryFingerprint, on_delete=models.CASCADE, related_name='bands')
+    key = models.BigIntegerField(db_index=True, help_text="Хэш одной полосы подписи вместе с её номером")
@@ -0,0 +1,135 @@
+# rss_feeds/near_duplicates.py
+import hashlib
+import logging
+import random
+import re
+import struct
+from array import array
+
+from django.conf import settings
+
+from .models import StoryBand, StoryFingerprint
+
+logger = logging.getLogger(__name__)
+
+# Параметры MinHash/LSH: 16 полос по 8 строк. Пара с похожестью по Жаккару s становится
+# кандидатом с вероятностью 1 - (1 - s^8)^16: ~0.9 при s = 0.8 и ~0.04 при s = 0.5.
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 5 # Шинглы — по 5 слов подряд
+MIN_WORDS = 50 # Короткие тексты (анонсы, заглушки) не сравниваем: на них слишком много ложных совпадений
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 64) - 1
+_rng = random.Random(1729) # Перестановки должны совпадать между процессами и запусками
+PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _hash64(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'big')
+
+
+def shingles(text: str) -> set:
+    """64-битные хэши словесных шинглов текста (регистр и пунктуация не учитываются)."""
+    words = WORD_RE.findall(text.lower())
+    if len(words) < MIN_WORDS:
+        return set()
+    return {_hash64(' '.join(words[i:i + SHINGLE_SIZE]).encode('utf-8')) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash(text: str):
+    """MinHash-подпись текста (кортеж из NUM_PERM чисел) или None, если текст слишком короткий."""
+    hashes = shingles(text)
+    if not hashes:
+        return None
+    return tuple(min([(a * h + b) % _PRIME for h in hashes]) for a, b in PERMUTATIONS)
+
+
+def similarity(first, second) -> float:
+    """Оценка похожести по Жаккару — доля совпавших позиций подписи."""
+    return sum(1 for x, y in zip(first, second) if x == y) / NUM_PERM
+
+
+def band_keys(signature) -> list:
+    keys = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS:(band + 1) * ROWS]
+        digest = _hash64(struct.pack(f'>H{ROWS}Q', band, *rows))
+        keys.append(digest - (1 << 64) if digest > _MAX_HASH >> 1 else digest) # BigIntegerField знаковый
+    return keys
+
+
+def pack_signature(signature) -> bytes:
+    return array('Q', signature).tobytes()
+
+
+def unpack_signature(data) -> tuple:
+    return tuple(array('Q', bytes(data)))
+
+
+def find_near_duplicates(texts: dict) -> dict:
+    """
+    Ищет почти-дубликаты для новых текстов {ключ: текст}: среди уже сохранённых статей
+    (по полосам LSH в БД — один индексированный запрос на пачку) и внутри самой пачки.
+    Возвращает (signatures, duplicates):
+      signatures — {ключ: подпись} для текстов, которые удалось проиндексировать;
+      duplicates — {ключ: ('article', id статьи) | ('batch', ключ оригинала из пачки)}.
+    """
+    threshold = getattr(settings, 'RSS_NEAR_DUPLICATE_THRESHOLD', 0.8)
+    signatures = {}
+    for key, text in texts.items():
+        signature = minhash(text or '')
+        if signature is not None:
+            signatures[key] = signature
+    if not signatures:
+        return {}, {}
+
+    keys_by_item = {key: band_keys(signature) for key, signature in signatures.items()}
+    all_keys = {band_key for band_keys_ in keys_by_item.values() for band_key in band_keys_}
+    candidates = {}
+    for band_key, article_id in StoryBand.objects.filter(key__in=all_keys).values_list('key', 'fingerprint_id'):
+        candidates.setdefault(band_key, set()).add(article_id)
+    candidate_ids = set().union(*candidates.values()) if candidates else set()
+    stored = {
+        article_id: unpack_signature(signature)
+        for article_id, signature in StoryFingerprint.objects.filter(pk__in=candidate_ids).values_list('article_id', 'signature')
+    }
+
+    duplicates = {}
+    batch_buckets = {} # Полосы уже принятых текстов этой же пачки
+    for key, signature in signatures.items():
+        best, best_score = None, threshold
+        for article_id in set().union(*(candidates.get(band_key, ()) for band_key in keys_by_item[key])):
+            score = similarity(signature, stored[article_id])
+            if score >= best_score:
+                best, best_score = ('article', article_id), score
+        for other in set().union(*(batch_buckets.get(band_key, ()) for band_key in keys_by_item[key])):
+            score = similarity(signature, signatures[other])
+            if score >= best_score:
+                best, best_score = ('batch', other), score
+        if best is not None:
+            duplicates[key] = best
+            logger.info(f"Почти-дубликат ({best_score:.2f}): {key} → {best[1]}")
+            continue
+        for band_key in keys_by_item[key]:
+            batch_buckets.setdefault(band_key, set()).add(key)
+
+    return signatures, duplicates
+
+
+def index_articles(signatures_by_article: dict):
+    """Сохраняет подписи и полосы LSH для статей {id статьи: подпись}."""
+    if not signatures_by_article:
+        return
+    StoryFingerprint.objects.bulk_create([
+        StoryFingerprint(article_id=article_id, signature=pack_signature(signature))
+        for article_id, signature in signatures_by_article.items()
+    ])
+    StoryBand.objects.bulk_create([
+        StoryBand(fingerprint_id=article_id, key=band_key)
+        for article_id, signature in signatures_by_article.items()
+        for band_key in band_keys(signature)
+    ], batch_size=500)
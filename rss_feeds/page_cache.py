@@ -0,0 +1,132 @@
+# rss_feeds/page_cache.py
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PageCache:
+    """
+    Локальный дисковый кэш (один SQLite-файл) для тел ответов и результатов извлечения.
+    Значения хранятся сжатыми (zlib), у записей есть TTL, а при превышении
+    лимита по размеру вытесняются давно не читавшиеся (LRU).
+    Соединения — отдельные на каждый поток, потому что страницы качаются параллельно.
+    """
+
+    # Как часто (в записях) проверять общий размер кэша
+    EVICTION_CHECK_EVERY = 20
+
+    def __init__(self, path, max_bytes: int, ttl: int):
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                'key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, '
+                'created_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)')
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str):
+        """Возвращает байты по ключу или None (нет записи или истёк TTL)."""
+        conn = self._connection()
+        row = conn.execute('SELECT value, created_at FROM entries WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        value, created_at = row
+        now = time.time()
+        if now - created_at > self.ttl:
+            conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+            return None
+        conn.execute('UPDATE entries SET accessed_at = ? WHERE key = ?', (now, key))
+        return zlib.decompress(value)
+
+    def set(self, key: str, value: bytes):
+        compressed = zlib.compress(value, 6)
+        now = time.time()
+        self._connection().execute(
+            'INSERT OR REPLACE INTO entries (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)',
+            (key, compressed, len(compressed), now, now),
+        )
+        with self._writes_lock:
+            self._writes += 1
+            check = self._writes % self.EVICTION_CHECK_EVERY == 0
+        if check:
+            self.evict()
+
+    def get_text(self, key: str):
+        value = self.get(key)
+        return value.decode('utf-8') if value is not None else None
+
+    def set_text(self, key: str, value: str):
+        self.set(key, value.encode('utf-8'))
+
+    def get_json(self, key: str):
+        value = self.get(key)
+        return json.loads(value) if value is not None else None
+
+    def set_json(self, key: str, value):
+        self.set(key, json.dumps(value).encode('utf-8'))
+
+    def evict(self):
+        """Удаляет записи с истёкшим TTL, затем самые давно читавшиеся, пока кэш не влезет в лимит."""
+        conn = self._connection()
+        conn.execute('DELETE FROM entries WHERE created_at < ?', (time.time() - self.ttl,))
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        to_free = total - self.max_bytes
+        keys = []
+        for key, size in conn.execute('SELECT key, size FROM entries ORDER BY accessed_at'):
+            keys.append(key)
+            to_free -= size
+            if to_free <= 0:
+                break
+        conn.executemany('DELETE FROM entries WHERE key = ?', [(key,) for key in keys])
+        logger.info(f"Кэш страниц: вытеснено {len(keys)} записей (лимит {self.max_bytes} байт)")
+
+    def clear(self):
+        self._connection().execute('DELETE FROM entries')
+
+
+_page_cache = None
+_page_cache_pid = None
+
+
+def get_page_cache():
+    """
+    Кэш страниц текущего процесса или None, если он выключен (RSS_PAGE_CACHE_PATH = None).
+    После fork (воркеры Celery) кэш открывается заново.
+    """
+    global _page_cache, _page_cache_pid
+    path = getattr(settings, 'RSS_PAGE_CACHE_PATH', None)
+    if not path:
+        return None
+    if _page_cache is None or _page_cache_pid != os.getpid():
+        _page_cache = PageCache(
+            path,
+            max_bytes=getattr(settings, 'RSS_PAGE_CACHE_MAX_BYTES', 512 * 1024 * 1024),
+            ttl=getattr(settings, 'RSS_PAGE_CACHE_TTL', 7 * 24 * 3600),
+        )
+        _page_cache_pid = os.getpid()
+    return _page_cache
@@ -0,0 +1,68 @@
+# rss_feeds/scheduling.py
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+# Вес нового наблюдения в сглаженной частоте публикаций
+PUBLISH_RATE_ALPHA = 0.3
+SCHEDULE_FIELDS = ['next_fetch_at', 'poll_interval', 'publish_rate', 'consecutive_failures', 'last_error']
+
+
+def interval_bounds():
+    return (
+        getattr(settings, 'RSS_POLL_MIN_INTERVAL', 15),
+        getattr(settings, 'RSS_POLL_MAX_INTERVAL', 24 * 60),
+    )
+
+
+def jittered(minutes: float) -> timedelta:
+    """Интервал со случайным разбросом, чтобы ленты не собирались в один тик beat'а."""
+    jitter = getattr(settings, 'RSS_POLL_JITTER', 0.1)
+    return timedelta(minutes=minutes * random.uniform(1 - jitter, 1 + jitter))
+
+
+def adapt_interval(feed, new_articles: int, now) -> int:
+    """
+    Обновляет publish_rate (статей в час, экспоненциальное сглаживание) по результату
+    опроса и возвращает интервал, при котором на опрос приходится примерно
+    RSS_POLL_TARGET_NEW_ARTICLES новых статей, в пределах RSS_POLL_MIN/MAX_INTERVAL.
+    Удлиняется интервал постепенно — не больше чем в RSS_POLL_MAX_GROWTH раз за опрос,
+    чтобы пара пустых опросов не отправила активную ленту сразу на максимум
+    (и она не потеряла записи, которые успеют выпасть из окна ленты).
+    """
+    min_interval, max_interval = interval_bounds()
+    elapsed_hours = (now - feed.last_fetched).total_seconds() / 3600 if feed.last_fetched else feed.poll_interval / 60
+    observed = new_articles / max(elapsed_hours, min_interval / 60)
+    feed.publish_rate = PUBLISH_RATE_ALPHA * observed + (1 - PUBLISH_RATE_ALPHA) * feed.publish_rate
+    if feed.publish_rate > 0:
+        target = getattr(settings, 'RSS_POLL_TARGET_NEW_ARTICLES', 1) / feed.publish_rate * 60
+    else:
+        target = max_interval
+    target = min(target, feed.poll_interval * getattr(settings, 'RSS_POLL_MAX_GROWTH', 2))
+    return int(min(max(target, min_interval), max_interval))
+
+
+def initial_publish_rate(poll_interval: int) -> float:
+    """Частота, при которой адаптация на старте держит заданный интервал опроса."""
+    return getattr(settings, 'RSS_POLL_TARGET_NEW_ARTICLES', 1) * 60 / max(poll_interval, 1)
+
+
+def schedule_success(feed, new_articles: int, now=None):
+    """Успешный опрос (в том числе 304): пересчитываем интервал и сбрасываем счётчик ошибок."""
+    now = now or timezone.now()
+    feed.poll_interval = adapt_interval(feed, new_articles, now)
+    feed.consecutive_failures = 0
+    feed.last_error = ''
+    feed.next_fetch_at = now + jittered(feed.poll_interval)
+
+
+def schedule_failure(feed, error, now=None):
+    """Ошибка опроса: экспоненциальная задержка от текущего интервала, не дольше RSS_POLL_MAX_BACKOFF минут."""
+    now = now or timezone.now()
+    feed.consecutive_failures += 1
+    feed.last_error = str(error)[:500]
+    max_backoff = getattr(settings, 'RSS_POLL_MAX_BACKOFF', 24 * 60)
+    delay = min(feed.poll_interval * 2 ** feed.consecutive_failures, max_backoff)
+    feed.next_fetch_at = now + jittered(delay)
@@ -0,0 +1,127 @@
+# rss_feeds/selectors.py
+import logging
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from lxml.cssselect import CSSSelector
+
+from .boilerplate import get_boilerplate_filter
+from .models import ContentSource
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=256)
+def compile_selector(selector: str) -> CSSSelector:
+    """
+    Компилирует CSS-селектор в XPath один раз на процесс.
+    """
+    return CSSSelector(selector)
+
+
+class SourceSelectors:
+    """
+    Селекторы одного источника: порядок из настроек плюс статистика срабатываний.
+    Первым пробуется селектор, который чаще всего находил контент на этом домене.
+    Здесь же — фильтр фраз-мусора с учётом настроек источника.
+    """
+
+    def __init__(self, source):
+        self.domain = source.domain
+        self.selectors = []
+        for selector in source.get_selectors():
+            try:
+                compile_selector(selector) # Компилируем заранее и отсеиваем битые селекторы
+            except Exception as e:
+                logger.error(f"Некорректный селектор '{selector}' для {self.domain}: {e}")
+                continue
+            self.selectors.append(selector)
+        self.hits = Counter(source.selector_hits or {})
+        self.boilerplate = get_boilerplate_filter(source.boilerplate_phrases)
+
+    def ordered(self) -> list:
+        positions = {selector: index for index, selector in enumerate(self.selectors)}
+        return sorted(self.selectors, key=lambda selector: (-self.hits[selector], positions[selector]))
+
+
+class SelectorRegistry:
+    """
+    Реестр селекторов по доменам из таблицы ContentSource.
+    Хост разрешается поиском по суффиксам (www.sciencedaily.com → sciencedaily.com):
+    число обращений к словарю не больше числа частей хоста.
+    Срабатывания копятся в памяти и пишутся в БД через flush_stats().
+    """
+
+    def __init__(self, sources):
+        self._sources = {source.domain.lower(): SourceSelectors(source) for source in sources}
+        self._pending_hits = {}
+        self._pending_fallbacks = Counter()
+        self._lock = threading.Lock()
+        self.loaded_at = time.monotonic()
+
+    def resolve(self, host: str):
+        labels = host.lower().split(':')[0].split('.')
+        for start in range(len(labels) - 1):
+            entry = self._sources.get('.'.join(labels[start:]))
+            if entry is not None:
+                return entry
+        return None
+
+    def selectors_for(self, host: str) -> list:
+        entry = self.resolve(host)
+        return entry.ordered() if entry is not None else []
+
+    def boilerplate_for(self, host: str):
+        entry = self.resolve(host)
+        return entry.boilerplate if entry is not None else get_boilerplate_filter()
+
+    def record(self, host: str, selector):
+        """Отмечает, какой селектор сработал на хосте (None — не сработал ни один)."""
+        entry = self.resolve(host)
+        if entry is None:
+            return
+        with self._lock:
+            if selector is None:
+                self._pending_fallbacks[entry.domain] += 1
+            else:
+                entry.hits[selector] += 1
+                self._pending_hits.setdefault(entry.domain, Counter())[selector] += 1
+
+    def flush_stats(self):
+        """Добавляет накопленные срабатывания к статистике в БД."""
+        with self._lock:
+            pending_hits, self._pending_hits = self._pending_hits, {}
+            pending_fallbacks, self._pending_fallbacks = self._pending_fallbacks, Counter()
+        domains = set(pending_hits) | set(pending_fallbacks)
+        if not domains:
+            return
+        with transaction.atomic():
+            for source in ContentSource.objects.select_for_update().filter(domain__in=domains):
+                hits = Counter(source.selector_hits or {})
+                hits.update(pending_hits.get(source.domain, {}))
+                source.selector_hits = dict(hits)
+                source.fallback_count += pending_fallbacks.get(source.domain, 0)
+                source.save(update_fields=['selector_hits', 'fallback_count'])
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_selector_registry() -> SelectorRegistry:
+    """
+    Реестр текущего процесса; перечитывается из БД раз в RSS_SELECTOR_REGISTRY_TTL секунд,
+    так что новые источники подхватываются без деплоя.
+    """
+    global _registry
+    ttl = getattr(settings, 'RSS_SELECTOR_REGISTRY_TTL', 300)
+    with _registry_lock:
+        if _registry is None or time.monotonic() - _registry.loaded_at > ttl:
+            if _registry is not None:
+                _registry.flush_stats()
+            _registry = SelectorRegistry(ContentSource.objects.filter(is_active=True))
+        return _registry
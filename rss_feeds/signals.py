@@ -0,0 +1,12 @@
+# rss_feeds/signals.py
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from articles.models import Article
+
+from .dedup import forget_urls
+
+
+@receiver(post_delete, sender=Article)
+def article_deleted(sender, instance, **kwargs):
+    forget_urls([instance.source_url])
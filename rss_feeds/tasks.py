@@ -1,77 +1,286 @@
 # rss_feeds/tasks.py
-from celery import shared_task
+from celery import chord, shared_task
+from django.conf import settings
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 from .models import RSSFeed
-from .utils import parse_rss_feed
+from .utils import apply_extracted_page, extract_content_from_page, fetch_feed, parse_feed_entries, record_selector_hits
+from .coordination import acquire_lock, extend_lock, is_done, mark_done, release_lock
+from .dedup import find_known_urls, remember_urls
+from .fetcher import get_shared_throttle
+from .metrics import metrics
+from .scheduling import SCHEDULE_FIELDS, schedule_failure, schedule_success
+from .near_duplicates import find_near_duplicates, index_articles
 from articles.models import Article
+from llm_processing.tasks import process_pending_articles
+from articles.utils import allocate_slugs, canonicalize_url
+from datetime import timedelta
 from urllib.parse import urlparse
 import logging
 
 logger = logging.getLogger(__name__)
 
+def store_articles(feed, articles_data) -> int:
+    """
+    Сохраняет новые статьи ленты пачкой: один запрос на проверку дублей,
+    slug'и подбираются в памяти, вставка — bulk_create в одной транзакции.
+    Почти-дубликаты уже сохранённых историй (та же новость под другим URL)
+    помечаются через duplicate_of или пропускаются — см. RSS_NEAR_DUPLICATE_ACTION.
+    Помеченные не попадают в очередь LLM и так и остаются неопубликованными, чтобы
+    одна история не выходила на сайт дважды; в админке они видны у оригинала.
+    Если оригинал удалят, duplicate_of обнулится.
+    Возвращает число добавленных статей.
+    """
+    near_duplicate_action = getattr(settings, 'RSS_NEAR_DUPLICATE_ACTION', 'flag')
+
+    # Дубликаты внутри самой ленты отсекаем по каноническому URL
+    pending = {}
+    for article_data in articles_data:
+        canonical = canonicalize_url(article_data['link'])
+        if canonical and canonical not in pending:
+            pending[canonical] = article_data
+
+    # Одна попытка повторить, если параллельный запуск успел вставить те же статьи
+    for attempt in range(2):
+        existing = set(Article.objects.with_canonical_url().filter(canonical_url__in=list(pending)).values_list('canonical_url', flat=True))
+        new_items = [(canonical, data) for canonical, data in pending.items() if canonical not in existing]
+        if not new_items:
+            return 0
+
+        signatures, duplicates = {}, {}
+        if near_duplicate_action:
+            signatures, duplicates = find_near_duplicates({canonical: data['content'] for canonical, data in new_items})
+            if near_duplicate_action == 'skip' and duplicates:
+                logger.info(f"Лента {feed.url}: пропущено {len(duplicates)} почти-дубликатов")
+                # Пропущенные тоже кладём в множество известных URL, иначе их страницы скачивались бы на каждом опросе заново
+                remember_urls([data['link'] for canonical, data in new_items if canonical in duplicates])
+                new_items = [(canonical, data) for canonical, data in new_items if canonical not in duplicates]
+                if not new_items:
+                    return 0
+
+        known_originals = {canonical: original for canonical, (kind, original) in duplicates.items() if kind == 'article'}
+        slugs = allocate_slugs([data['title'] for _, data in new_items], Article.objects.all())
+        source_name = urlparse(feed.url).netloc
+        now = timezone.now()
+        articles = [
+            Article(
+                title=data['title'],
+                original_content=data['content'], # Используем 'content' из utils
+                summary='', # Пока пусто, заполнит LLM
+                source_url=data['link'],
+                canonical_url=canonical,
+                source_name=source_name,
+                published_at=data['published_at'] or now,
+                category=feed.category,
+                is_published=False,
+                image_url=data.get('image_url', None), # Сохраняем изображение, если есть
+                slug=slug,
+                duplicate_of_id=known_originals.get(canonical),
+            )
+            for (canonical, data), slug in zip(new_items, slugs)
+        ]
+        for article in articles:
+            article.update_reading_metadata()  # bulk_create не вызывает save()
+        try:
+            with metrics.timer(stage='db_write'), transaction.atomic():
+                Article.objects.bulk_create(articles, batch_size=200)
+                by_canonical = {article.canonical_url: article for article in articles}
+                # Дубликаты внутри пачки ссылаются на статьи, id которых появились только сейчас
+                batch_duplicates = []
+                for canonical, (kind, original) in duplicates.items():
+                    if kind == 'batch' and canonical in by_canonical:
+                        by_canonical[canonical].duplicate_of = by_canonical[original]
+                        batch_duplicates.append(by_canonical[canonical])
+                if batch_duplicates:
+                    Article.objects.bulk_update(batch_duplicates, ['duplicate_of'])
+                # В индекс LSH попадают только оригиналы: дубликат и так совпадёт с ними
+                index_articles({
+                    by_canonical[canonical].pk: signature
+                    for canonical, signature in signatures.items()
+                    if canonical not in duplicates and canonical in by_canonical
+                })
+        except IntegrityError as e:
+            if attempt:
+                raise
+            logger.warning(f"Конфликт при сохранении статей ленты {feed.url}, повторяем: {e}")
+            continue
+
+        remember_urls([article.source_url for article in articles])
+        metrics.inc('ingest_articles_stored_total', len(articles))
+        return len(articles)
+
+def feed_lock_name(feed_id) -> str:
+    return f'feed:{feed_id}'
+
+
+def feed_lock_timeout(articles_count: int = 0) -> int:
+    """
+    TTL блокировки ленты. Пока идёт chord, лента должна оставаться заблокированной:
+    к базовому RSS_FEED_LOCK_TIMEOUT добавляем худшее время на каждую статью —
+    страницы одного сайта качаются по очереди через троттлер, и каждая может упереться в таймауты.
+    """
+    per_article = (
+        getattr(settings, 'RSS_FETCH_PER_HOST_INTERVAL', 1.0)
+        + getattr(settings, 'RSS_HTTP_CONNECT_TIMEOUT', 5)
+        + getattr(settings, 'RSS_HTTP_READ_TIMEOUT', 15)
+    )
+    return int(getattr(settings, 'RSS_FEED_LOCK_TIMEOUT', 15 * 60) + articles_count * per_article)
+
+
+def ingest_key(feed_id, content_hash: str) -> str:
+    # Одно и то же тело ленты сохраняем один раз, даже если задачу доставили повторно
+    return f'ingest:{feed_id}:{content_hash}'
+
+
+def finish_feed_poll(feed, fetched, new_articles_count: int):
+    """Успешный опрос: расписание, время последнего опроса и валидаторы кэша."""
+    now = timezone.now()
+    schedule_success(feed, new_articles_count, now)
+    feed.last_fetched = now
+    feed.etag = fetched['etag']
+    feed.last_modified = fetched['last_modified']
+    feed.content_hash = fetched['content_hash']
+    feed.save()
+    logger.info(
+        f"Лента {feed.url}: добавлено {new_articles_count} новых статей, "
+        f"следующий опрос через {feed.poll_interval} мин."
+    )
+
+
+def fail_feed_poll(feed, error):
+    schedule_failure(feed, error)
+    feed.save(update_fields=SCHEDULE_FIELDS)
+    logger.info(f"Лента {feed.url}: ошибок подряд {feed.consecutive_failures}, следующий опрос {feed.next_fetch_at:%Y-%m-%d %H:%M}")
+
+
 @shared_task
 def fetch_and_store_articles_from_feed(feed_id):
     """
-    Celery задача: опрашивает одну RSS-ленту и сохраняет новые статьи в базу данных.
+    Celery задача, первая стадия конвейера: скачивает и разбирает ленту, затем
+    раздаёт статьи задачам extract_article (очередь страниц), а их результаты
+    собирает store_feed_articles (chord). На время всего конвейера лента заблокирована,
+    так что пересекающиеся тики beat'а не опрашивают её дважды.
     """
     try:
         feed = RSSFeed.objects.get(id=feed_id)
-        if not feed.is_active:
-            logger.info(f"Лента {feed.url} неактивна, пропускаем.")
+    except RSSFeed.DoesNotExist:
+        logger.error(f"RSSFeed с id {feed_id} не найден.")
+        return
+    if not feed.is_active:
+        logger.info(f"Лента {feed.url} неактивна, пропускаем.")
+        return
+
+    lock_token = acquire_lock(feed_lock_name(feed_id), feed_lock_timeout())
+    if lock_token is None:
+        logger.info(f"Лента {feed.url} уже обрабатывается, пропускаем.")
+        return
+
+    try:
+        # Скачиваем ленту условным GET: если она не менялась, ничего не парсим
+        fetched = fetch_feed(feed.url, etag=feed.etag, last_modified=feed.last_modified, content_hash=feed.content_hash)
+        if fetched['not_modified']:
+            logger.info(f"Лента {feed.url} не изменилась с прошлого опроса, пропускаем.")
+            finish_feed_poll(feed, fetched, 0)
+            release_lock(feed_lock_name(feed_id), lock_token)
             return
 
-        # Парсим ленту
-        articles_data = parse_rss_feed(feed.url)
+        key = ingest_key(feed_id, fetched['content_hash'])
+        articles_data = [] if is_done(key) else parse_feed_entries(feed.url, fetched['content'], known_url_filter=find_known_urls)
         if not articles_data:
-            logger.info(f"Не удалось получить статьи из ленты {feed.url}")
+            logger.info(f"Новых статей в ленте {feed.url} нет")
+            finish_feed_poll(feed, fetched, 0)
+            release_lock(feed_lock_name(feed_id), lock_token)
             return
 
-        new_articles_count = 0
-        for article_data in articles_data:
-            # Проверяем, существует ли статья с таким URL
-            if not Article.objects.filter(source_url=article_data['link']).exists():
-                # Создаём новую статью
-                Article.objects.create(
-                    title=article_data['title'],
-                    original_content=article_data['content'], # Используем 'content' из utils
-                    summary='', # Пока пусто, заполнит LLM
-                    source_url=article_data['link'],
-                    source_name=urlparse(feed.url).netloc,
-                    published_at=article_data['published_at'] or timezone.now(),
-                    category=feed.category,
-                    is_published=False,
-                    image_url=article_data.get('image_url', None) # Сохраняем изображение, если есть
-                )
-                new_articles_count += 1
-            else:
-                logger.debug(f"Статья с URL {article_data['link']} уже существует, пропускаем.")
-
-        # Обновляем время последнего опроса
-        feed.last_fetched = timezone.now()
-        feed.save()
-
-        logger.info(f"Лента {feed.url}: добавлено {new_articles_count} новых статей.")
+        # Теперь известно, сколько страниц качать: продлеваем блокировку на весь chord
+        if not extend_lock(feed_lock_name(feed_id), lock_token, feed_lock_timeout(len(articles_data))):
+            logger.warning(f"Лента {feed.url}: блокировка истекла до запуска извлечения")
+        # Тело ленты дальше не нужно, в сообщения кладём только валидаторы
+        validators = {field: fetched[field] for field in ('etag', 'last_modified', 'content_hash')}
+        chord(extract_article.s(article_data) for article_data in articles_data)(
+            store_feed_articles.s(feed_id, validators, lock_token, key)
+        )
+        logger.info(f"Лента {feed.url}: {len(articles_data)} статей отправлено на извлечение")
+    except Exception as e:
+        logger.error(f"Ошибка в задаче fetch_and_store_articles_from_feed для id {feed_id}: {e}")
+        metrics.inc('ingest_errors_total', stage='feed', domain=urlparse(feed.url).netloc)
+        fail_feed_poll(feed, e)
+        release_lock(feed_lock_name(feed_id), lock_token)
+    finally:
+        metrics.flush()
 
+
+@shared_task(acks_late=True)
+def extract_article(article_data):
+    """
+    Celery задача, сетевая стадия: скачивает страницу одной статьи и извлекает контент.
+    Паузу между запросами к одному хосту держит общий для воркеров троттлер.
+    Никогда не падает — иначе chord не дойдёт до сохранения; при ошибке остаётся description.
+    Повторная доставка безопасна: результат извлечения лежит в кэше страниц.
+    """
+    selectors = article_data.get('page_selectors')
+    if not selectors:
+        return article_data
+    try:
+        get_shared_throttle().wait(urlparse(article_data['link']).netloc.lower())
+        return apply_extracted_page(article_data, extract_content_from_page(article_data['link'], selectors))
+    except Exception as e:
+        logger.error(f"Ошибка при извлечении {article_data['link']}: {e}")
+        metrics.inc('ingest_errors_total', stage='extract', domain=urlparse(article_data['link']).netloc)
+        return article_data
+    finally:
+        metrics.flush()
+
+
+@shared_task(acks_late=True)
+def store_feed_articles(articles_data, feed_id, validators, lock_token, key):
+    """
+    Celery задача, последняя стадия: пачкой сохраняет статьи ленты, обновляет её
+    расписание и снимает блокировку. Ключ идемпотентности не даёт сохранить одно
+    и то же тело ленты дважды.
+    """
+    try:
+        feed = RSSFeed.objects.get(id=feed_id)
     except RSSFeed.DoesNotExist:
         logger.error(f"RSSFeed с id {feed_id} не найден.")
+        return
+    try:
+        if is_done(key):
+            logger.info(f"Лента {feed.url}: эта версия уже сохранена, пропускаем.")
+            return
+        record_selector_hits(articles_data)
+        new_articles_count = store_articles(feed, articles_data)
+        mark_done(key, getattr(settings, 'RSS_INGEST_IDEMPOTENCY_TTL', 24 * 3600))
+        finish_feed_poll(feed, validators, new_articles_count)
+        if new_articles_count:
+            process_pending_articles.delay() # Новые статьи ждут LLM-обработки
     except Exception as e:
-        logger.error(f"Ошибка в задаче fetch_and_store_articles_from_feed для id {feed_id}: {e}")
+        logger.error(f"Ошибка при сохранении статей ленты {feed.url}: {e}")
+        metrics.inc('ingest_errors_total', stage='db_write', domain=urlparse(feed.url).netloc)
+        fail_feed_poll(feed, e)
+    finally:
+        release_lock(feed_lock_name(feed_id), lock_token)
+        metrics.flush()
 
 @shared_task
 def fetch_all_active_feeds():
     """
-    Celery задача: запускает опрос всех активных RSS-лент.
+    Celery задача: ставит в очередь опрос лент, у которых подошёл next_fetch_at.
+    Один запрос по индексу rssfeed_due_idx; отобранным лентам next_fetch_at сдвигается
+    на RSS_POLL_DISPATCH_LEASE минут, чтобы следующий тик не поставил их ещё раз,
+    пока задача в очереди (после опроса расписание перезапишет сама задача).
     """
-    logger.info("Запуск опроса всех активных RSS-лент.")
-    active_feeds = RSSFeed.objects.filter(is_active=True)
-
-    for feed in active_feeds:
-        if feed.last_fetched:
-            time_since_last_fetch = timezone.now() - feed.last_fetched
-            if time_since_last_fetch.total_seconds() < (feed.fetch_frequency * 60):
-                logger.debug(f"Лента {feed.url} опрошена недавно, пропускаем.")
-                continue
+    now = timezone.now()
+    with transaction.atomic():
+        due_ids = list(
+            RSSFeed.objects.filter(is_active=True, next_fetch_at__lte=now)
+            .order_by('next_fetch_at')
+            .values_list('id', flat=True)[:getattr(settings, 'RSS_POLL_MAX_DISPATCH', 100)]
+        )
+        lease = timedelta(minutes=getattr(settings, 'RSS_POLL_DISPATCH_LEASE', 30))
+        RSSFeed.objects.filter(id__in=due_ids).update(next_fetch_at=now + lease)
 
-        fetch_and_store_articles_from_feed.delay(feed.id)
+    for feed_id in due_ids:
+        fetch_and_store_articles_from_feed.delay(feed_id)
 
-    logger.info("Опрос всех активных RSS-лент завершён.")
+    logger.info(f"Поставлено в очередь опросов лент: {len(due_ids)}")
@@ -1,3 +1,636 @@
-from django.test import TestCase
+import hashlib
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import requests
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from articles.models import Article
+
+from .benchmarks.corpus import Corpus, record_corpus
+from .benchmarks.stub_server import serve_corpus
+from .benchmarks.suite import run_suite
+from .boilerplate import BoilerplateFilter, get_boilerplate_filter, resolve_phrases
+from .coordination import acquire_lock, extend_lock, is_done, release_lock
+from .dedup import find_known_urls, remember_urls
+from .fetcher import HostThrottle, fetch_concurrently
+from .http_client import ResponseTooLarge, get_session, http_get
+from .metrics import MetricsRegistry, histogram_quantile, render_prometheus
+from .management.commands.bench_html_cleaner import run_legacy, run_new
+from .models import ContentSource, RSSFeed
+from .near_duplicates import find_near_duplicates, index_articles, minhash, similarity
+from .page_cache import PageCache
+from .scheduling import adapt_interval, initial_publish_rate, schedule_failure, schedule_success
+from .selectors import SelectorRegistry
+from .tasks import fetch_and_store_articles_from_feed, feed_lock_name, feed_lock_timeout, ingest_key, store_articles, store_feed_articles
+from .utils import _page_cache_keys, extract_content_from_html, extract_content_from_page, fetch_feed
+
+
+class FetcherTests(SimpleTestCase):
+    def test_throttle_spaces_requests_per_host(self):
+        throttle = HostThrottle(0.05)
+        started = time.monotonic()
+        throttle.wait('a.example')
+        throttle.wait('b.example') # Другой хост не ждёт
+        self.assertLess(time.monotonic() - started, 0.04)
+        throttle.wait('a.example')
+        self.assertGreaterEqual(time.monotonic() - started, 0.05)
+
+    def test_fetch_concurrently(self):
+        def worker(url, suffix):
+            if url.endswith('/broken'):
+                raise ValueError("boom")
+            return url + suffix
+
+        jobs = [('https://a.example/1', '!'), ('https://a.example/broken', '!'), ('https://b.example/1', '?')]
+        results = fetch_concurrently(jobs, worker, max_workers=4, per_host=2, interval=0)
+        self.assertEqual(results, {'https://a.example/1': 'https://a.example/1!', 'https://a.example/broken': None, 'https://b.example/1': 'https://b.example/1?'})
+        self.assertEqual(fetch_concurrently([], worker), {})
+
+    def test_fetch_concurrently_uses_shared_throttle(self):
+        # Без явного interval паузы между запросами к хосту общие с задачами extract_article
+        throttle = mock.Mock()
+        with mock.patch('rss_feeds.fetcher.get_shared_throttle', return_value=throttle):
+            results = fetch_concurrently([('https://A.example/1',), ('https://a.example/2',)], lambda url: url)
+        self.assertEqual(len(results), 2)
+        self.assertEqual(throttle.wait.call_args_list, [mock.call('a.example')] * 2)
+
+
+FEED_XML = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Feed</title>
+<item><title>Known story</title><link>https://example.com/known</link><description>Text</description></item>
+</channel></rss>"""
+
+
+class FetchFeedTests(SimpleTestCase):
+    def response(self, status=200, body=b'', headers=None):
+        response = requests.Response()
+        response.status_code = status
+        response._content = body
+        response.headers.update(headers or {})
+        return response
+
+    def test_conditional_get_headers(self):
+        with mock.patch('rss_feeds.utils.http_get', return_value=self.response(304)) as http:
+            fetched = fetch_feed('https://example.com/rss', etag='"v1"', last_modified='Sat, 17 Oct 2026 10:00:00 GMT', content_hash='abc')
+        self.assertEqual(http.call_args.kwargs['headers'], {'If-None-Match': '"v1"', 'If-Modified-Since': 'Sat, 17 Oct 2026 10:00:00 GMT'})
+        # 304: тела нет, валидаторы остаются прежними
+        self.assertEqual(fetched, {'not_modified': True, 'content': b'', 'etag': '"v1"', 'last_modified': 'Sat, 17 Oct 2026 10:00:00 GMT', 'content_hash': 'abc'})
+
+    def test_first_poll_sends_no_validators(self):
+        with mock.patch('rss_feeds.utils.http_get', return_value=self.response(body=FEED_XML, headers={'ETag': '"v2"'})) as http:
+            fetched = fetch_feed('https://example.com/rss')
+        self.assertEqual(http.call_args.kwargs['headers'], {})
+        self.assertFalse(fetched['not_modified'])
+        self.assertEqual((fetched['content'], fetched['etag'], fetched['content_hash']), (FEED_XML, '"v2"', hashlib.sha256(FEED_XML).hexdigest()))
+
+    def test_same_body_short_circuits(self):
+        # Сервер без ETag/Last-Modified отдаёт то же тело — разбирать его не нужно
+        with mock.patch('rss_feeds.utils.http_get', return_value=self.response(body=FEED_XML)):
+            fetched = fetch_feed('https://example.com/rss', content_hash=hashlib.sha256(FEED_XML).hexdigest())
+        self.assertTrue(fetched['not_modified'])
+
+    def test_http_error_raises(self):
+        with mock.patch('rss_feeds.utils.http_get', return_value=self.response(500)):
+            with self.assertRaises(requests.HTTPError):
+                fetch_feed('https://example.com/rss')
+
+
+@override_settings(RSS_COORDINATION_REDIS_URL=None, RSS_SEEN_URLS_REDIS_URL=None)
+class FeedPollTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.feed = RSSFeed.objects.create(url='https://example.com/rss', category='medicine')
+        Article.objects.create(title="Known story", original_content="Text", source_url='https://example.com/known', category='medicine')
+
+    def test_all_entries_known_saves_validators(self):
+        # Задача не должна выходить, не сохранив last_fetched и валидаторы: иначе лента скачивается целиком снова
+        fetched = {'not_modified': False, 'content': FEED_XML, 'etag': '"v2"', 'last_modified': 'Sat, 17 Oct 2026 10:00:00 GMT', 'content_hash': 'abc'}
+        with mock.patch('rss_feeds.tasks.fetch_feed', return_value=fetched), mock.patch('rss_feeds.tasks.chord') as chord:
+            fetch_and_store_articles_from_feed(self.feed.pk)
+        chord.assert_not_called()
+        self.feed.refresh_from_db()
+        self.assertIsNotNone(self.feed.last_fetched)
+        self.assertEqual((self.feed.etag, self.feed.last_modified, self.feed.content_hash), ('"v2"', 'Sat, 17 Oct 2026 10:00:00 GMT', 'abc'))
+        self.assertEqual(Article.objects.count(), 1)
+
+    def test_store_articles_in_bulk(self):
+        def entry(title, link):
+            return {'title': title, 'content': "Text", 'link': link, 'published_at': None, 'image_url': None}
+
+        articles_data = [
+            entry("Known story", 'https://example.com/known?utm_source=rss'), # уже в базе
+            entry("Known story", 'https://example.com/fresh'),
+            entry("Repeat", 'https://EXAMPLE.com/fresh#top'), # тот же канонический URL внутри ленты
+            entry("Other", 'https://example.com/other'),
+        ]
+        self.assertEqual(store_articles(self.feed, articles_data), 2)
+        fresh = Article.objects.get(canonical_url='https://example.com/fresh')
+        self.assertEqual((fresh.title, fresh.slug, fresh.is_published), ("Known story", 'known-story-2', False))
+        self.assertEqual((fresh.word_count, fresh.reading_time), (1, 1)) # bulk_create не вызывает save(), метаданные считаются заранее
+
+    def test_lock_held_skips_poll(self):
+        token = acquire_lock(feed_lock_name(self.feed.pk), 60)
+        with mock.patch('rss_feeds.tasks.fetch_feed') as fetch:
+            fetch_and_store_articles_from_feed(self.feed.pk)
+        fetch.assert_not_called()
+        # Чужой токен блокировку не снимает и не продлевает
+        release_lock(feed_lock_name(self.feed.pk), 'stale')
+        self.assertFalse(extend_lock(feed_lock_name(self.feed.pk), 'stale', 60))
+        self.assertIsNone(acquire_lock(feed_lock_name(self.feed.pk), 60))
+        release_lock(feed_lock_name(self.feed.pk), token)
+        self.assertIsNotNone(acquire_lock(feed_lock_name(self.feed.pk), 60))
+
+    def test_chord_keeps_lock_for_all_pages(self):
+        content = FEED_XML.replace(b'</channel>', b'<item><title>New story</title><link>https://example.com/new</link><description>Text</description></item></channel>')
+        fetched = {'not_modified': False, 'content': content, 'etag': '', 'last_modified': '', 'content_hash': 'def'}
+        with mock.patch('rss_feeds.tasks.fetch_feed', return_value=fetched), mock.patch('rss_feeds.tasks.chord') as chord, \
+                mock.patch('rss_feeds.tasks.extend_lock', wraps=extend_lock) as extend:
+            fetch_and_store_articles_from_feed(self.feed.pk)
+        headers = list(chord.call_args.args[0])
+        self.assertEqual([signature.args[0]['link'] for signature in headers], ['https://example.com/new'])
+        extend.assert_called_once_with(feed_lock_name(self.feed.pk), mock.ANY, feed_lock_timeout(1))
+        self.assertGreater(feed_lock_timeout(100), feed_lock_timeout())
+        # Блокировка остаётся за chord'ом, её снимет store_feed_articles
+        self.assertIsNone(acquire_lock(feed_lock_name(self.feed.pk), 60))
+        callback = chord.return_value.call_args.args[0]
+        self.assertEqual(callback.args[:2], (self.feed.pk, {'etag': '', 'last_modified': '', 'content_hash': 'def'}))
+
+    def test_chord_callback_is_idempotent(self):
+        articles_data = [{'title': "New story", 'link': 'https://example.com/new', 'content': "Text", 'published_at': None}]
+        validators = {'etag': '"v3"', 'last_modified': '', 'content_hash': 'def'}
+        key = ingest_key(self.feed.pk, 'def')
+        with mock.patch('rss_feeds.tasks.process_pending_articles.delay') as process:
+            for _ in range(2): # Повторная доставка callback'а
+                token = acquire_lock(feed_lock_name(self.feed.pk), 60)
+                store_feed_articles(articles_data, self.feed.pk, validators, token, key)
+                # Блокировка снята в любом случае
+                self.assertIsNotNone(acquire_lock(feed_lock_name(self.feed.pk), 60))
+                cache.delete(f'healthpulse:lock:{feed_lock_name(self.feed.pk)}')
+        self.assertEqual(Article.objects.filter(source_url='https://example.com/new').count(), 1)
+        self.assertTrue(is_done(key))
+        process.assert_called_once()
+        self.feed.refresh_from_db()
+        self.assertEqual(self.feed.etag, '"v3"')
+        self.assertEqual(store_articles(self.feed, articles_data), 0)
+
+
+class FakeSortedSetRedis:
+    """Минимальная замена Redis: только команды сортированного множества, которые нужны dedup."""
+
+    def __init__(self):
+        self.scores = {}
+
+    def pipeline(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self):
+        return []
+
+    def zadd(self, key, mapping):
+        self.scores.update(mapping)
+
+    def zmscore(self, key, members):
+        return [self.scores.get(member) for member in members]
+
+    def zremrangebyscore(self, key, low, high):
+        self.scores = {member: score for member, score in self.scores.items() if score > float(high)}
+
+    def zrem(self, key, *members):
+        for member in members:
+            self.scores.pop(member, None)
+
+
+@override_settings(RSS_SEEN_URLS_TTL=3600)
+class SeenURLsTests(TestCase):
+    def setUp(self):
+        self.redis = FakeSortedSetRedis()
+        patcher = mock.patch('rss_feeds.dedup._get_redis', return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_remembered_urls_are_known(self):
+        remember_urls(['https://Example.com/a?utm_source=rss&id=1'])
+        self.assertEqual(find_known_urls(['https://example.com/a?id=1#top', 'https://example.com/b']), {'https://example.com/a?id=1#top'})
+
+    def test_stale_entries_expire(self):
+        self.redis.scores['https://example.com/old'] = time.time() - 7200
+        self.assertEqual(find_known_urls(['https://example.com/old']), set())
+        # Следующая запись вычищает просроченные
+        remember_urls(['https://example.com/new'])
+        self.assertEqual(set(self.redis.scores), {'https://example.com/new'})
+
+    def test_deleted_article_can_be_ingested_again(self):
+        article = Article.objects.create(title="Story", original_content="Text", source_url='https://example.com/story', category='medicine')
+        remember_urls([article.source_url])
+        self.assertEqual(find_known_urls([article.source_url]), {article.source_url})
+        article.delete()
+        self.assertEqual(find_known_urls([article.source_url]), set())
+
+
+FIXTURE_PAGES = Path(__file__).resolve().parent / 'benchmarks' / 'pages'
+
+
+class HTMLCleanerTests(SimpleTestCase):
+    def test_matches_legacy_cleaner(self):
+        pages = sorted(FIXTURE_PAGES.glob('*.html'))
+        self.assertTrue(pages)
+        for page in pages:
+            html = page.read_text(encoding='utf-8')
+            with self.subTest(page=page.name):
+                self.assertEqual(run_new(html)[0], run_legacy(html)[0])
+
+    def test_bench_command(self):
+        out = StringIO()
+        call_command('bench_html_cleaner', str(FIXTURE_PAGES), repeat=1, strict=True, stdout=out)
+        self.assertIn("Текст совпадает на всех страницах", out.getvalue())
+
+
+ARTICLE_HTML = """<html><head><title>Story</title><meta property="og:image" content="https://example.com/og.jpg"></head>
+<body><nav>Menu</nav><div class="post"><p>Vitamin D matters. Read more</p></div>
+<div class="comments"><p>Comment</p></div></body></html>"""
+
+
+class ExtractionTests(SimpleTestCase):
+    def test_selector_match(self):
+        # Первый сработавший селектор; фразы-мусор вычищены, картинка — из og:image
+        result = extract_content_from_html('https://example.com/a', ARTICLE_HTML, ['.missing', '.post'])
+        self.assertEqual(result, {'content': "Vitamin D matters.", 'image_url': 'https://example.com/og.jpg', 'selector': '.post'})
+
+    def test_unwanted_blocks_are_removed(self):
+        result = extract_content_from_html('https://example.com/a', ARTICLE_HTML, ['body'])
+        self.assertEqual(result['content'], "Vitamin D matters.")
+
+    def test_page_cache(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        page_cache = PageCache(os.path.join(directory, 'pages.sqlite3'), max_bytes=10 ** 6, ttl=60)
+        response = requests.Response()
+        response.status_code, response._content, response.encoding = 200, ARTICLE_HTML.encode('utf-8'), 'utf-8'
+        with mock.patch('rss_feeds.utils.get_page_cache', return_value=page_cache), mock.patch('rss_feeds.utils.http_get', return_value=response) as http:
+            first = extract_content_from_page('https://example.com/a', ['.post'])
+            second = extract_content_from_page('https://example.com/a', ['.post'])
+            # Другие селекторы — результат считается заново, но тело страницы берётся из кэша
+            other = extract_content_from_page('https://example.com/a', ['.comments'])
+        self.assertEqual(http.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertEqual(other['content'], "Comment")
+
+    def test_fetch_errors_return_empty_result(self):
+        with mock.patch('rss_feeds.utils.get_page_cache', return_value=None), \
+                mock.patch('rss_feeds.utils.http_get', side_effect=requests.ConnectionError("refused")):
+            self.assertEqual(extract_content_from_page('https://example.com/a', ['.post']), {'content': '', 'image_url': None})
+
+    def test_page_cache_key_ignores_selector_order(self):
+        url, text_filter = 'https://example.com/a', get_boilerplate_filter()
+        self.assertEqual(_page_cache_keys(url, ['article', '.post'], text_filter), _page_cache_keys(url, ['.post', 'article'], text_filter))
+        self.assertNotEqual(_page_cache_keys(url, ['article'], text_filter)[1], _page_cache_keys(url, ['.post'], text_filter)[1])
+
+
+class PageCacheTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.path = os.path.join(directory, 'pages.sqlite3')
+
+    def test_roundtrip_and_ttl(self):
+        page_cache = PageCache(self.path, max_bytes=10 ** 6, ttl=60)
+        page_cache.set_text('body:a', "<html>привет</html>")
+        page_cache.set_json('result:a', {'content': "text"})
+        self.assertEqual(page_cache.get_text('body:a'), "<html>привет</html>")
+        self.assertEqual(page_cache.get_json('result:a'), {'content': "text"})
+        self.assertIsNone(page_cache.get('missing'))
+        expired = PageCache(self.path, max_bytes=10 ** 6, ttl=-1)
+        self.assertIsNone(expired.get('body:a'))
+
+    def test_lru_eviction(self):
+        page_cache = PageCache(self.path, max_bytes=10 ** 6, ttl=60)
+        for key in ('old', 'used', 'new'):
+            page_cache.set(key, os.urandom(1000)) # Несжимаемые: размер записи ~1000 байт
+            time.sleep(0.01)
+        page_cache.get('used')
+        page_cache.max_bytes = 2100
+        page_cache.evict()
+        self.assertIsNone(page_cache.get('old'))
+        self.assertIsNotNone(page_cache.get('used'))
+        self.assertIsNotNone(page_cache.get('new'))
+
+
+class StubPageHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = b'x' * int(self.path.strip('/'))
+        self.send_response(200)
+        if self.headers.get('X-Chunked'):
+            # Без Content-Length: лимит должен сработать на чтении
+            self.send_header('Connection', 'close')
+            self.end_headers()
+        else:
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class HTTPClientTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubPageHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def test_reads_body(self):
+        response = http_get(f'{self.base_url}/100', max_bytes=1000)
+        self.assertEqual(response.content, b'x' * 100)
+        self.assertIn('HealthPulseBot', response.request.headers['User-Agent'])
+        self.assertIs(get_session(), get_session()) # Одна сессия с пулом соединений на процесс
+
+    def test_size_limit(self):
+        with self.assertRaises(ResponseTooLarge):
+            http_get(f'{self.base_url}/2000', max_bytes=1000) # по Content-Length
+        with self.assertRaises(ResponseTooLarge):
+            http_get(f'{self.base_url}/200000', headers={'X-Chunked': '1'}, max_bytes=1000) # по прочитанному
+
+
+class SelectorRegistryTests(TestCase):
+    def setUp(self):
+        self.source = ContentSource.objects.create(domain='example.org', selectors="article\n.post\n[broken")
+
+    def test_resolves_subdomains(self):
+        registry = SelectorRegistry([self.source])
+        self.assertEqual(registry.selectors_for('www.news.example.org'), ['article', '.post']) # битый селектор отброшен
+        self.assertEqual(registry.selectors_for('example.com'), [])
+
+    def test_hits_reorder_and_flush(self):
+        registry = SelectorRegistry([self.source])
+        registry.record('www.example.org', '.post')
+        registry.record('www.example.org', None)
+        self.assertEqual(registry.selectors_for('example.org'), ['.post', 'article'])
+        registry.flush_stats()
+        registry.flush_stats() # Повторный сброс ничего не удваивает
+        self.source.refresh_from_db()
+        self.assertEqual((self.source.selector_hits, self.source.fallback_count), ({'.post': 1}, 1))
+
+
+def story(seed: int, words: int = 120) -> str:
+    rng = random.Random(seed)
+    return ' '.join(f"word{rng.randrange(1000)}" for _ in range(words))
+
+
+@override_settings(RSS_SEEN_URLS_REDIS_URL=None)
+class NearDuplicateTests(TestCase):
+    def test_minhash_similarity(self):
+        text = story(1)
+        edited = text.replace(text.split()[60], "changed", 1)
+        self.assertIsNone(minhash("too short to compare"))
+        self.assertEqual(similarity(minhash(text), minhash(text)), 1.0)
+        self.assertGreater(similarity(minhash(text), minhash(edited)), 0.8)
+        self.assertLess(similarity(minhash(text), minhash(story(2))), 0.2)
+
+    def test_finds_stored_and_batch_duplicates(self):
+        original = Article.objects.create(title="Original", original_content=story(1), source_url='https://a.example/1', category='medicine')
+        index_articles({original.pk: minhash(story(1))})
+        signatures, duplicates = find_near_duplicates({
+            'stored-copy': story(1) + " extra",
+            'fresh': story(2),
+            'fresh-copy': story(2) + " extra",
+            'short': "short text",
+        })
+        self.assertEqual(set(signatures), {'stored-copy', 'fresh', 'fresh-copy'})
+        self.assertEqual(duplicates, {'stored-copy': ('article', original.pk), 'fresh-copy': ('batch', 'fresh')})
+
+    def test_flag_mode_keeps_duplicates_out_of_queue(self):
+        feed = RSSFeed.objects.create(url='https://b.example/rss', category='medicine')
+        entries = [
+            {'title': "Story", 'link': 'https://b.example/1', 'content': story(3), 'published_at': None},
+            {'title': "Story copy", 'link': 'https://b.example/2', 'content': story(3) + " extra", 'published_at': None},
+        ]
+        with override_settings(RSS_NEAR_DUPLICATE_ACTION='flag'):
+            self.assertEqual(store_articles(feed, entries), 2)
+        copy = Article.objects.get(source_url='https://b.example/2')
+        self.assertEqual(copy.duplicate_of.source_url, 'https://b.example/1')
+        self.assertFalse(copy.is_published)
+        self.assertEqual(list(Article.objects.pending_processing().values_list('source_url', flat=True)), ['https://b.example/1'])
+
+    def test_skip_mode_remembers_dropped_urls(self):
+        feed = RSSFeed.objects.create(url='https://c.example/rss', category='medicine')
+        entries = [
+            {'title': "Story", 'link': 'https://c.example/1', 'content': story(4), 'published_at': None},
+            {'title': "Story copy", 'link': 'https://c.example/2', 'content': story(4) + " extra", 'published_at': None},
+        ]
+        with override_settings(RSS_NEAR_DUPLICATE_ACTION='skip'), mock.patch('rss_feeds.tasks.remember_urls') as remember:
+            self.assertEqual(store_articles(feed, entries), 1)
+        remembered = {url for call in remember.call_args_list for url in call.args[0]}
+        self.assertEqual(remembered, {'https://c.example/1', 'https://c.example/2'})
+        self.assertFalse(Article.objects.filter(source_url='https://c.example/2').exists())
+
+
+@override_settings(RSS_POLL_MIN_INTERVAL=15, RSS_POLL_MAX_INTERVAL=24 * 60, RSS_POLL_TARGET_NEW_ARTICLES=1, RSS_POLL_MAX_GROWTH=2, RSS_POLL_MAX_BACKOFF=24 * 60, RSS_POLL_JITTER=0)
+class SchedulingTests(SimpleTestCase):
+    def make_feed(self, poll_interval=30, publish_rate=None, minutes_since_fetch=30):
+        now = timezone.now()
+        feed = RSSFeed(url='https://example.com/rss', poll_interval=poll_interval, last_fetched=now - timedelta(minutes=minutes_since_fetch))
+        feed.publish_rate = initial_publish_rate(poll_interval) if publish_rate is None else publish_rate
+        return feed, now
+
+    def test_steady_feed_keeps_interval(self):
+        feed, now = self.make_feed()
+        self.assertEqual(adapt_interval(feed, 1, now), 30)
+
+    def test_empty_poll_grows_gradually(self):
+        # Даже с нулевой частотой — не больше чем вдвое за опрос
+        feed, now = self.make_feed(publish_rate=0)
+        self.assertEqual(adapt_interval(feed, 0, now), 60)
+        feed, now = self.make_feed()
+        intervals = []
+        for _ in range(20):
+            feed.poll_interval = adapt_interval(feed, 0, now)
+            intervals.append(feed.poll_interval)
+        self.assertTrue(all(later <= earlier * 2 for earlier, later in zip([30] + intervals, intervals)))
+        self.assertEqual(intervals[-1], 24 * 60)
+
+    def test_busy_feed_shortens_to_minimum(self):
+        feed, now = self.make_feed()
+        for _ in range(10):
+            feed.poll_interval = adapt_interval(feed, 20, now)
+        self.assertEqual(feed.poll_interval, 15)
+
+    def test_success_resets_failures(self):
+        feed, now = self.make_feed()
+        feed.consecutive_failures = 3
+        schedule_success(feed, 1, now)
+        self.assertEqual((feed.consecutive_failures, feed.last_error), (0, ''))
+        self.assertEqual(feed.next_fetch_at, now + timedelta(minutes=feed.poll_interval))
+
+    def test_failure_backoff_is_exponential_and_capped(self):
+        feed, now = self.make_feed()
+        delays = []
+        for _ in range(8):
+            schedule_failure(feed, RuntimeError("boom"), now)
+            delays.append((feed.next_fetch_at - now) / timedelta(minutes=1))
+        self.assertEqual(delays[:3], [60, 120, 240])
+        self.assertEqual(delays[-1], 24 * 60)
+        self.assertEqual(feed.last_error, "boom")
+
+
+@override_settings(RSS_COORDINATION_REDIS_URL=None)
+class MetricsTests(SimpleTestCase):
+    def test_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry()
+        for value in (0.003, 0.3, 0.4, 100):
+            registry.observe('ingest_stage_seconds', value, stage='extract')
+        lines = render_prometheus(registry.snapshot()).splitlines()
+        self.assertIn('# TYPE ingest_stage_seconds histogram', lines)
+        self.assertIn('ingest_stage_seconds_bucket{stage="extract",le="0.005"} 1', lines)
+        self.assertIn('ingest_stage_seconds_bucket{stage="extract",le="0.25"} 1', lines)
+        self.assertIn('ingest_stage_seconds_bucket{stage="extract",le="0.5"} 3', lines)
+        self.assertIn('ingest_stage_seconds_bucket{stage="extract",le="30"} 3', lines)
+        self.assertIn('ingest_stage_seconds_bucket{stage="extract",le="+Inf"} 4', lines)
+        self.assertIn('ingest_stage_seconds_count{stage="extract"} 4', lines)
+        self.assertIn('ingest_stage_seconds_sum{stage="extract"} 100.703', lines)
+
+    def test_label_escaping(self):
+        registry = MetricsRegistry()
+        registry.inc('ingest_errors_total', domain='a"b\\c\nd', stage='feed')
+        self.assertIn('ingest_errors_total{domain="a\\"b\\\\c\\nd",stage="feed"} 1', render_prometheus(registry.snapshot()).splitlines())
+
+    def test_histogram_quantile(self):
+        buckets = (1, 2, 4)
+        parts = {'count': 10, 'bucket:1': 5, 'bucket:2': 3, 'bucket:4': 2}
+        self.assertEqual(histogram_quantile(0.5, parts, buckets), 1.0)
+        self.assertAlmostEqual(histogram_quantile(0.65, parts, buckets), 1.5)
+        self.assertEqual(histogram_quantile(0.9, parts, buckets), 3.0)
+        self.assertEqual(histogram_quantile(0.5, {}, buckets), 0.0)
+        # Всё в +Inf — оценка упирается в верхнюю границу
+        self.assertEqual(histogram_quantile(0.99, {'count': 2, 'bucket:+Inf': 2}, buckets), 4.0)
+
+    def test_snapshot_survives_redis_errors(self):
+        registry = MetricsRegistry()
+        registry.inc('ingest_articles_stored_total', 3)
+        broken = mock.Mock()
+        broken.hgetall.side_effect = ConnectionError("down")
+        with mock.patch('rss_feeds.coordination.get_redis', return_value=broken), self.assertLogs('rss_feeds.metrics', 'WARNING'):
+            self.assertEqual(registry.snapshot(), {('ingest_articles_stored_total', (), 'value'): 3})
+
+    @override_settings(RSS_METRICS_TOKEN='')
+    def test_endpoint_without_token_is_internal_only(self):
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='127.0.0.1').status_code, 200)
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='10.1.2.3').status_code, 200)
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='8.8.8.8').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='').status_code, 403)
+
+    @override_settings(RSS_METRICS_TOKEN='secret')
+    def test_endpoint_with_token(self):
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='127.0.0.1').status_code, 403)
+        response = self.client.get('/metrics', REMOTE_ADDR='8.8.8.8', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+
+
+BENCH_FEED_XML = """<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Bench feed</title>
+<item><title>Study summary</title><link>https://bench.example/study</link><description>Study</description></item>
+<item><title>Recipe</title><link>https://bench.example/recipe</link><description>Recipe</description></item>
+</channel></rss>"""
+
+
+class IngestBenchmarkTests(TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        source = Corpus(self.root / 'source')
+        source.add('https://bench.example/rss', BENCH_FEED_XML.encode(), 'application/rss+xml', 'feed')
+        source.add('https://bench.example/study', (FIXTURE_PAGES / 'study_summary.html').read_bytes(), 'text/html', 'page')
+        source.add('https://bench.example/recipe', (FIXTURE_PAGES / 'recipe_page.html').read_bytes(), 'text/html', 'page')
+        source.feeds.append({'url': 'https://bench.example/rss', 'category': 'medicine'})
+        source.save()
+        self.source = Corpus.load(source.root)
+
+    def test_record_through_stub_server(self):
+        # Запись корпуса с «сайтов», которые на деле отдаёт локальный сервер из другого корпуса
+        with serve_corpus(self.source) as server:
+            self.assertTrue(server.base_url.startswith('http://127.0.0.1:'))
+            with self.assertLogs('rss_feeds.benchmarks.corpus', 'INFO'):
+                record_corpus(self.root / 'recorded', [{'url': 'https://bench.example/rss', 'category': 'medicine'}], 10, get_session())
+        recorded = Corpus.load(self.root / 'recorded')
+        self.assertEqual(recorded.feeds, self.source.feeds)
+        self.assertEqual(set(recorded.urls('page')), {'https://bench.example/study', 'https://bench.example/recipe'})
+        for url in self.source.responses:
+            self.assertEqual(recorded.body(url), self.source.body(url))
+        self.assertIsNone(recorded.body('https://bench.example/missing'))
+
+    def test_run_suite(self):
+        with self.assertLogs('rss_feeds.benchmarks.suite', 'INFO'):
+            results = run_suite(self.source, repeat=1)
+        self.assertEqual(results['meta']['pages'], 2)
+        self.assertEqual(set(results['benchmarks']), {'clean_text', 'clean_text_batch', 'clean_html_element', 'extract_content_from_page', 'parse_rss_feed', 'fetch_and_store_articles_from_feed'})
+        self.assertEqual(len(results['benchmarks']['parse_rss_feed']['runs']), 1)
+        # Последний прогон задачи оставил статьи из корпуса
+        self.assertEqual(set(Article.objects.values_list('source_url', flat=True)), {'https://bench.example/study', 'https://bench.example/recipe'})
+
+
+@override_settings(RSS_BOILERPLATE_MAX_GAP=60)
+class BoilerplateFilterTests(SimpleTestCase):
+    def test_removes_phrases_with_short_gap(self):
+        text_filter = get_boilerplate_filter()
+        self.assertEqual(
+            text_filter.clean("Study results.\n\nClick here to read more about it. Sign up for our weekly newsletter today!"),
+            "Study results. about it. today!",
+        )
+
+    def test_gap_is_bounded(self):
+        # Раньше click.*?more съедал всё между далёкими «click» и «more»
+        text_filter = get_boilerplate_filter()
+        text = "Click the button. Patients improved after treatment, and more data is expected."
+        self.assertEqual(text_filter.clean(text), text)
+        long_gap = "Click " + "word " * 30 + "more"
+        self.assertEqual(text_filter.clean(long_gap), long_gap)
+
+    def test_whole_words_only(self):
+        text = "Advertisements and readmore are not boilerplate"
+        self.assertEqual(get_boilerplate_filter().clean(text), text)
+
+    def test_source_overrides(self):
+        phrases = resolve_phrases("!read more\nfollow us on ... twitter")
+        self.assertNotIn('read more', phrases)
+        text_filter = BoilerplateFilter(phrases)
+        self.assertEqual(text_filter.clean("Read more. Follow us on Twitter"), "Read more.")
+
+    def test_clean_many_matches_clean(self):
+        text_filter = get_boilerplate_filter()
+        texts = ["Read more", "", "Body text.\tAdvertisement\nEnd", "Subscribe", "Click\x00more"]
+        self.assertEqual(text_filter.clean_many(texts), [text_filter.clean(text) for text in texts])
+
+    def test_page_cache_key_follows_phrases(self):
+        # Правка фраз источника должна инвалидировать закэшированные результаты извлечения
+        url, selectors = 'https://example.com/a', ['article']
+        default_key = _page_cache_keys(url, selectors, get_boilerplate_filter())[1]
+        self.assertEqual(default_key, _page_cache_keys(url, selectors, get_boilerplate_filter(''))[1])
+        self.assertNotEqual(default_key, _page_cache_keys(url, selectors, get_boilerplate_filter('!read more'))[1])
+        self.assertNotEqual(default_key, _page_cache_keys(url, selectors, BoilerplateFilter(resolve_phrases(''), max_gap=10))[1])
@@ -3,241 +3,432 @@ import feedparser
 import logging
 import requests
 from urllib.parse import urlparse, urljoin # Добавили urljoin
-from bs4 import BeautifulSoup, NavigableString, Comment
-import time
 import re
+import copy
+import hashlib
+import time
 from datetime import datetime
 
 # --- ИМПОРТ readability ---
 from readability import Document
+from readability.htmls import build_doc, shorten_title
 # --- /ИМПОРТ readability ---
 
+from .boilerplate import get_boilerplate_filter
+from .fetcher import fetch_concurrently
+from .metrics import metrics, profile_if_slow
+from .page_cache import get_page_cache
+from .http_client import http_get
+from .selectors import compile_selector, get_selector_registry
+
 logger = logging.getLogger(__name__)
 
+# Версия логики извлечения контента: увеличь при изменении селекторов/очистки,
+# чтобы закэшированные результаты извлечения пересчитались (тела страниц останутся в кэше).
+EXTRACTOR_VERSION = 3
+
 # --- НОВАЯ ФУНКЦИЯ ДЛЯ ОЧИСТКИ ТЕКСТА ---
 def clean_text(text: str) -> str:
     """
-    Очищает текст от мусора.
+    Очищает текст от мусора фразами по умолчанию (см. rss_feeds.boilerplate).
+    Для текста конкретного источника — SelectorRegistry.boilerplate_for(host).
     """
-    if not text:
-        return ""
-
-    # Убираем лишние пробелы, табуляции, символы новой строки
-    text = re.sub(r'\s+', ' ', text).strip()
-    # Убираем часто встречающийся мусор (примеры, можно адаптировать)
-    # Например, строки типа "Sign up for our Newsletter"
-    text = re.sub(r'(?i)sign up for.*?newsletter|subscribe.*?here|click.*?more|read more|advertisement|sponsored content', '', text)
-    # Убираем строки, состоящие только из пунктуации или специальных символов (длинные)
-    # text = re.sub(r'^[\W_]+$', '', text, flags=re.MULTILINE).strip() # Убрано, так как может удалить важный контент
-    return text
+    return get_boilerplate_filter().clean(text)
 
 # --- /НОВАЯ ФУНКЦИЯ ---
 
-# --- НОВАЯ ФУНКЦИЯ ДЛЯ ОЧИСТКИ HTML ---
+# --- ОЧИСТКА HTML ЗА ОДИН ПРОХОД ---
+# Теги, которые удаляем вместе с содержимым (можно расширить)
+UNWANTED_TAGS = frozenset(['script', 'style', 'aside', 'nav', 'footer', 'header', 'form', 'input', 'button', 'iframe', 'embed', 'object', 'noscript', 'svg', 'picture', 'figure', 'figcaption'])
+# Подстроки классов/ID для удаления (примеры, можно настроить)
+UNWANTED_CLASSES_IDS = ['ad', 'advertisement', 'ads', 'promo', 'social-share', 'comments', 'comment', 'related', 'sidebar', 'widget', 'newsletter', 'subscribe', 'popup', 'modal', 'cookie', 'consent', 'banner', 'sticky', 'mobile', 'hidden']
+# Один регэксп на все подстроки вместо 2×21 отдельно компилируемых
+UNWANTED_CLASS_ID_RE = re.compile('|'.join(re.escape(name) for name in UNWANTED_CLASSES_IDS), re.I)
+
+def _is_unwanted_tag(element) -> bool:
+    if element.tag in UNWANTED_TAGS:
+        return True
+    classes = element.get('class')
+    if classes and UNWANTED_CLASS_ID_RE.search(classes):
+        return True
+    element_id = element.get('id')
+    return bool(element_id and UNWANTED_CLASS_ID_RE.search(element_id))
+
+def _drop_tree(node):
+    """
+    drop_tree(), после которого текст до и после узла не слипается: в bs4 это
+    остаются отдельные строки, и get_text(separator=' ') разделяет их пробелом.
+    """
+    tail = node.tail
+    if tail and tail.strip():
+        previous = node.getprevious()
+        owner, attr = (previous, 'tail') if previous is not None else (node.getparent(), 'text')
+        before = getattr(owner, attr) if owner is not None else None
+        if before and before.strip():
+            setattr(owner, attr, before.rstrip())
+            node.tail = ' ' + tail.lstrip()
+    node.drop_tree()
+
 def clean_html_element(element):
     """
-    Рекурсивно удаляет нежелательные элементы и строки из BeautifulSoup-элемента.
+    Удаляет нежелательные элементы и строки из lxml-элемента за один обход дерева.
+    Спускаясь вниз, выкидываем нежелательные теги (по имени, классу, id) и комментарии;
+    поднимаясь обратно, удаляем элементы, в которых не осталось текста.
+    Элементы удаляются через drop_tree(), поэтому хвостовой текст (tail) сохраняется
+    (и не склеивается с текстом перед удалённым элементом, см. _drop_tree).
+    Старая многопроходная версия на BeautifulSoup — в rss_feeds.benchmarks.legacy.
     """
-    if not element:
+    if element is None:
         return
 
-    # Список тегов для удаления (можно расширить)
-    unwanted_tags = ['script', 'style', 'aside', 'nav', 'footer', 'header', 'form', 'input', 'button', 'iframe', 'embed', 'object', 'noscript', 'svg', 'picture', 'figure', 'figcaption']
-    # Список классов/ID для удаления (примеры, можно настроить)
-    unwanted_classes_ids = ['ad', 'advertisement', 'ads', 'promo', 'social-share', 'comments', 'comment', 'related', 'sidebar', 'widget', 'newsletter', 'subscribe', 'popup', 'modal', 'cookie', 'consent', 'banner', 'sticky', 'mobile', 'hidden']
+    # Кадр стека: [узел, итератор по детям, есть ли в поддереве непустой текст]
+    stack = [[element, iter(list(element)), bool(element.text and element.text.strip())]]
+    while stack:
+        frame = stack[-1]
+        child = next(frame[1], None)
+        if child is None:
+            stack.pop()
+            node, _, has_text = frame
+            if stack:
+                if has_text:
+                    stack[-1][2] = True
+                else:
+                    _drop_tree(node)
+            continue
+
+        # Хвостовой текст ребёнка принадлежит родителю и переживает удаление ребёнка
+        if child.tail and child.tail.strip():
+            frame[2] = True
 
-    # Удаляем нежелательные теги
-    for unwanted_tag in unwanted_tags:
-        for tag in element.find_all(unwanted_tag):
-            tag.decompose()
+        if not isinstance(child.tag, str) or _is_unwanted_tag(child):
+            # Комментарии, processing instructions и нежелательные теги
+            _drop_tree(child)
+        else:
+            stack.append([child, iter(list(child)), bool(child.text and child.text.strip())])
 
-    # Удаляем элементы с нежелательными классами/ID
-    for class_id in unwanted_classes_ids:
-        for tag in element.find_all(attrs={"class": re.compile(f".*{class_id}.*", re.I)}):
-            tag.decompose()
-        for tag in element.find_all(attrs={"id": re.compile(f".*{class_id}.*", re.I)}):
-            tag.decompose()
+def element_text(element) -> str:
+    """
+    Текст элемента: непустые текстовые узлы через пробел (как get_text(separator=' ', strip=True) в bs4).
+    """
+    return ' '.join(text.strip() for text in element.itertext() if text.strip())
 
-    # Удаляем комментарии
-    for comment in element.find_all(string=lambda text: isinstance(text, Comment)):
-        comment.extract()
+# --- /ОЧИСТКА HTML ЗА ОДИН ПРОХОД ---
 
-    # Удаляем пустые элементы
-    for tag in element.find_all():
-        if not tag.get_text(strip=True):
-            tag.decompose()
+class TreeDocument(Document):
+    """
+    readability.Document, который принимает готовое lxml-дерево и сохраняет
+    итоговый элемент summary(), чтобы не парсить возвращённый HTML заново.
+    """
+    summary_element = None
 
-# --- /НОВАЯ ФУНКЦИЯ ---
+    def get_clean_html(self):
+        self.summary_element = self.html
+        return super().get_clean_html()
+
+def extract_content_from_html(url: str, html_content, selectors: list) -> dict:
+    """
+    Извлекает основной контент статьи и изображение из уже скачанного HTML.
+    В результате 'selector' — сработавший селектор (None, если понадобился readability).
+    Страница парсится один раз (lxml); это же дерево используется для селекторов,
+    для readability-фолбэка и для поиска изображения в мета-тегах.
+    """
+    doc_tree, _ = build_doc(html_content)
+    text_filter = get_selector_registry().boilerplate_for(urlparse(url).netloc) # Фразы-мусор с учётом настроек источника
+
+    content_text = ""
+    image_url = None
+
+    # --- ПОИСК ОСНОВНОГО КОНТЕНТА СЕЛЕКТОРАМИ ---
+    main_content_element = None
+    matched_selector = None
+    for selector in selectors:
+        matches = compile_selector(selector)(doc_tree)
+        if matches:
+            # Чистим копию, чтобы readability при необходимости получил нетронутое дерево
+            main_content_element = copy.deepcopy(matches[0])
+            matched_selector = selector
+            logger.info(f"Контент найден с помощью селектора '{selector}' из {url}")
+            break
+
+    if main_content_element is not None:
+        # Очищаем найденный элемент
+        with metrics.timer(stage='html_clean'):
+            clean_html_element(main_content_element)
+        # Извлекаем текст
+        content_text = element_text(main_content_element)
+        content_text = text_filter.clean(content_text)
+        # Пытаемся извлечь изображение из этого элемента (например, тег <img>)
+        img_tag = main_content_element.find('.//img')
+        if img_tag is not None and img_tag.get('src'):
+            # Если URL относительный, преобразуем в абсолютный
+            image_url = urljoin(url, img_tag.get('src'))
+            logger.debug(f"Изображение найдено в основном контенте (селектор): {image_url}")
+    else:
+        logger.info(f"Селекторы не сработали для {url}, пробуем readability...")
+
+    method = 'selector' if content_text.strip() else 'empty' # Для метрик: чем в итоге получен текст
+
+    # --- ПОПЫТКА С readability ---
+    if not content_text.strip(): # Если текст из селекторов пуст или короткий
+        try:
+            if shorten_title(doc_tree): # readability может не сработать, если это не статья
+                doc = TreeDocument(doc_tree) # readability работает с копией дерева, наше не меняется
+                doc.summary()
+                readability_element = doc.summary_element
+                # Очищаем полученный HTML от мусора
+                with metrics.timer(stage='html_clean'):
+                    clean_html_element(readability_element)
+                # Извлекаем текст
+                content_text = element_text(readability_element)
+                content_text = text_filter.clean(content_text)
+                # Ищем изображение в полученном HTML
+                if not image_url: # Если image_url ещё не найден
+                    readability_img = readability_element.find('.//img')
+                    if readability_img is not None and readability_img.get('src'):
+                        image_url = urljoin(url, readability_img.get('src'))
+                        logger.debug(f"Изображение найдено через readability: {image_url}")
+                logger.info(f"Контент успешно извлечён через readability для {url}")
+                if content_text:
+                    method = 'readability'
+        except Exception as e_readability:
+            logger.warning(f"readability не сработала для {url}: {e_readability}")
+
+    # --- ПОИСК ИЗОБРАЖЕНИЯ В МЕТА-ТЕГАХ (альтернатива) ---
+    if not image_url:
+        # Пытаемся найти изображение в Open Graph или Twitter Card
+        og_image = doc_tree.find('.//meta[@property="og:image"]')
+        if og_image is not None and og_image.get('content'):
+            image_url = og_image.get('content')
+            logger.debug(f"Изображение найдено в og:image: {image_url}")
+        else:
+            twitter_image = doc_tree.find('.//meta[@name="twitter:image"]')
+            if twitter_image is not None and twitter_image.get('content'):
+                image_url = twitter_image.get('content')
+                logger.debug(f"Изображение найдено в twitter:image: {image_url}")
+
+    logger.info(f"Извлечение завершено для {url}. Контент длиной: {len(content_text)}, Изображение: {image_url}")
+    metrics.inc('ingest_extraction_total', domain=urlparse(url).netloc, method=method)
+    return {'content': content_text, 'image_url': image_url, 'selector': matched_selector}
+
+def _page_cache_keys(url: str, selectors: list, text_filter):
+    """
+    Ключи кэша: тело ответа — по URL, результат извлечения — ещё и по версии экстрактора,
+    селекторам и фразам-мусор источника (после их правки в админке старый результат не годится).
+    Селекторы сортируются: реестр переставляет их по статистике попаданий, и от этого ключ меняться не должен.
+    """
+    selectors_hash = hashlib.sha1('\n'.join(sorted(selectors)).encode('utf-8')).hexdigest()[:12]
+    return f"body:{url}", f"result:v{EXTRACTOR_VERSION}:{selectors_hash}:{text_filter.fingerprint}:{url}"
 
 def extract_content_from_page(url: str, selectors: list) -> dict:
     """
     Пытается извлечь основной контент статьи и изображение со страницы по URL.
     Использует селекторы, а затем readability-lxml как фолбэк.
+    Тело ответа и результат кэшируются на диске (см. rss_feeds.page_cache), так что
+    повторные запуски задачи и переобработка не ходят на сайты-источники.
     """
+    cache = get_page_cache()
+    domain = urlparse(url).netloc
+    body_key, result_key = _page_cache_keys(url, selectors, get_selector_registry().boilerplate_for(domain))
     try:
-        logger.info(f"Попытка извлечения контента со страницы: {url}")
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        html_content = response.text
-
-        soup = BeautifulSoup(html_content, 'html.parser')
-
-        content_text = ""
-        image_url = None
-
-        # --- ПОИСК ОСНОВНОГО КОНТЕНТА СЕЛЕКТОРАМИ ---
-        main_content_element = None
-        for selector in selectors:
-            element = soup.select_one(selector)
-            if element:
-                main_content_element = element
-                logger.info(f"Контент найден с помощью селектора '{selector}' из {url}")
-                break
-
-        if main_content_element:
-            # Очищаем найденный элемент
-            clean_html_element(main_content_element)
-            # Извлекаем текст
-            content_text = main_content_element.get_text(separator=' ', strip=True)
-            content_text = clean_text(content_text)
-            # Пытаемся извлечь изображение из этого элемента (например, тег <img>)
-            img_tag = main_content_element.find('img')
-            if img_tag and img_tag.get('src'):
-                image_url = img_tag['src']
-                # Если URL относительный, преобразуем в абсолютный
-                image_url = urljoin(url, image_url)
-                logger.debug(f"Изображение найдено в основном контенте (селектор): {image_url}")
+        if cache is not None:
+            cached_result = cache.get_json(result_key)
+            if cached_result is not None:
+                logger.debug(f"Результат извлечения для {url} взят из кэша")
+                metrics.inc('ingest_page_cache_total', result='hit_result')
+                return cached_result
+            html_content = cache.get_text(body_key)
+        else:
+            html_content = None
+
+        if html_content is None:
+            logger.info(f"Попытка извлечения контента со страницы: {url}")
+            metrics.inc('ingest_page_cache_total', result='miss')
+            started = time.perf_counter()
+            response = http_get(url)
+            response.raise_for_status()
+            elapsed = time.perf_counter() - started
+            metrics.observe('ingest_stage_seconds', elapsed, stage='page_fetch')
+            metrics.observe('ingest_page_fetch_seconds', elapsed, domain=domain)
+            metrics.observe('ingest_page_bytes', len(response.content), domain=domain)
+            html_content = response.text
+            if cache is not None:
+                cache.set_text(body_key, html_content)
         else:
-            logger.info(f"Селекторы не сработали для {url}, пробуем readability...")
-
-        # --- ПОПЫТКА С readability ---
-        if not content_text.strip(): # Если текст из селекторов пуст или короткий
-            try:
-                doc = Document(html_content)
-                if doc.short_title(): # readability может не сработать, если это не статья
-                    readability_html = doc.summary() # Возвращает HTML основного контента
-                    readability_soup = BeautifulSoup(readability_html, 'html.parser')
-                    # Очищаем полученный HTML от мусора
-                    clean_html_element(readability_soup)
-                    # Извлекаем текст
-                    content_text = readability_soup.get_text(separator=' ', strip=True)
-                    content_text = clean_text(content_text)
-                    # Ищем изображение в полученном HTML
-                    if not image_url: # Если image_url ещё не найден
-                        readability_img = readability_soup.find('img')
-                        if readability_img and readability_img.get('src'):
-                            image_url = readability_img['src']
-                            image_url = urljoin(url, image_url)
-                            logger.debug(f"Изображение найдено через readability: {image_url}")
-                    logger.info(f"Контент успешно извлечён через readability для {url}")
-            except Exception as e_readability:
-                logger.warning(f"readability не сработала для {url}: {e_readability}")
-
-        # --- ПОИСК ИЗОБРАЖЕНИЯ В МЕТА-ТЕГАХ (альтернатива) ---
-        if not image_url:
-            # Пытаемся найти изображение в Open Graph или Twitter Card
-            og_image = soup.find('meta', property='og:image')
-            if og_image and og_image.get('content'):
-                image_url = og_image['content']
-                logger.debug(f"Изображение найдено в og:image: {image_url}")
-            else:
-                twitter_image = soup.find('meta', attrs={'name': 'twitter:image'})
-                if twitter_image and twitter_image.get('content'):
-                    image_url = twitter_image['content']
-                    logger.debug(f"Изображение найдено в twitter:image: {image_url}")
-
-        logger.info(f"Извлечение завершено для {url}. Контент длиной: {len(content_text)}, Изображение: {image_url}")
-        return {'content': content_text, 'image_url': image_url}
+            logger.debug(f"Страница {url} взята из кэша")
+            metrics.inc('ingest_page_cache_total', result='hit_body')
+
+        with metrics.timer(stage='extract'), profile_if_slow(url):
+            result = extract_content_from_html(url, html_content, selectors)
+        if cache is not None:
+            cache.set_json(result_key, result)
+        return result
 
     except requests.exceptions.RequestException as e:
         logger.error(f"Ошибка при запросе к {url}: {e}")
+        metrics.inc('ingest_errors_total', stage='page_fetch', domain=domain)
         return {'content': '', 'image_url': None}
     except Exception as e:
         logger.error(f"Неожиданная ошибка при парсинге страницы {url}: {e}")
+        metrics.inc('ingest_errors_total', stage='extract', domain=domain)
         return {'content': '', 'image_url': None}
 
 # --- /ОБНОВЛЁННАЯ ФУНКЦИЯ ---
 
-def parse_rss_feed(feed_url: str):
+def fetch_feed(feed_url: str, etag: str = '', last_modified: str = '', content_hash: str = '') -> dict:
+    """
+    Скачивает RSS-ленту условным GET-запросом (If-None-Match / If-Modified-Since).
+    Возвращает словарь с телом ответа и новыми валидаторами кэша.
+    not_modified=True означает, что лента не менялась (ответ 304 или то же самое тело).
+    """
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+
+    domain = urlparse(feed_url).netloc
+    try:
+        with metrics.timer(stage='feed_download'):
+            response = http_get(feed_url, headers=headers)
+    except Exception:
+        metrics.inc('ingest_errors_total', stage='feed_download', domain=domain)
+        raise
+    if response.status_code == 304:
+        logger.info(f"Лента {feed_url} не изменилась (304 Not Modified)")
+        metrics.inc('ingest_feed_polls_total', result='not_modified')
+        return {'not_modified': True, 'content': b'', 'etag': etag, 'last_modified': last_modified, 'content_hash': content_hash}
+    if not response.ok:
+        metrics.inc('ingest_errors_total', stage='feed_download', domain=domain)
+    response.raise_for_status()
+
+    body = response.content
+    metrics.observe('ingest_feed_bytes', len(body), domain=domain)
+    new_hash = hashlib.sha256(body).hexdigest()
+    result = {
+        'not_modified': new_hash == content_hash,
+        'content': body,
+        'etag': response.headers.get('ETag', ''),
+        'last_modified': response.headers.get('Last-Modified', ''),
+        'content_hash': new_hash,
+    }
+    if result['not_modified']:
+        logger.info(f"Лента {feed_url} не изменилась (совпал хэш содержимого)")
+    metrics.inc('ingest_feed_polls_total', result='not_modified' if result['not_modified'] else 'modified')
+    return result
+
+def parse_feed_entries(feed_url: str, feed_content: bytes, known_url_filter=None) -> list:
+    """
+    Разбирает тело ленты в список статей без загрузки их страниц.
+    known_url_filter(links) -> set возвращает уже известные ссылки: такие записи пропускаются.
+    У статей, чью страницу нужно скачать, в 'page_selectors' лежат селекторы источника
+    (лучший по статистике — первым), у остальных — None.
+    """
+    with metrics.timer(stage='feed_parse'):
+        feed = feedparser.parse(feed_content)
+
+    if feed.bozo: # feedparser обнаружил ошибки в формате
+        logger.warning(f"Bozo error при парсинге {feed_url}: {feed.bozo_exception}")
+        metrics.inc('ingest_errors_total', stage='feed_parse', domain=urlparse(feed_url).netloc)
+
+    # Отсекаем уже известные статьи до любых запросов к их страницам
+    known_links = set()
+    if known_url_filter is not None:
+        known_links = known_url_filter([getattr(entry, 'link', '') for entry in feed.entries])
+
+    selector_registry = get_selector_registry()
+    articles = []
+    for entry in feed.entries:
+        # Извлекаем дату публикации
+        published_parsed = getattr(entry, 'published_parsed', None)
+        published_at = datetime(*published_parsed[:6]) if published_parsed else None
+
+        # Извлекаем основные поля
+        title = getattr(entry, 'title', 'Без заголовка')
+        link = getattr(entry, 'link', '')
+        description = getattr(entry, 'description', '') # Это может быть краткое содержание или фрагмент HTML
+
+        if link in known_links:
+            logger.debug(f"Статья с URL {link} уже известна, страницу не загружаем.")
+            continue
+
+        # Определяем селекторы на основе домена (лучший по статистике — первым)
+        domain = urlparse(link).netloc
+        selectors = selector_registry.selectors_for(domain)
+
+        # Проверяем, нужно ли парсить страницу
+        should_parse_page = not description.strip() or len(description.strip()) < 200
+        if should_parse_page and not selectors:
+            logger.info(f"Нет известных селекторов для {domain}, используем description.")
+
+        articles.append({
+            'title': title,
+            'link': link,
+            'description': description,
+            'content': description, # Начинаем с description, страница может его заменить
+            'image_url': None, # Заполним после загрузки страницы
+            'published_at': published_at,
+            'page_selectors': selectors if should_parse_page and selectors else None,
+        })
+
+    logger.info(f"Найдено {len(articles)} новых статей в ленте {feed_url} (известных пропущено: {len(known_links)})")
+    metrics.inc('ingest_entries_total', len(articles), status='new')
+    metrics.inc('ingest_entries_total', len(feed.entries) - len(articles), status='known')
+    return articles
+
+
+def apply_extracted_page(article_data: dict, extracted_data) -> dict:
+    """Подставляет в статью контент и изображение, извлечённые со страницы (если удалось)."""
+    if extracted_data and 'selector' in extracted_data:
+        article_data['selector'] = extracted_data['selector']
+    if extracted_data and extracted_data['content']:
+        article_data['content'] = extracted_data['content']
+        article_data['image_url'] = extracted_data['image_url']
+        logger.info(f"Полный контент и изображение извлечены для статьи: {article_data['title']} ({article_data['link']})")
+    else:
+        logger.warning(f"Полный контент НЕ извлечён для статьи: {article_data['title']} ({article_data['link']}), используем description.")
+    return article_data
+
+
+def record_selector_hits(articles) -> None:
+    """Учитывает сработавшие селекторы в статистике источников одной записью в БД."""
+    selector_registry = get_selector_registry()
+    for article_data in articles:
+        if 'selector' in article_data: # None — не подошёл ни один селектор, это тоже статистика
+            selector_registry.record(urlparse(article_data['link']).netloc, article_data['selector'])
+    selector_registry.flush_stats()
+
+
+def parse_rss_feed(feed_url: str, feed_content: bytes = None, known_url_filter=None):
     """
     Парсит RSS-ленту по указанному URL и пытается извлечь полный контент и изображение.
+    Если передан feed_content (уже скачанное тело ленты, см. fetch_feed), повторно ленту не качаем.
+    known_url_filter(links) -> set возвращает уже известные ссылки: такие записи
+    пропускаются целиком, их страницы не скачиваются и не парсятся.
+    Страницы статей скачиваются параллельно в этом же процессе (см. rss_feeds.fetcher);
+    Celery-конвейер в rss_feeds.tasks делает то же самое отдельными задачами.
     """
     try:
         logger.info(f"Парсинг RSS-ленты: {feed_url}")
-        feed = feedparser.parse(feed_url)
-
-        if feed.bozo: # feedparser обнаружил ошибки в формате
-            logger.warning(f"Bozo error при парсинге {feed_url}: {feed.bozo_exception}")
-
-        articles = []
-        for entry in feed.entries:
-            # Извлекаем дату публикации
-            published_parsed = getattr(entry, 'published_parsed', None)
-            published_at = datetime(*published_parsed[:6]) if published_parsed else None
-
-            # Извлекаем основные поля
-            title = getattr(entry, 'title', 'Без заголовка')
-            link = getattr(entry, 'link', '')
-            description = getattr(entry, 'description', '') # Это может быть краткое содержание или фрагмент HTML
-
-            # --- НОВАЯ ЛОГИКА ---
-            content = description # Начинаем с description
-            image_url = None # Инициализируем URL изображения
-
-            # Определяем селекторы на основе домена
-            domain = urlparse(link).netloc
-            selectors = []
-            if 'sciencedaily.com' in domain:
-                selectors = ['article', '.content', '.story', '.post-content']
-            elif 'webmd.com' in domain:
-                selectors = ['.article-content', '.post-content', 'article', '.content']
-            elif 'reuters.com' in domain:
-                selectors = ['[data-testid="BodyWrapper"]', '.resizeableText', '.StandardArticleBody_body']
-            elif 'medicalnewstoday.com' in domain:
-                selectors = ['.content', '.article-body', 'article']
-            elif 'healthline.com' in domain:
-                selectors = ['.content', '.article-body', '.structured-content', 'article']
-            elif 'mindbodygreen.com' in domain:
-                selectors = ['.content', '.article-body', '.post-content', 'article']
-            elif 'hsph.harvard.edu' in domain:
-                selectors = ['.post-content', '.content', 'article', '.entry-content']
-            # --- ДОБАВЬ СЕЛЕКТОРЫ ДЛЯ СВОИХ ИСТОЧНИКОВ ---
-            # elif 'your-source.com' in domain:
-            #     selectors = ['.main-article', '.post-body', 'main', '.content-area']
-            # --- /ДОБАВЬ СЕЛЕКТОРЫ ДЛЯ СВОИХ ИСТОЧНИКОВ ---
-
-            # Проверяем, нужно ли парсить страницу
-            should_parse_page = not content.strip() or len(content.strip()) < 200
-            if should_parse_page and selectors:
-                logger.debug(f"Парсим страницу статьи для получения полного контента: {link}")
-                time.sleep(1) # Пауза между запросами
-                extracted_data = extract_content_from_page(link, selectors)
-                if extracted_data['content']:
-                    content = extracted_data['content']
-                    image_url = extracted_data['image_url']
-                    logger.info(f"Полный контент и изображение извлечены для статьи: {title} ({link})")
-                else:
-                    logger.warning(f"Полный контент НЕ извлечён для статьи: {title} ({link}), используем description.")
-            elif not selectors:
-                 logger.info(f"Нет известных селекторов для {domain}, используем description.")
-
-
-            # --- /НОВАЯ ЛОГИКА ---
-
-            # Формируем словарь для статьи
-            article_data = {
-                'title': title,
-                'link': link,
-                'description': description,
-                'content': content,
-                'image_url': image_url,
-                'published_at': published_at,
-            }
-            articles.append(article_data)
-
-        logger.info(f"Найдено {len(articles)} статей в ленте {feed_url}")
+        if feed_content is None:
+            # Ленту качаем через общую HTTP-сессию, а не встроенным urllib feedparser'а
+            response = http_get(feed_url)
+            response.raise_for_status()
+            feed_content = response.content
+        articles = parse_feed_entries(feed_url, feed_content, known_url_filter)
+
+        # --- ПАРАЛЛЕЛЬНАЯ ЗАГРУЗКА СТРАНИЦ (с паузой на каждый хост) ---
+        page_jobs = [(article_data['link'], article_data['page_selectors']) for article_data in articles if article_data['page_selectors']]
+        extracted_pages = fetch_concurrently(page_jobs, extract_content_from_page)
+        for article_data in articles:
+            if article_data['link'] in extracted_pages:
+                apply_extracted_page(article_data, extracted_pages[article_data['link']])
+
+        record_selector_hits(articles)
         return articles
 
     except Exception as e:
         logger.error(f"Ошибка при парсинге RSS-ленты {feed_url}: {e}")
+        metrics.inc('ingest_errors_total', stage='feed_parse', domain=urlparse(feed_url).netloc)
         return []
+    finally:
+        metrics.flush()
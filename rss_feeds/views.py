@@ -1,3 +1,33 @@
-from django.shortcuts import render
+# rss_feeds/views.py
+import hmac
+import ipaddress
 
-# Create your views here.
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.views.decorators.http import require_GET
+
+from .metrics import metrics, render_prometheus
+
+
+def is_internal_address(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return ip.is_loopback or ip.is_private
+
+
+@require_GET
+def metrics_view(request):
+    """
+    Метрики загрузки в текстовом формате Prometheus. С RSS_METRICS_TOKEN нужен заголовок
+    Authorization: Bearer <токен>; без токена отдаём только на внутренние адреса (loopback и частные сети).
+    """
+    token = getattr(settings, 'RSS_METRICS_TOKEN', '')
+    if token:
+        provided = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+        if not hmac.compare_digest(provided, token):
+            return HttpResponseForbidden()
+    elif not is_internal_address(request.META.get('REMOTE_ADDR', '')):
+        return HttpResponseForbidden()
+    return HttpResponse(render_prometheus(metrics.snapshot()), content_type='text/plain; version=0.0.4; charset=utf-8')